@@ -0,0 +1,84 @@
+"""
+Per-process memory accounting for gunicorn, read from Linux `/proc/<pid>/smaps_rollup`.
+
+RSS alone double counts every page a worker still shares with the preloaded master. The
+numbers that decide how many workers fit in the Pi's RAM are:
+- private: pages only this process maps (its real marginal cost),
+- shared: pages still shared copy-on-write with the master and siblings,
+- pss: RSS with each shared page divided among the processes mapping it.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+PROC = Path("/proc")
+
+# smaps_rollup field -> report key, values in KiB
+_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+}
+
+
+def read_smaps_rollup(pid: int) -> dict[str, int]:
+    usage = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    for line in (PROC / str(pid) / "smaps_rollup").read_text().splitlines():
+        field, _, rest = line.partition(":")
+        if field in _FIELDS:
+            usage[_FIELDS[field]] += int(rest.split()[0])
+    return usage
+
+
+def _cmdline(pid: int) -> str:
+    return (PROC / str(pid) / "cmdline").read_bytes().replace(b"\0", b" ").decode()
+
+
+def _ppid(pid: int) -> int:
+    # The field after the parenthesized command name, which may itself contain spaces
+    stat = (PROC / str(pid) / "stat").read_text()
+    return int(stat.rsplit(")", 1)[1].split()[1])
+
+
+def find_processes(match: str = "gunicorn") -> list[dict[str, Any]]:
+    """Returns every process whose command line contains `match`, tagged master/worker."""
+    pids = []
+    for entry in PROC.iterdir():
+        # Skip ourselves: `manage.py memory_report --match ...` contains the match string
+        if entry.name.isdigit() and int(entry.name) != os.getpid():
+            try:
+                if match in _cmdline(int(entry.name)):
+                    pids.append(int(entry.name))
+            except OSError:
+                continue  # Exited while scanning, or not ours to read
+
+    processes = []
+    for pid in sorted(pids):
+        try:
+            role = "worker" if _ppid(pid) in pids else "master"
+            processes.append({"pid": pid, "role": role, **read_smaps_rollup(pid)})
+        except OSError:
+            continue
+    return processes
+
+
+def summarize(processes: list[dict[str, Any]]) -> dict[str, Any]:
+    workers = [p for p in processes if p["role"] == "worker"] or processes
+    count = len(workers) or 1
+    return {
+        "workers": len(workers),
+        "worker_avg": {
+            key: round(sum(p[key] for p in workers) / count)
+            for key in ("rss", "pss", "shared", "private")
+        },
+        "total_pss": sum(p["pss"] for p in processes),
+    }
+
+
+def load_report(path: str) -> dict[str, Any]:
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,138 @@
+import cProfile
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+
+from config import profiling
+
+logger = logging.getLogger(__name__)
+
+# cProfile hooks are process-global on recent Pythons, so only one request per worker
+# is profiled at a time; concurrent requests simply run unprofiled.
+_profiler_lock = threading.Lock()
+
+
+def is_stateless_route(request: HttpRequest) -> bool:
+    """
+    Returns True when the request targets a route that never needs a session.
+
+    The public trivia API and the health probes are anonymous (`AllowAny`, no logins),
+    so running the session, auth, messages and CSRF machinery for them only costs
+    latency and, in production, a Redis write per request because of
+    `SESSION_SAVE_EVERY_REQUEST`. The admin (and anything not listed) keeps the full stack.
+    """
+    return request.path_info.startswith(tuple(settings.STATELESS_ROUTE_PREFIXES))
+
+
+class StatelessRouteMixin:
+    """
+    Short-circuits the wrapped Django middleware for stateless routes.
+
+    Why a mixin instead of a separate middleware?: Django's middleware chain is fixed at
+    startup, so the only way to "remove" a middleware for a subset of routes is to make
+    it a pass-through for those routes. Wrapping the stock classes keeps their behaviour
+    byte-for-byte identical everywhere else (e.g. the admin).
+    """
+
+    get_response: Callable[[HttpRequest], HttpResponse]
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if is_stateless_route(request):
+            return self.get_response(request)
+        return super().__call__(request)  # type: ignore[misc]
+
+
+class StatelessAwareSessionMiddleware(StatelessRouteMixin, SessionMiddleware):
+    pass
+
+
+class StatelessAwareAuthenticationMiddleware(
+    StatelessRouteMixin, AuthenticationMiddleware
+):
+    pass
+
+
+class StatelessAwareMessageMiddleware(StatelessRouteMixin, MessageMiddleware):
+    pass
+
+
+class StatelessAwareCsrfViewMiddleware(StatelessRouteMixin, CsrfViewMiddleware):
+    def process_view(
+        self,
+        request: HttpRequest,
+        callback: Callable[..., Any],
+        callback_args: Any,
+        callback_kwargs: Any,
+    ) -> HttpResponse | None:
+        # process_view is invoked by the handler directly, not through __call__
+        if is_stateless_route(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in cProfile capture for individual requests.
+
+    A request is profiled when it carries a valid signed `X-Profile-Token` header (mint one
+    with `manage.py profiles --token`) or when it is picked by `PROFILING_SAMPLE_RATE`.
+    Both are off by default, so the normal cost is a header lookup and one comparison.
+    The dump is written with `config.profiling.save_profile` and its id is echoed back
+    in the `X-Profile-Id` response header.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def _should_profile(self, request: HttpRequest) -> bool:
+        token = request.headers.get("X-Profile-Token")
+        if token:
+            return profiling.is_valid_token(token)
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not self._should_profile(request) or not _profiler_lock.acquire(
+            blocking=False
+        ):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            _profiler_lock.release()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        match = request.resolver_match
+        try:
+            path = profiling.save_profile(
+                profiler,
+                {
+                    "route": match.view_name if match else request.path_info,
+                    "method": request.method,
+                    "path": request.get_full_path(),
+                    "status": response.status_code,
+                    "duration_ms": round(duration_ms, 3),
+                    "timestamp": time.time(),
+                },
+            )
+            response["X-Profile-Id"] = path.stem
+        except OSError as e:
+            logger.error(f"Failed to store request profile: {e}")
+        return response
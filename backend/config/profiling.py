@@ -0,0 +1,76 @@
+"""
+Storage helpers for on-demand request profiles (see `RequestProfilingMiddleware`).
+
+Each captured request produces two files in `settings.PROFILING_DIR`:
+- `<id>.prof`: a cProfile dump, readable with `pstats`, snakeviz or `flameprof`.
+- `<id>.json`: metadata (route, method, path, status, wall time) used for grouping.
+
+The directory is bounded: once it holds more than `PROFILING_MAX_FILES` profiles the
+oldest are deleted, so leaving sampling on can never fill the Pi's SD card.
+"""
+
+import cProfile
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = "config.profiling"
+TOKEN_VALUE = "profile-request"
+
+
+def make_token() -> str:
+    """Returns a value for the `X-Profile-Token` header, valid for PROFILING_TOKEN_MAX_AGE."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(TOKEN_VALUE)
+
+
+def is_valid_token(token: str) -> bool:
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return value == TOKEN_VALUE
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+def save_profile(profiler: cProfile.Profile, metadata: dict[str, Any]) -> Path:
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # Time-prefixed ids sort chronologically, which the pruning below relies on
+    profile_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    prof_path = directory / f"{profile_id}.prof"
+    profiler.dump_stats(prof_path)
+    (directory / f"{profile_id}.json").write_text(json.dumps(metadata))
+
+    _prune(directory)
+    return prof_path
+
+
+def _prune(directory: Path) -> None:
+    profiles = sorted(directory.glob("*.prof"))
+    for stale in profiles[: max(0, len(profiles) - settings.PROFILING_MAX_FILES)]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".json").unlink(missing_ok=True)
+
+
+def load_index() -> list[dict[str, Any]]:
+    """Returns the metadata of every stored profile, oldest first, with its `.prof` path."""
+    entries = []
+    for meta_path in sorted(profile_dir().glob("*.json")):
+        prof_path = meta_path.with_suffix(".prof")
+        if not prof_path.exists():
+            continue
+        entry = json.loads(meta_path.read_text())
+        entry["profile_path"] = str(prof_path)
+        entries.append(entry)
+    return entries
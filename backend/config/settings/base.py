@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # ============================================================================
@@ -23,28 +24,159 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "config.middleware.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "config.middleware.StatelessAwareSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "config.middleware.StatelessAwareCsrfViewMiddleware",
+    "config.middleware.StatelessAwareAuthenticationMiddleware",
+    "config.middleware.StatelessAwareMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_prometheus.middleware.PrometheusAfterMiddleware",
 ]
 
+# Routes that are anonymous and never read or write a session. The session, auth,
+# messages and CSRF middleware become pass-throughs for these prefixes (see
+# config/middleware.py); the admin keeps the full stack.
+STATELESS_ROUTE_PREFIXES = [
+    "/api/trivia/",
+    "/api/ai-quiz/",
+    "/health/",
+]
+
 # ============================================================================
 # REST FRAMEWORK CONFIGURATION
 # ============================================================================
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
+    # No logins on the public API, so skip DRF's session/basic auth lookups
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    # Per-IP sliding windows (see trivia/throttles.py): "api" rejects with a 429, "ai"
+    # is only spent on LLM calls and degrades grading to the deterministic tiers
+    "DEFAULT_THROTTLE_CLASSES": ["trivia.throttles.ApiRateThrottle"],
+    "DEFAULT_THROTTLE_RATES": {"api": "300/min", "ai": "60/hour"},
+}
+
+# ============================================================================
+# HEALTH CHECKS
+# ============================================================================
+# /health/detailed/ serves a snapshot refreshed by a per-worker background thread
+# every HEALTH_CHECK_INTERVAL seconds (see health_check/checks.py).
+HEALTH_CHECK_INTERVAL = 15  # seconds
+HEALTH_CHECK_BACKGROUND = True
+
+# ============================================================================
+# REQUEST PROFILING
+# ============================================================================
+# Requests are profiled only with a signed X-Profile-Token header or when sampled.
+# Dumps go to PROFILING_DIR (bounded to PROFILING_MAX_FILES); `manage.py profiles`
+# summarizes them by route.
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "profiles"))
+PROFILING_MAX_FILES = 200
+PROFILING_TOKEN_MAX_AGE = 3600  # seconds
+
+# ============================================================================
+# LLM PROVIDER CONFIGURATION
+# ============================================================================
+# "gemini" talks to Google's API; "local" is the offline stand-in used for CI,
+# benchmarks and load tests (see trivia/llm_providers.py).
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_PROVIDER_OPTIONS = {
+    "local": {
+        "latency_ms": float(os.getenv("LLM_LOCAL_LATENCY_MS", "0")),
+        "latency_jitter_ms": float(os.getenv("LLM_LOCAL_LATENCY_JITTER_MS", "0")),
+        "error_rate": float(os.getenv("LLM_LOCAL_ERROR_RATE", "0")),
+        "malformed_rate": float(os.getenv("LLM_LOCAL_MALFORMED_RATE", "0")),
+        "seed": int(os.getenv("LLM_LOCAL_SEED", "0")),
+    },
 }
+LLM_BREAKER_FAILURE_THRESHOLD = 5
+LLM_BREAKER_RESET_SECONDS = 30
+# Model routing per call site, primary first, then fallbacks tried when it errors, times
+# out or has its breaker open (see ai_service.route). An empty list uses the model chosen
+# by DJANGO_ENV (GEMINI_PROD_MODEL / GEMINI_DEV_MODEL). Live grading wants the fastest
+# model; the Jenkins batch jobs can afford a stronger one
+_GRADING_MODELS = [m for m in os.getenv("LLM_GRADING_MODELS", "").split(",") if m]
+_BATCH_MODELS = [m for m in os.getenv("LLM_BATCH_MODELS", "").split(",") if m]
+LLM_ROUTES = {
+    "grade_capital": _GRADING_MODELS,
+    "grade_country": _GRADING_MODELS,
+    "fun_facts": _GRADING_MODELS,
+    "fact_batch": _BATCH_MODELS,
+    "quiz": _BATCH_MODELS,
+}
+# Seconds before a call is abandoned for the next model of its route
+LLM_ROUTE_TIMEOUTS = {
+    "grade_capital": 10,
+    "grade_country": 10,
+    "fun_facts": 10,
+    "fact_batch": 120,
+    "quiz": 300,
+}
+# Token usage per LLM call is appended to daily JSON-lines files here and summarized
+# by `manage.py llm_usage` (see trivia/llm_usage.py). Empty keeps only the metrics
+LLM_USAGE_DIR = os.getenv("LLM_USAGE_DIR", "")
+LLM_USAGE_RETENTION_DAYS = 35
+# USD per million tokens, matched on the longest model-name prefix; unlisted models
+# (like the local stand-in) are counted as free
+LLM_PRICING = {
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.00},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-flash-lite": {"input": 0.10, "output": 0.40},
+    "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
+    "gemini-2.0-flash-lite": {"input": 0.075, "output": 0.30},
+}
+# Stream Tier 3 grades and answer as soon as the verdict fields are parsed, closing the
+# stream (see ai_service._stream_with_model)
+LLM_STREAM_GRADING = os.getenv("LLM_STREAM_GRADING", "false").lower() == "true"
+
+# ============================================================================
+# IN-MEMORY TRIVIA DATA
+# ============================================================================
+# Countries, normalization indexes and question/fact id pools are held per process
+# (see trivia/registry.py). With TRIVIA_WARMUP, config/wsgi.py builds them before the
+# first request instead of on it; pools are re-read after TRIVIA_POOL_TTL seconds.
+TRIVIA_WARMUP = os.getenv("TRIVIA_WARMUP", "false").lower() == "true"
+TRIVIA_POOL_TTL = 300  # seconds
+
+# Answers the AI tier confirmed as correct are promoted into Tier 1 once approved or
+# confirmed this many times; unpromoted ones are dropped by `learned_aliases --decay`
+# after LEARNED_ALIAS_DECAY_DAYS without a sighting (see trivia/aliases.py). Confirmations
+# from cached verdicts are written in batches of LEARNED_ALIAS_HIT_FLUSH_SIZE.
+LEARNED_ALIAS_MIN_CONFIRMATIONS = 3
+LEARNED_ALIAS_DECAY_DAYS = 90
+LEARNED_ALIAS_HIT_FLUSH_SIZE = 50
+
+# Tier 3 verdicts are also written behind to the GradedAnswer table, once
+# VERDICT_STORE_FLUSH_SIZE are queued and by a timer every VERDICT_STORE_MAX_AGE seconds,
+# and read through on Redis misses (see trivia/verdict_store.py).
+VERDICT_STORE_FLUSH_SIZE = 20
+VERDICT_STORE_MAX_AGE = 30  # seconds
+
+# A shuffled round's state lives in a signed token (see trivia/game_session.py). A deal
+# shared through a prebuilt bundle is signed at build time and served for a whole period,
+# so it gets a daily period, a missed rebuild and slack.
+GAME_SESSION_MAX_AGE = 86400  # seconds
+GAME_DEAL_MAX_AGE = 3 * 86400  # seconds
+
+# ============================================================================
+# REPORTED ISSUES
+# ============================================================================
+# Issue reports are queued in the cache and bulk inserted once ISSUE_BUFFER_FLUSH_SIZE
+# are waiting or the oldest has waited ISSUE_BUFFER_MAX_AGE seconds, and by a timer every
+# ISSUE_BUFFER_MAX_AGE seconds. A repeat report of the same question/country and type
+# within ISSUE_DEDUPE_WINDOW seconds only bumps the first one's `report_count` (see
+# trivia/issue_buffer.py).
+ISSUE_BUFFER_FLUSH_SIZE = 20
+ISSUE_BUFFER_MAX_AGE = 60  # seconds
+ISSUE_DEDUPE_WINDOW = 600  # seconds
 
 # ============================================================================
 # URL CONFIGURATION
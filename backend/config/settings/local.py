@@ -23,6 +23,8 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+# Lets the frontend read the shuffled round's game token
+CORS_EXPOSE_HEADERS = ["X-Game-Token"]
 CORS_ALLOW_ALL_ORIGINS = False
 
 # CSRF Settings
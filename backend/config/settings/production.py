@@ -44,6 +44,16 @@ STATIC_ROOT = "/home/backend/django/staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/home/backend/django/mediafiles"
 
+# Request profiles and LLM usage logs live on the persistent logs volume
+PROFILING_DIR = os.getenv("PROFILING_DIR", "/home/backend/django/logs/profiles")
+LLM_USAGE_DIR = os.getenv("LLM_USAGE_DIR", "/home/backend/django/logs/llm-usage")
+
+# Build the in-memory trivia data when gunicorn loads the app, not on the first request
+TRIVIA_WARMUP = os.getenv("TRIVIA_WARMUP", "true").lower() == "true"
+
+# Answer Tier 3 grades on the verdict instead of waiting for the extra facts
+LLM_STREAM_GRADING = os.getenv("LLM_STREAM_GRADING", "true").lower() == "true"
+
 # Ensure directories exist
 os.makedirs(MEDIA_ROOT, exist_ok=True)
 os.makedirs(STATIC_ROOT, exist_ok=True)
@@ -124,15 +134,19 @@ LOGGING = {
 }
 
 # REST Framework
-REST_FRAMEWORK.update(
-    {
-        "DEFAULT_RENDERER_CLASSES": [
-            "rest_framework.renderers.JSONRenderer",
-        ],
-        "DEFAULT_PAGINATION_CLASS": None,
-        "PAGE_SIZE": None,
-    }
-)
+# A new dict rather than an update, so base.REST_FRAMEWORK stays as base.py defines it
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+    ],
+    "DEFAULT_PAGINATION_CLASS": None,
+    "PAGE_SIZE": None,
+    # Cloudflare, NPM and our nginx each append to X-Forwarded-For, so Django sees
+    # "client, cloudflare edge, npm". Throttles key on the third address from the right,
+    # the client as Cloudflare saw it, not on the spoofable leftmost entry
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "3")),
+}
 
 # Prometheus Monitoring
 PROMETHEUS_EXPORT_MIGRATIONS = False
@@ -0,0 +1,92 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.contrib.sessions.backends.cache import SessionStore
+from django.test import TestCase, override_settings
+
+from config import memory, profiling
+
+
+@override_settings(
+    SESSION_ENGINE="django.contrib.sessions.backends.cache",
+    SESSION_SAVE_EVERY_REQUEST=True,
+)
+class StatelessRouteMiddlewareTests(TestCase):
+    def test_api_routes_skip_session_and_auth(self) -> None:
+        with mock.patch.object(SessionStore, "load") as load:
+            response = self.client.get("/api/trivia/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertFalse(hasattr(response.wsgi_request, "_messages"))
+        self.assertEqual(load.call_count, 0)
+        self.assertNotIn("sessionid", response.cookies)
+
+    def test_health_routes_skip_session(self) -> None:
+        response = self.client.get("/health/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+
+    def test_stateless_post_is_not_csrf_checked(self) -> None:
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post(
+            "/api/trivia/999/check-answer/", {"user_answer": "Paris"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_other_routes_keep_full_stack(self) -> None:
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(hasattr(response.wsgi_request, "session"))
+        self.assertTrue(hasattr(response.wsgi_request, "user"))
+
+
+class RequestProfilingMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(PROFILING_DIR=self.tmp.name, PROFILING_MAX_FILES=2)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_signed_token_captures_profile(self) -> None:
+        response = self.client.get(
+            "/health/", headers={"X-Profile-Token": profiling.make_token()}
+        )
+        profile_id = response["X-Profile-Id"]
+        self.assertTrue((Path(self.tmp.name) / f"{profile_id}.prof").exists())
+        [entry] = profiling.load_index()
+        self.assertEqual(entry["route"], "health_simple")
+
+    def test_invalid_token_is_ignored(self) -> None:
+        response = self.client.get("/health/", headers={"X-Profile-Token": "forged"})
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(profiling.load_index(), [])
+
+    def test_profile_directory_is_bounded(self) -> None:
+        with self.settings(PROFILING_SAMPLE_RATE=1.0):
+            for _ in range(4):
+                self.client.get("/health/")
+        self.assertEqual(len(profiling.load_index()), 2)
+
+
+@skipUnless(Path("/proc/self/smaps_rollup").exists(), "needs Linux /proc")
+class MemoryReportTests(TestCase):
+    def test_reads_own_process_split(self) -> None:
+        usage = memory.read_smaps_rollup(os.getpid())
+        self.assertGreater(usage["rss"], 0)
+        self.assertEqual(usage["rss"], usage["shared"] + usage["private"])
+
+    def test_summary_averages_workers_only(self) -> None:
+        usage = {"rss": 100, "pss": 60, "shared": 80, "private": 20}
+        summary = memory.summarize(
+            [
+                {"pid": 1, "role": "master", **usage},
+                {"pid": 2, "role": "worker", **usage, "private": 40},
+                {"pid": 3, "role": "worker", **usage},
+            ]
+        )
+        self.assertEqual(summary["workers"], 2)
+        self.assertEqual(summary["worker_avg"]["private"], 30)
+        self.assertEqual(summary["total_pss"], 180)
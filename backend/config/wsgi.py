@@ -1,7 +1,15 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
 application = get_wsgi_application()
+
+# Only servers import this module, so management commands (migrate, load_country_data)
+# never pay for the warm-up. Under `--preload` it runs once in the gunicorn master.
+if settings.TRIVIA_WARMUP:
+    from trivia.warmup import warm_up
+
+    warm_up()
@@ -0,0 +1,48 @@
+"""
+Gunicorn hooks for the production image (Dockerfile.prod runs `--config gunicorn.conf.py`).
+
+With `--preload` the master imports `config.wsgi` before forking, which runs the trivia
+warm-up (countries, aliases, normalization indexes, fuzzy choice lists, id pools) and the
+URLconf import, so workers start with those pages shared copy-on-write.
+
+Sharing only lasts while nothing writes to the pages. CPython's cyclic GC writes to every
+tracked object header it scans, so the first collection in each worker would copy most of
+the preloaded heap. `gc.freeze()` moves everything alive in the master into a permanent
+generation the collector ignores.
+
+Set GUNICORN_GC_FREEZE=false to compare; `manage.py memory_report` shows the per-worker
+shared/private split either way.
+
+A worker exiting (a restart, a deploy, `max_requests`) first writes out the AI verdicts
+still queued in its write-behind buffer (see trivia/verdict_store.py) and the learned-alias
+confirmations it counted from cached verdicts (see trivia/aliases.py).
+"""
+
+import gc
+import os
+
+
+def when_ready(server):
+    if os.getenv("GUNICORN_GC_FREEZE", "true").lower() != "true":
+        server.log.info("gc.freeze() disabled by GUNICORN_GC_FREEZE.")
+        return
+
+    # Collect first so garbage from the preload is freed, not frozen forever
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"gc.freeze(): {gc.get_freeze_count()} objects frozen before fork.")
+
+
+def worker_exit(server, worker):
+    from trivia import aliases, verdict_store
+
+    try:
+        written = verdict_store.flush()
+        confirmed = aliases.flush_hits()
+    except Exception as e:
+        server.log.error(f"Could not flush queued verdicts: {e}")
+        return
+    if written or confirmed:
+        server.log.info(
+            f"Flushed {written} queued verdict(s) and {confirmed} alias confirmation(s) on exit."
+        )
@@ -0,0 +1,217 @@
+"""
+Background dependency checks for the detailed health endpoint.
+
+Why a background monitor?:
+- Probes can arrive every few seconds from Docker, NPM and Prometheus. Running a DB query,
+  a Redis round trip and a filesystem stat per probe adds load exactly when the box is
+  struggling, and a slow dependency makes the probe itself time out.
+- Instead, each worker runs the registered checks on a daemon thread every
+  `HEALTH_CHECK_INTERVAL` seconds and swaps the result into a module-level snapshot.
+  `health_detailed` only reads that snapshot, which is O(1) and never blocks.
+
+Every check reports its own latency, which is also exported as a Prometheus gauge. Checks
+registered with `critical=False` can warn but never turn the endpoint into a 503.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+CHECK_LATENCY = Gauge(
+    "health_check_latency_seconds",
+    "Latency of the most recent run of each health check.",
+    ["check"],
+)
+CHECK_HEALTHY = Gauge(
+    "health_check_healthy",
+    "1 if the most recent run of the check was healthy, else 0.",
+    ["check"],
+)
+
+CheckFunc = Callable[[], dict[str, Any]]
+CHECKS: dict[str, tuple[CheckFunc, bool]] = {}
+
+
+def register(name: str, critical: bool = True) -> Callable[[CheckFunc], CheckFunc]:
+    def decorator(func: CheckFunc) -> CheckFunc:
+        CHECKS[name] = (func, critical)
+        return func
+
+    return decorator
+
+
+@register("database")
+def check_database() -> dict[str, Any]:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return {"status": "healthy"}
+
+
+@register("cache")
+def check_cache() -> dict[str, Any]:
+    # A full write/read round trip: in production this is the Redis latency
+    cache.set("health_check_probe", "ok", timeout=60)
+    if cache.get("health_check_probe") != "ok":
+        return {"status": "unhealthy", "error": "cache round trip failed"}
+    return {"status": "healthy"}
+
+
+@register("warm_data", critical=False)
+def check_warm_data() -> dict[str, Any]:
+    # A cold structure is rebuilt by the next request that needs it, at its expense
+    from trivia import registry
+
+    cold = [
+        name
+        for name, built in [
+            ("country_registry", registry._registry is not None),
+            ("question_pools", registry.question_pools._pools is not None),
+            ("fact_pools", registry.fact_pools._pools is not None),
+        ]
+        if not built
+    ]
+    if cold:
+        return {"status": "warning", "message": f"not built: {', '.join(cold)}"}
+    return {"status": "healthy"}
+
+
+@register("llm", critical=False)
+def check_llm() -> dict[str, Any]:
+    # Reads local state only; probing the real model would cost money on every run
+    from trivia.llm_providers import breaker_states, get_provider
+
+    provider = get_provider()
+    # One breaker per routed model; the worst one is the headline state
+    breakers = breaker_states()
+    breaker_state = max(
+        breakers.values(), key=["closed", "half_open", "open"].index, default="closed"
+    )
+    healthy = provider.is_available() and breaker_state == "closed"
+    return {
+        "status": "healthy" if healthy else "warning",
+        "provider": provider.name,
+        "available": provider.is_available(),
+        "breaker": breaker_state,
+        "breakers": breakers,
+    }
+
+
+@register("issue_buffer", critical=False)
+def check_issue_buffer() -> dict[str, Any]:
+    # Queued bug reports are flushed by traffic; a backlog this old means flushes fail
+    from trivia import issue_buffer
+
+    age = issue_buffer.oldest_age()
+    result = {"status": "healthy", "pending": issue_buffer.pending()}
+    if age is not None and age > settings.ISSUE_BUFFER_MAX_AGE * 10:
+        result.update(status="warning", message=f"oldest report queued {round(age)}s ago")
+    return result
+
+
+@register("static_files", critical=False)
+def check_static_files() -> dict[str, Any]:
+    static_root = getattr(settings, "STATIC_ROOT", None)
+    if static_root and os.path.exists(static_root):
+        return {"status": "healthy"}
+    return {"status": "warning", "message": "static files not found"}
+
+
+def run_checks() -> dict[str, Any]:
+    snapshot: dict[str, Any] = {
+        "status": "healthy",
+        "timestamp": time.time(),
+        "service": "trivia-backend",
+        "checks": {},
+    }
+
+    for name, (func, critical) in CHECKS.items():
+        start = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            result = {"status": "unhealthy", "error": str(e)}
+        latency = time.perf_counter() - start
+
+        result["latency_ms"] = round(latency * 1000, 3)
+        snapshot["checks"][name] = result
+        CHECK_LATENCY.labels(check=name).set(latency)
+        CHECK_HEALTHY.labels(check=name).set(1 if result["status"] == "healthy" else 0)
+
+        if critical and result["status"] == "unhealthy":
+            snapshot["status"] = "unhealthy"
+
+    return snapshot
+
+
+class HealthMonitor:
+    """
+    Owns the latest snapshot and the daemon thread refreshing it.
+
+    The thread is started lazily by the first probe of each process (and restarted if the
+    pid changed), because threads do not survive gunicorn's fork after `--preload`.
+    """
+
+    def __init__(self) -> None:
+        self.snapshot: dict[str, Any] | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def get_snapshot(self) -> dict[str, Any]:
+        interval = settings.HEALTH_CHECK_INTERVAL
+        if settings.HEALTH_CHECK_BACKGROUND:
+            self._ensure_started()
+
+        snapshot = self.snapshot
+        if snapshot is None or (
+            not settings.HEALTH_CHECK_BACKGROUND
+            and time.time() - snapshot["timestamp"] > interval
+        ):
+            snapshot = self.refresh()
+
+        # A dead or wedged refresher must not keep reporting an old "healthy"
+        age = time.time() - snapshot["timestamp"]
+        if age > interval * 3:
+            snapshot = {**snapshot, "status": "unhealthy", "stale_seconds": round(age)}
+        return snapshot
+
+    def refresh(self) -> dict[str, Any]:
+        snapshot = run_checks()
+        self.snapshot = snapshot
+        return snapshot
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.snapshot = None
+            threading.Thread(
+                target=self._run_forever, name="health-monitor", daemon=True
+            ).start()
+
+    def _run_forever(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Health monitor run failed: {e}")
+            finally:
+                # The thread owns its own DB connection; honour CONN_MAX_AGE like a request
+                close_old_connections()
+            time.sleep(settings.HEALTH_CHECK_INTERVAL)
+
+
+monitor = HealthMonitor()
@@ -1,6 +1,12 @@
-from django.test import SimpleTestCase
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 
+from health_check import checks
+from health_check.checks import monitor
+
 
 class HealthCheckTests(SimpleTestCase):
     def test_health_check(self) -> None:
@@ -9,3 +15,41 @@ class HealthCheckTests(SimpleTestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"status": "ok"})
+
+
+@override_settings(HEALTH_CHECK_BACKGROUND=False)
+class DetailedHealthCheckTests(TestCase):
+    def setUp(self) -> None:
+        monitor.snapshot = None
+
+    def test_reports_every_check_with_latency(self) -> None:
+        response = self.client.get(reverse("health_detailed"))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            set(data["checks"]),
+            {"database", "cache", "warm_data", "llm", "issue_buffer", "static_files"},
+        )
+        self.assertIn("latency_ms", data["checks"]["cache"])
+        self.assertIn("breaker", data["checks"]["llm"])
+
+    def test_probes_reuse_the_snapshot(self) -> None:
+        self.client.get(reverse("health_detailed"))
+        with mock.patch.object(checks, "run_checks") as run_checks:
+            self.client.get(reverse("health_detailed"))
+        run_checks.assert_not_called()
+
+    def test_critical_failure_returns_503(self) -> None:
+        with mock.patch.dict(
+            checks.CHECKS, {"database": (mock.Mock(side_effect=OSError("down")), True)}
+        ):
+            response = self.client.get(reverse("health_detailed"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["database"]["error"], "down")
+
+    @override_settings(HEALTH_CHECK_BACKGROUND=True)
+    def test_stale_snapshot_is_unhealthy(self) -> None:
+        monitor.snapshot = {"status": "healthy", "timestamp": time.time() - 3600, "checks": {}}
+        with mock.patch.object(monitor, "_ensure_started"):
+            response = self.client.get(reverse("health_detailed"))
+        self.assertEqual(response.status_code, 503)
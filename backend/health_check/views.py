@@ -1,56 +1,22 @@
 from django.http import JsonResponse, HttpRequest
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.db import connection
-from django.conf import settings
-import time
-import os
+
+from .checks import monitor
 
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def health_detailed(request: HttpRequest) -> JsonResponse:
     """
-    Comprehensive health check for production monitoring
-    """
-    from typing import Any
-    health_data: dict[str, Any] = {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "service": "trivia-backend",
-        "checks": {},
-    }
-
-    overall_status = 200
-
-    # Database check
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-        health_data["checks"]["database"] = {"status": "healthy"}
-    except Exception as e:
-        health_data["checks"]["database"] = {"status": "unhealthy", "error": str(e)}
-        overall_status = 503
+    Comprehensive health check for production monitoring.
 
-    # Static files check
-    try:
-        static_root = getattr(settings, "STATIC_ROOT", None)
-        if static_root and os.path.exists(static_root):
-            health_data["checks"]["static_files"] = {"status": "healthy"}
-        else:
-            health_data["checks"]["static_files"] = {
-                "status": "warning",
-                "message": "static files not found",
-            }
-    except Exception as e:
-        health_data["checks"]["static_files"] = {"status": "unhealthy", "error": str(e)}
-
-    # Set overall status
-    if overall_status != 200:
-        health_data["status"] = "unhealthy"
-
-    return JsonResponse(health_data, status=overall_status)
+    Returns the latest snapshot from the background monitor (see `checks.py`) instead
+    of touching the DB, Redis and disk on every probe.
+    """
+    snapshot = monitor.get_snapshot()
+    status = 200 if snapshot["status"] == "healthy" else 503
+    return JsonResponse(snapshot, status=status)
 
 
 @csrf_exempt
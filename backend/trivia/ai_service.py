@@ -1,13 +1,36 @@
-from trivia.models import QuizTopic, CountryFunFact, Country
+from trivia.models import QuizTopic, QuizQuestion, CountryFunFact, Country
 import os
-import google.generativeai as genai
 import logging
 import json
+import random
 import re
-import hashlib
+import time
+from collections.abc import Callable, Iterable
 from typing import Any
+from django.conf import settings
 from django.core.cache import cache
 from rapidfuzz import fuzz
+from trivia import (
+    aliases,
+    llm_output,
+    llm_usage,
+    metrics,
+    phonetics,
+    registry,
+    verdict_store,
+)
+from trivia.json_stream import JSONObjectStream
+from trivia.normalization import (
+    COMMON_COUNTRY_ALIASES,
+    normalize_string as _normalize_string,
+)
+from trivia.llm_providers import (
+    LLMTimeoutError,
+    LLMUnavailableError,
+    LLMUsage,
+    get_breaker,
+    get_provider,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,130 +49,438 @@ else:
 
 logger.info(f"AI Service Initialized. Using model: {ACTIVE_MODEL_NAME}")
 
-# Configure the Gemini API
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    logger.warning(
-        "GEMINI_API_KEY environment variable not set. AI features will be disabled."
-    )
-else:
-    try:
-        genai.configure(api_key=api_key)
-    except Exception as e:
-        logger.error(f"Failed to configure Gemini AI: {e}")
-
 # --- Shared Helpers & Normalization ---
 
-# 1. Define aliases grouped by the official name (easier to read and maintain)
-COUNTRY_ALIASES_GROUPED = {
-    "united states": ["usa", "us", "america", "united states of america"],
-    "united kingdom": ["uk", "great britain", "britain", "england"],
-    "saint vincent and the grenadines": ["saint vincent", "st vincent", "svg"],
-    "antigua and barbuda": ["antigua", "barbuda"],
-    "the bahamas": ["bahamas"],
-    "bosnia and herzegovina": ["bosnia", "herzegovina"],
-    "democratic republic of the congo": ["drc", "dr congo", "congo-kinshasa"],
-    "republic of the congo": ["congo-brazzaville", "congo republic"],
-    "dominican republic": ["dr"],
-    "sao tome and principe": ["sao tome", "principe"],
-    "trinidad and tobago": ["trinidad", "tobago"],
-    "united arab emirates": ["uae", "emirates"],
-    "central african republic": ["car"],
-    "the gambia": ["gambia"],
-    "saint kitts and nevis": ["saint kitts", "st kitts", "nevis"],
-    "cote d'ivoire": ["ivory coast"],
-    "north macedonia": ["macedonia"],
-}
-
-# 2. Dynamically flatten it into a fast lookup dictionary: {"usa": "united states", ...}
-COMMON_COUNTRY_ALIASES = {
-    alias: canonical_name
-    for canonical_name, aliases in COUNTRY_ALIASES_GROUPED.items()
-    for alias in aliases
-}
-
-
-def _normalize_string(s: str) -> str:
-    """Removes punctuation and expands common abbreviations."""
-    s = s.strip().lower()
-    # Remove common punctuation
-    s = re.sub(r"[',.-]", "", s)
-    # Expand "st" to "saint" (word boundary \b ensures we don't change words like "state")
-    s = re.sub(r"\bst\b", "saint", s)
-    s = s.replace(" & ", " and ")
-    return s.strip()
-
+# Minimum RapidFuzz token_sort_ratio for Tier 2 to accept an answer.
+# See the `trivia_fuzzy_best_score` histogram before tuning this.
+FUZZY_MATCH_THRESHOLD = 85
 
 def get_all_capitals_map() -> dict[str, list[str]]:
     """
     Constructs a reverse mapping of capital cities to their corresponding countries.
 
     This mapping is critical for evaluating edge cases where multiple countries share the
-    same capital city name. To avoid full table scans on the Country model for every
-    grading request, the resulting dictionary is cached in Redis with a 24-hour timeout.
+    same capital city name. It is served from the in-process country registry (built
+    once per worker, usually by the startup warm-up), so grading never scans the Country
+    table or makes a Redis round trip for it.
     """
-    capital_map = cache.get("all_capitals_map")
-    if capital_map is not None:
-        return capital_map
-
-    capital_map = {}
     try:
-        for country in Country.objects.all():
-            capitals = country.capital.split("|")
-            for capital in capitals:
-                c_name = capital.strip().lower()
-                if c_name not in capital_map:
-                    capital_map[c_name] = []
-                capital_map[c_name].append(country.name)
-        cache.set("all_capitals_map", capital_map, timeout=86400)
-        return capital_map
+        return registry.get_registry().capital_map
     except Exception as e:
         logger.error(f"Error building capital map (is DB migrated?): {e}")
         return {}
 
 
+# Separators between several capitals in one answer: "Pretoria, Cape Town & Bloemfontein"
+MULTI_ANSWER_SEPARATORS = re.compile(r"\s*(?:,|;|/|&|\+|\band\b)\s*", re.IGNORECASE)
+
+
+def _grade_capital_parts(
+    country_name: str, correct_capitals_list: list[str], user_answer_str: str
+) -> dict[str, Any] | None:
+    """
+    Deterministic partial-credit grading for countries with several capitals.
+
+    Splits the answer on MULTI_ANSWER_SEPARATORS and resolves each part through the
+    exact, learned alias, fuzzy and phonetic checks. A part naming some other capital,
+    country or notable city is a deterministic incorrect guess. Returns the same shape the
+    AI prompt produces, or None when a part is unresolved and the answer needs the LLM.
+    """
+    parts = [p for p in MULTI_ANSWER_SEPARATORS.split(user_answer_str) if p.strip()]
+    if len(parts) < 2:
+        return None
+
+    try:
+        reg = registry.get_registry()
+    except Exception as e:
+        logger.error(f"Skipping multi-capital parsing, registry unavailable: {e}")
+        return None
+
+    lower_correct_options = [_normalize_string(c) for c in correct_capitals_list]
+    matched: dict[int, str] = {}  # Capital index -> weakest tier that matched it
+    incorrect: list[str] = []
+    for part in parts:
+        normalized = _normalize_string(part)
+        learned = aliases.lookup("capital", country_name, normalized)
+        scores = [fuzz.token_sort_ratio(normalized, opt) for opt in lower_correct_options]
+
+        if normalized in lower_correct_options:
+            idx, method = lower_correct_options.index(normalized), "deterministic"
+        elif learned and _normalize_string(learned) in lower_correct_options:
+            idx, method = lower_correct_options.index(_normalize_string(learned)), "deterministic"
+        elif max(scores) >= FUZZY_MATCH_THRESHOLD:
+            idx, method = scores.index(max(scores)), "fuzzy"
+        elif (idx := _phonetic_match(normalized, lower_correct_options, "capital")) is not None:
+            method = "phonetic"
+        elif normalized in reg.capital_index or normalized in reg.country_index or (
+            normalized in reg.notable_cities
+        ):
+            incorrect.append(part.strip())
+            continue
+        else:
+            return None  # e.g. "Joburg": only the LLM can judge it
+
+        if idx not in matched or method != "deterministic":
+            matched[idx] = method
+
+    correct = [correct_capitals_list[i] for i in sorted(matched)]
+    missed = [c for i, c in enumerate(correct_capitals_list) if i not in matched]
+    capital_count = len(correct_capitals_list)
+    all_capitals = ", ".join(correct_capitals_list)
+
+    if not correct:
+        msg = f"Incorrect 😔. The correct capitals are {all_capitals}."
+    elif not missed:
+        msg = f"Correct! The {capital_count} capitals of {country_name} are {all_capitals}. You got them all!"
+    else:
+        msg = (
+            f"Partially correct! You found {len(correct)} of the {capital_count} capitals: "
+            f"{', '.join(correct)}. The capital cities of {country_name} are {all_capitals}."
+        )
+
+    shared_with = sorted(
+        {c for cap in correct for c in reg.capital_map.get(cap.lower(), []) if c != country_name}
+    )
+    methods = set(matched.values())
+    return {
+        "is_correct": bool(correct),
+        "all_capitals_guessed": not missed,
+        "correct_guesses": correct,
+        "incorrect_guesses": incorrect,
+        "missed_capitals": missed,
+        "points_awarded": 1 if correct else 0,
+        "shared_capital_info": shared_with or None,
+        "feedback_message": msg,
+        # Labelled by the loosest check any part needed
+        "grading_method": next(
+            (m for m in ("phonetic", "fuzzy") if m in methods), "deterministic"
+        ),
+    }
+
+
+# Shorter country aliases ("uk", "dr", "car") may be an abbreviation or a partial answer
+# Tier 3 would accept, so they don't rule an answer out on their own
+MIN_PLACE_ALIAS_LENGTH = 5
+
+
+def _other_place_note(
+    normalized_user: str, game_mode: str, question_countries: list[str]
+) -> str | None:
+    """
+    Says what the answer is when it names a known place unrelated to the question: another
+    country's capital ("Abuja"), a country ("Nigeria") or a notable city ("Lagos").
+
+    Such answers are wrong however lenient the judge, so they're graded without the AI tier.
+    Places that belong to one of `question_countries` return None and stay with Tier 3
+    ("Kuwait" for Kuwait City, "Kuwait City" for the country of Kuwait City), and so do
+    country aliases shorter than MIN_PLACE_ALIAS_LENGTH.
+    """
+    try:
+        reg = registry.get_registry()
+    except Exception as e:
+        logger.error(f"Skipping known place check, registry unavailable: {e}")
+        return None
+
+    capital_of = [c.name for c in reg.capital_index.get(normalized_user, [])]
+    country = reg.country_index.get(normalized_user)
+    if (
+        country
+        and normalized_user != _normalize_string(country.name)
+        and len(normalized_user) < MIN_PLACE_ALIAS_LENGTH
+    ):
+        country = None
+    city, city_country = reg.notable_cities.get(normalized_user, (None, None))
+
+    if capital_of and not set(capital_of) & set(question_countries):
+        capital = next(
+            cap
+            for cap in reg.by_name[capital_of[0]].capitals
+            if _normalize_string(cap) == normalized_user
+        )
+        if game_mode == "country":
+            return f"{capital} is a capital city ({', '.join(capital_of)}), not a country."
+        return f"{capital} is the capital of {', '.join(capital_of)}."
+    if country and country.name not in question_countries:
+        capitals = ", ".join(country.capitals)
+        if game_mode == "country":
+            return f"The capital of {country.name} is {capitals}."
+        return f"{country.name} is a country (its capital is {capitals})."
+    if city and city_country:
+        suffix = "not a country" if game_mode == "country" else "not its capital"
+        return f"{city} is a city in {city_country.name}, {suffix}."
+    return None
+
+
+def _phonetic_match(normalized_user: str, candidates: list[str], game_mode: str) -> int | None:
+    """Runs the phonetic tier against the registry's precomputed keys (see trivia/phonetics.py)."""
+    try:
+        reg = registry.get_registry()
+    except Exception as e:
+        logger.error(f"Skipping phonetic tier, registry unavailable: {e}")
+        return None
+
+    index = reg.capital_phonetic_index if game_mode == "capital" else reg.country_phonetic_index
+    with metrics.time_tier("phonetic", game_mode):
+        return phonetics.phonetic_match(normalized_user, candidates, reg.phonetic_keys, index)
+
+
+def llm_available() -> bool:
+    """Whether the configured LLM provider can be called at all (e.g. has an API key)."""
+    return get_provider().is_available()
 
-def _generate_ai_json(prompt: str, temperature: float = 0.0, max_tokens: int = 4096) -> dict[str, Any]:
+
+def route(task: str) -> list[str]:
+    """The models for a call site, primary first (`settings.LLM_ROUTES`)."""
+    return list(settings.LLM_ROUTES.get(task) or [str(ACTIVE_MODEL_NAME)])
+
+
+def _model_version(model: str) -> str:
+    """A model as its verdicts are stored: the local stand-in's never pass for a real model's."""
+    return get_provider().model_label(model)
+
+
+def _model_versions(task: str) -> list[str]:
+    return [_model_version(model) for model in route(task)]
+
+
+def _with_fallbacks(
+    task: str, attempt: Callable[[str, float | None], Any]
+) -> tuple[str, Any]:
     """
-    Centralized helper to interact with the Gemini API and return parsed JSON.
+    Runs `attempt(model, timeout)` down the task's route until one model answers, and
+    returns that model with its result.
+
+    A model whose breaker is open is skipped without a call; a failure (an error, a
+    timeout or unparseable output) is counted against its breaker and the next model is
+    tried. Raises the last error, or `LLMUnavailableError` when no model was tried.
+    """
+    timeout = settings.LLM_ROUTE_TIMEOUTS.get(task)
+    models = route(task)
+    error: Exception | None = None
+    for model in models:
+        breaker = get_breaker(model)
+        if not breaker.allow():
+            continue
+        try:
+            result = attempt(model, timeout)
+        except Exception as e:
+            breaker.record_failure()
+            logger.warning(f"LLM call {task} failed on {model}: {e}")
+            error = e
+            continue
+        breaker.record_success()
+        if model != models[0]:
+            metrics.LLM_FALLBACKS.labels(task=task, model=model).inc()
+        return model, result
+    raise error or LLMUnavailableError(f"LLM circuit breakers are open for {task}.")
+
+
+def _generate_ai_json(
+    prompt: str,
+    temperature: float = 0.0,
+    max_tokens: int = 4096,
+    task: str = "default",
+    context: dict[str, Any] | None = None,
+) -> Any:
+    """
+    Centralized helper to interact with the configured LLM provider and return parsed JSON.
     
     Why we need this:
     - Consistency: Enforces the same generation config (like enforcing JSON output) across all AI calls.
-    - Error Handling: Centralizes the stripping of markdown code blocks (` ```json `) which LLMs often prepend
-      even when instructed to return raw JSON.
+    - Error Handling: Each `task` has a response schema that is sent to the model and checked on
+      the way back; fenced, truncated or partly malformed JSON is repaired locally rather than
+      discarded (see `trivia.llm_output`).
+    - Routing: Each `task` has its own models and timeout (see `route`); when the primary
+      errors, times out or has its breaker open, the next model is tried.
+    - Accounting: Every call's tokens, latency and model are recorded under its `task`
+      (see `trivia.llm_usage`).
       
     How it works:
-    - Configures Gemini to use `application/json` as the `response_mime_type`.
-    - Generates the text, strips markdown artifacts, and safely parses the string into a Python dictionary.
+    - Delegates generation to `get_provider()` (Gemini, or the offline stand-in), tagging the call
+      with its `task` and structured `context`.
+    - Parses the returned text with `llm_output.parse`; output that can't be repaired fails the
+      attempt like a provider error, and the next model of the route is tried.
     """
-    generation_config = {
-        "temperature": temperature,
-        "top_p": 1,
-        "top_k": 1,
-        "max_output_tokens": max_tokens,
-        "response_mime_type": "application/json",
-    }
-    model = genai.GenerativeModel(
-        model_name=str(ACTIVE_MODEL_NAME),
-        generation_config=generation_config,  # type: ignore
-    )
-    response = model.generate_content(prompt)
-    response_text = response.text.strip().replace("```json", "").replace("```", "")
-    return json.loads(response_text)
+    return _generate_with_model(prompt, temperature, max_tokens, task, context)[1]
+
+
+def _generate_with_model(
+    prompt: str,
+    temperature: float = 0.0,
+    max_tokens: int = 4096,
+    task: str = "default",
+    context: dict[str, Any] | None = None,
+) -> tuple[str, Any]:
+    """`_generate_ai_json`, also returning the model that answered."""
+
+    def attempt(model: str, timeout: float | None) -> Any:
+        start = time.perf_counter()
+        response = None
+        try:
+            with metrics.time_llm_request():
+                response = get_provider().generate(
+                    prompt,
+                    task=task,
+                    model_name=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    context=context,
+                    timeout=timeout,
+                    schema=llm_output.provider_schema(task),
+                )
+                result = llm_output.parse(task, response.text)
+        except Exception as e:
+            output = response.text if response else ""
+            usage = response.usage if response else None
+            _record_usage(task, model, prompt, output, usage, start, _failure_status(e))
+            raise
+        _record_usage(task, model, prompt, response.text, response.usage, start, "ok")
+        return result
+
+    return _with_fallbacks(task, attempt)
+
+
+def _failure_status(error: Exception) -> str:
+    return "timeout" if isinstance(error, LLMTimeoutError) else "error"
+
+
+def _record_usage(
+    task: str,
+    model: str,
+    prompt: str,
+    output: str,
+    usage: LLMUsage | None,
+    start: float,
+    status: str,
+) -> None:
+    """Accounts one call, estimating the tokens when the provider reported none."""
+    if usage is None:
+        usage = LLMUsage.estimate(get_provider().model_label(model), prompt, output)
+    llm_usage.record(task, usage, time.perf_counter() - start, status)
+
+
+def _stream_with_model(
+    prompt: str,
+    ready: Iterable[str],
+    temperature: float = 0.0,
+    max_tokens: int = 4096,
+    task: str = "default",
+    context: dict[str, Any] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Streamed variant of `_generate_with_model` for prompts answered with one JSON object.
+
+    Returns the model that answered and the fields parsed so far, as soon as every field
+    in `ready` is complete (e.g. the verdict and `feedback_message` of a grade); the rest
+    of the stream is not waited for. Routed and falls back like `_generate_ai_json`;
+    raises if every model fails, or cuts the stream off before the `ready` fields.
+    """
+    ready = tuple(ready)
+
+    def attempt(model: str, timeout: float | None) -> dict[str, Any]:
+        parser = JSONObjectStream()
+        start = time.perf_counter()
+        chunks = get_provider().stream(
+            prompt,
+            task=task,
+            model_name=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            context=context,
+            timeout=timeout,
+            schema=llm_output.provider_schema(task),
+        )
+        text: list[str] = []
+        usage: LLMUsage | None = None  # As reported by the latest chunk carrying it
+        try:
+            with metrics.time_llm_request():
+                for chunk in chunks:
+                    text.append(chunk.text)
+                    usage = chunk.usage or usage
+                    parser.feed(chunk.text)
+                    if parser.has(ready) or parser.complete:
+                        break
+                # A complete object missing an optional field is still a usable answer
+                if not parser.complete and not parser.has(ready):
+                    raise ValueError(
+                        f"Stream ended before the fields {ready} were complete."
+                    )
+                # Only a finished object has to have all of its schema's fields
+                llm_output.validate(task, parser.fields, partial=not parser.complete)
+        except Exception as e:
+            chunks.close()
+            _record_usage(
+                task, model, prompt, "".join(text), usage, start, _failure_status(e)
+            )
+            raise
+        metrics.LLM_STREAM_SECONDS.labels(stage="ready").observe(
+            time.perf_counter() - start
+        )
+        chunks.close()
+        _record_usage(task, model, prompt, "".join(text), usage, start, "ok")
+        return dict(parser.fields)
+
+    return _with_fallbacks(task, attempt)
+
+
+def harvest_facts(country_id: int, facts: Iterable[str], origin: str) -> int:
+    """Stores LLM-generated facts for a country; returns how many were new."""
+    harvest_count = 0
+    for fact_text in facts:
+        _, created = CountryFunFact.objects.get_or_create(
+            country_id=country_id,
+            fact_text=fact_text,
+            defaults={"is_ai_generated": True, "source": "user"},
+        )
+        if created:
+            harvest_count += 1
+    if harvest_count > 0:
+        metrics.FACTS_HARVESTED.labels(origin=origin).inc(harvest_count)
+    return harvest_count
+
+
+# Fields a streamed grade is answered on
+CAPITAL_VERDICT_FIELDS = (
+    "is_correct",
+    "all_capitals_guessed",
+    "correct_guesses",
+    "incorrect_guesses",
+    "missed_capitals",
+    "points_awarded",
+    "shared_capital_info",
+    "feedback_message",
+)
+COUNTRY_VERDICT_FIELDS = ("is_correct", "feedback_message")
+# Room for the verdict JSON of either grading prompt, which asks for no extra facts
+GRADING_MAX_TOKENS = 512
 
 
 # --- Feature 1: "Guess the Capital" Grader ---
 
 
-def grade_capital_answer(country_name: str, correct_capitals_str: str, user_answer_str: str) -> dict[str, Any]:
+def grade_capital_answer(
+    country_name: str,
+    correct_capitals_str: str,
+    user_answer_str: str,
+    allow_ai: bool = True,
+    ai_budget: Callable[[], bool] | None = None,
+    client: str | None = None,
+) -> dict[str, Any]:
     """
     Evaluates a user's guess for the capital of a given country using a multi-tiered architecture.
 
     Tier 1 (Deterministic): Immediate lookup against exact or normalized strings.
     Tier 2 (Fuzzy Match): Levenshtein distance evaluation via RapidFuzz.
+    Tier 2.5 (Phonetic Match): Same-sounding spellings via precomputed phonetic keys.
     Tier 3 (AI Evaluation): Delegates to Gemini AI for semantic edge cases. The results are
                             persistently cached in Redis by a hash of the answer to drastically
-                            reduce API costs and latency for repeated identical guesses.
+                            reduce API costs and latency for repeated identical guesses, and
+                            kept durably in the GradedAnswer table behind it.
+
+    With `allow_ai=False` Tier 3 is skipped and an unresolved answer gets the hard fallback.
+    `ai_budget` is asked right before an LLM call (after the verdict cache); when it says
+    no, the answer gets the same fallback (see trivia/throttles.py). `client` identifies
+    the player, so a learned alias is only confirmed once per client (trivia/aliases.py).
     """
     correct_capitals_list = [c.strip() for c in correct_capitals_str.split("|")]
 
@@ -178,10 +509,18 @@ def grade_capital_answer(country_name: str, correct_capitals_str: str, user_answ
     all_capitals_map = get_all_capitals_map()
 
     # TIER 1: Deterministic Check
-    if normalized_user in lower_correct_options:
-        actual_capital_cased = correct_capitals_list[
-            lower_correct_options.index(normalized_user)
-        ]
+    with metrics.time_tier("deterministic", "capital"):
+        is_exact_match = normalized_user in lower_correct_options
+        if not is_exact_match:
+            # An answer the AI tier already confirmed for this country (trivia/aliases.py)
+            learned = aliases.lookup("capital", country_name, normalized_user)
+            if learned and _normalize_string(learned) in lower_correct_options:
+                normalized_user = _normalize_string(learned)
+                is_exact_match = True
+
+    def matched_result(
+        actual_capital_cased: str, missed_capitals: list[str], method: str
+    ) -> dict[str, Any]:
         shared_with = [
             c
             for c in all_capitals_map.get(actual_capital_cased.lower(), [])
@@ -192,84 +531,141 @@ def grade_capital_answer(country_name: str, correct_capitals_str: str, user_answ
         if shared_with:
             msg += f" (It's also the capital of {', '.join(shared_with)})"
 
-        return {
-            "is_correct": True,
-            "all_capitals_guessed": capital_count == 1,
-            "correct_guesses": [user_answer_str],
-            "incorrect_guesses": [],
-            "missed_capitals": [
+        return metrics.record_grading(
+            {
+                "is_correct": True,
+                "all_capitals_guessed": capital_count == 1,
+                "correct_guesses": [user_answer_str],
+                "incorrect_guesses": [],
+                "missed_capitals": missed_capitals,
+                "points_awarded": 1,
+                "shared_capital_info": shared_with if shared_with else None,
+                "feedback_message": msg,
+                "grading_method": method,
+            },
+            "capital",
+        )
+
+    if is_exact_match:
+        return matched_result(
+            correct_capitals_list[lower_correct_options.index(normalized_user)],
+            [
                 c
                 for c in correct_capitals_list
                 if _normalize_string(c) != normalized_user
             ],
-            "points_awarded": 1,
-            "shared_capital_info": shared_with if shared_with else None,
-            "feedback_message": msg,
-            "grading_method": "deterministic",
-        }
+            "deterministic",
+        )
+
+    # TIER 1b: Several capitals in one answer ("Pretoria, Cape Town")
+    if capital_count > 1:
+        with metrics.time_tier("deterministic", "capital"):
+            parts_result = _grade_capital_parts(
+                country_name, correct_capitals_list, user_answer_str
+            )
+        if parts_result is not None:
+            return metrics.record_grading(parts_result, "capital")
 
     # TIER 2: Fuzzy Match
     best_score: float = 0.0
     best_match_idx = -1
-    for i, opt in enumerate(lower_correct_options):
-        score = fuzz.token_sort_ratio(normalized_user, opt)
-        if score > best_score:
-            best_score = score
-            best_match_idx = i
-
-    if best_score >= 85:
-        actual_capital_cased = correct_capitals_list[best_match_idx]
-        shared_with = [
-            c
-            for c in all_capitals_map.get(actual_capital_cased.lower(), [])
-            if c != country_name
-        ]
-
-        msg = default_success_msg
-        if shared_with:
-            msg += f" (It's also the capital of {', '.join(shared_with)})"
-
-        return {
-            "is_correct": True,
-            "all_capitals_guessed": capital_count == 1,
-            "correct_guesses": [user_answer_str],
-            "incorrect_guesses": [],
-            "missed_capitals": [
+    with metrics.time_tier("fuzzy", "capital"):
+        for i, opt in enumerate(lower_correct_options):
+            score = fuzz.token_sort_ratio(normalized_user, opt)
+            if score > best_score:
+                best_score = score
+                best_match_idx = i
+    metrics.FUZZY_BEST_SCORE.labels(game_mode="capital").observe(best_score)
+
+    if best_score >= FUZZY_MATCH_THRESHOLD:
+        return matched_result(
+            correct_capitals_list[best_match_idx],
+            [
                 c
                 for c in correct_capitals_list
-                if fuzz.token_sort_ratio(normalized_user, _normalize_string(c)) < 85
+                if fuzz.token_sort_ratio(normalized_user, _normalize_string(c))
+                < FUZZY_MATCH_THRESHOLD
             ],
-            "points_awarded": 1,
-            "shared_capital_info": shared_with if shared_with else None,
-            "feedback_message": msg,
-            "grading_method": "fuzzy",
-        }
+            "fuzzy",
+        )
+
+    # TIER 2.5: Phonetic Match (spelled by ear, e.g. "Wagadugu" for "Ouagadougou")
+    phonetic_idx = _phonetic_match(normalized_user, lower_correct_options, "capital")
+    if phonetic_idx is not None:
+        return matched_result(
+            correct_capitals_list[phonetic_idx],
+            [c for i, c in enumerate(correct_capitals_list) if i != phonetic_idx],
+            "phonetic",
+        )
+
+    # KNOWN PLACE: A real place, just not this country's capital ("Lagos" for Nigeria)
+    with metrics.time_tier("deterministic", "capital"):
+        note = _other_place_note(normalized_user, "capital", [country_name])
+    if note:
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "all_capitals_guessed": False,
+                "correct_guesses": [],
+                "incorrect_guesses": [user_answer_str],
+                "missed_capitals": correct_capitals_list,
+                "points_awarded": 0,
+                "shared_capital_info": None,
+                "feedback_message": default_failure_msg.replace("😔.", f"😔. {note}", 1),
+                "grading_method": "deterministic",
+            },
+            "capital",
+        )
 
     # TIER 3: AI Grading & Fact Harvesting
-    if not api_key:
-        logger.warning("GEMINI_API_KEY not set. Returning hard fallback.")
-        return {
-            "is_correct": False,
-            "points_awarded": 0,
-            "feedback_message": default_failure_msg,
-            "grading_method": "hard_fallback",
-        }
+    if not (allow_ai and llm_available()):
+        if allow_ai:
+            logger.warning("LLM provider unavailable. Returning hard fallback.")
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "points_awarded": 0,
+                "feedback_message": default_failure_msg,
+                "grading_method": "hard_fallback",
+            },
+            "capital",
+        )
 
     # Check Redis cache for identical historical AI grading evaluations to bypass the LLM entirely
     # Why cache?: LLM calls are expensive and slow (1-3 seconds). If a user guesses "Pretoria" for "South Africa",
     # the grading result will always be the same. 
     # How it works: We create a unique cache key by hashing the country name and the user's answer.
     # If the key exists, we return the cached JSON immediately, effectively turning an LLM call into an O(1) DB lookup.
-    safe_user = hashlib.md5(user_answer_str.strip().lower().encode()).hexdigest()
-    safe_country = hashlib.md5(country_name.strip().lower().encode()).hexdigest()
-    cache_key = f"ai_capital_{safe_country}_{safe_user}"
+    # Redis can lose verdicts (a restart, an eviction, a cleared cache), so a miss reads
+    # through to the durable copy in the GradedAnswer table (see trivia/verdict_store.py)
+    cache_key = verdict_store.cache_key("capital", country_name, user_answer_str)
 
-    cached_result = cache.get(cache_key)
+    cached_result = cache.get(cache_key) or verdict_store.lookup(
+        "capital", country_name, user_answer_str, _model_versions("grade_capital")
+    )
     if cached_result:
+        metrics.AI_CACHE_LOOKUPS.labels(game_mode="capital", result="hit").inc()
         logger.info(
             f"Returning cached AI capital grading for {country_name}. User: '{user_answer_str}'."
         )
-        return cached_result
+        aliases.record_cache_hit(
+            "capital", country_name, user_answer_str, cached_result, client
+        )
+        return metrics.record_grading(cached_result, "capital", method="cached-ai")
+    metrics.AI_CACHE_LOOKUPS.labels(game_mode="capital", result="miss").inc()
+
+    if ai_budget is not None and not ai_budget():
+        logger.warning(f"AI budget exceeded, grading '{user_answer_str}' deterministically.")
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "points_awarded": 0,
+                "feedback_message": default_failure_msg,
+                "grading_method": "hard_fallback",
+            },
+            "capital",
+            method="throttled",
+        )
 
     shared_capitals_context = {
         cap: [c for c in all_capitals_map.get(cap.lower(), []) if c != country_name]
@@ -298,11 +694,6 @@ def grade_capital_answer(country_name: str, correct_capitals_str: str, user_answ
         - If `all_capitals_guessed` is true: "Correct! The capital of {country_name} is {correct_capitals_list[0]}." or "Correct! The {capital_count} capitals of {country_name} are {", ".join(correct_capitals_list)}. You got them all!"
         - If `is_correct` is true BUT partially correct: "Partially correct! You found [count] of the {capital_count} capitals: [list]. The capital cities of {country_name} are {", ".join(correct_capitals_list)}."
         - If `is_correct` is false: "Incorrect 😔. The correct capital is {correct_capitals_list[0]}." or "Incorrect 😔. The correct capitals are {", ".join(correct_capitals_list)}."
-    6. Provide exactly 3 ADDITIONAL unique facts about {country_name}.
-       - Fact 1: Historical milestone.
-       - Fact 2: Geographic anomaly or feature.
-       - Fact 3: Cultural or general trivia.
-       (Knowledge cutoff is January 2025)
 
     **JSON Output Format:**
     {{
@@ -313,48 +704,77 @@ def grade_capital_answer(country_name: str, correct_capitals_str: str, user_answ
       "missed_capitals": ["Cape Town", "Bloemfontein"],
       "points_awarded": 1,
       "shared_capital_info": null,
-      "feedback_message": "Partially correct! You found 1 of the 3 capitals: Pretoria. The full list is Pretoria, Cape Town, Bloemfontein.",
-      "extra_facts": ["Historical fact here", "Geographic fact here", "Cultural fact here"]
+      "feedback_message": "Partially correct! You found 1 of the 3 capitals: Pretoria. The full list is Pretoria, Cape Town, Bloemfontein."
     }}
     **CRITICAL: Respond ONLY with the raw JSON object.**
     """
 
     try:
-        # Bumped temperature slightly to 0.5 to ensure varied extra facts
-        result_json = _generate_ai_json(prompt, temperature=0.5)
+        # Verdict fields only: output tokens drive the latency, so facts are generated
+        # off-request in batches (see the generate_fun_facts command)
+        llm_kwargs: dict[str, Any] = {
+            "temperature": 0.0,
+            "max_tokens": GRADING_MAX_TOKENS,
+            "task": "grade_capital",
+            "context": {
+                "country": country_name,
+                "correct_capitals": correct_capitals_list,
+                "user_answer": user_answer_str,
+            },
+        }
+        if settings.LLM_STREAM_GRADING:
+            # Answer on the verdict, without waiting for the rest of the stream
+            model, result_json = _stream_with_model(
+                prompt, CAPITAL_VERDICT_FIELDS, **llm_kwargs
+            )
+        else:
+            model, result_json = _generate_with_model(prompt, **llm_kwargs)
         result_json["grading_method"] = "ai"
         cache.set(
             cache_key, result_json, timeout=None
         )  # Cache indefinitely to prevent repeated API calls
+        verdict_store.save(
+            "capital", country_name, user_answer_str, _model_version(model), result_json
+        )
+        aliases.learn_capital_verdict(
+            country_name, correct_capitals_list, user_answer_str, result_json, client
+        )
         logger.info(
             f"AI capital grading complete for {country_name}. User: '{user_answer_str}'."
         )
-        return result_json
+        return metrics.record_grading(result_json, "capital")
     except Exception as e:
-        logger.error(f"Error calling Gemini or parsing JSON for capital: {e}")
-        return {
-            "is_correct": False,
-            "points_awarded": 0,
-            "feedback_message": default_failure_msg,
-            "grading_method": "hard_fallback",
-        }
+        logger.error(f"Error calling the LLM or parsing JSON for capital: {e}")
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "points_awarded": 0,
+                "feedback_message": default_failure_msg,
+                "grading_method": "hard_fallback",
+            },
+            "capital",
+        )
 
 
 # --- Feature 1 (Reverse): "Guess the Country" Grader ---
 
 
-def grade_country_answer(correct_country_name: str, correct_capitals_str: str, user_answer_str: str) -> dict[str, Any]:
+def grade_country_answer(
+    correct_country_name: str,
+    correct_capitals_str: str,
+    user_answer_str: str,
+    allow_ai: bool = True,
+    ai_budget: Callable[[], bool] | None = None,
+    client: str | None = None,
+) -> dict[str, Any]:
     """
     Evaluates a user's guess for the country of a given capital using a multi-tiered architecture.
 
     Similar to `grade_capital_answer`, this utilizes deterministic lookups, rapidfuzz heuristics,
-    and finally an LLM-based evaluation that is persistently cached in Redis to optimize throughput.
+    phonetic keys and finally an LLM-based evaluation that is persistently cached in Redis to optimize throughput.
     """
     normalized_user = _normalize_string(user_answer_str)
 
-    # Check if the user used a known alias (e.g., mapped "antigua" to "antigua and barbuda")
-    normalized_user = COMMON_COUNTRY_ALIASES.get(normalized_user, normalized_user)
-
     correct_capitals_list = [c.strip() for c in correct_capitals_str.split("|")]
     capital_count = len(correct_capitals_list)
     capital_name_for_context = correct_capitals_list[0]
@@ -376,6 +796,12 @@ def grade_country_answer(correct_country_name: str, correct_capitals_str: str, u
 
     lower_valid_countries = [_normalize_string(c) for c in valid_countries_for_capital]
 
+    # Check if the user used a known alias (e.g., mapped "antigua" to "antigua and barbuda").
+    # An answer that is already valid as typed wins, because a few aliases ("bahamas",
+    # "gambia") are the dataset's own spelling of the country.
+    if normalized_user not in lower_valid_countries:
+        normalized_user = COMMON_COUNTRY_ALIASES.get(normalized_user, normalized_user)
+
     def get_shared_success_msg(matched_country_lower):
         # Find the properly cased name from our valid list
         matched_cased = next(
@@ -401,51 +827,113 @@ def grade_country_answer(correct_country_name: str, correct_capitals_str: str, u
             return f"Correct! {capital_name_for_context} is the capital of {matched_cased}. (It's also the capital of {', '.join(other_countries)})"
 
     # TIER 1: Deterministic Check
-    if normalized_user in lower_valid_countries:
-        return {
-            "is_correct": True,
-            "feedback_message": get_shared_success_msg(normalized_user),
-            "grading_method": "deterministic",
-        }
+    with metrics.time_tier("deterministic", "country"):
+        is_exact_match = normalized_user in lower_valid_countries
+        if not is_exact_match:
+            learned = aliases.lookup("country", correct_country_name, normalized_user)
+            if learned and _normalize_string(learned) in lower_valid_countries:
+                normalized_user = _normalize_string(learned)
+                is_exact_match = True
+
+    if is_exact_match:
+        return metrics.record_grading(
+            {
+                "is_correct": True,
+                "feedback_message": get_shared_success_msg(normalized_user),
+                "grading_method": "deterministic",
+            },
+            "country",
+        )
 
     # TIER 2: Fuzzy Match
     best_score: float = 0.0
     best_match_country = None
-    for valid_country in lower_valid_countries:
-        score = fuzz.token_sort_ratio(normalized_user, valid_country)
-        if score > best_score:
-            best_score = score
-            best_match_country = valid_country
-
-    if best_score >= 85 and best_match_country:
-        return {
-            "is_correct": True,
-            "feedback_message": get_shared_success_msg(best_match_country),
-            "grading_method": "fuzzy",
-        }
+    with metrics.time_tier("fuzzy", "country"):
+        for valid_country in lower_valid_countries:
+            score = fuzz.token_sort_ratio(normalized_user, valid_country)
+            if score > best_score:
+                best_score = score
+                best_match_country = valid_country
+    metrics.FUZZY_BEST_SCORE.labels(game_mode="country").observe(best_score)
+
+    if best_score >= FUZZY_MATCH_THRESHOLD and best_match_country:
+        return metrics.record_grading(
+            {
+                "is_correct": True,
+                "feedback_message": get_shared_success_msg(best_match_country),
+                "grading_method": "fuzzy",
+            },
+            "country",
+        )
+
+    # TIER 2.5: Phonetic Match
+    phonetic_idx = _phonetic_match(normalized_user, lower_valid_countries, "country")
+    if phonetic_idx is not None:
+        return metrics.record_grading(
+            {
+                "is_correct": True,
+                "feedback_message": get_shared_success_msg(
+                    lower_valid_countries[phonetic_idx]
+                ),
+                "grading_method": "phonetic",
+            },
+            "country",
+        )
+
+    # KNOWN PLACE: Another country, or a city instead of a country ("Sydney" for Canberra)
+    with metrics.time_tier("deterministic", "country"):
+        note = _other_place_note(normalized_user, "country", valid_countries_for_capital)
+    if note:
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "feedback_message": default_failure_msg.replace("😔.", f"😔. {note}", 1),
+                "grading_method": "deterministic",
+            },
+            "country",
+        )
 
     # TIER 3: AI Grading & Fact Harvesting
-    if not api_key:
-        logger.warning("GEMINI_API_KEY not set. Returning hard fallback.")
-        return {
-            "is_correct": False,
-            "feedback_message": default_failure_msg,
-            "grading_method": "hard_fallback",
-        }
+    if not (allow_ai and llm_available()):
+        if allow_ai:
+            logger.warning("LLM provider unavailable. Returning hard fallback.")
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "feedback_message": default_failure_msg,
+                "grading_method": "hard_fallback",
+            },
+            "country",
+        )
 
     # Check Redis cache for identical historical AI grading evaluations to bypass the LLM entirely
-    safe_user = hashlib.md5(user_answer_str.strip().lower().encode()).hexdigest()
-    safe_country = hashlib.md5(
-        correct_country_name.strip().lower().encode()
-    ).hexdigest()
-    cache_key = f"ai_country_{safe_country}_{safe_user}"
+    cache_key = verdict_store.cache_key("country", correct_country_name, user_answer_str)
 
-    cached_result = cache.get(cache_key)
+    cached_result = cache.get(cache_key) or verdict_store.lookup(
+        "country", correct_country_name, user_answer_str, _model_versions("grade_country")
+    )
     if cached_result:
+        metrics.AI_CACHE_LOOKUPS.labels(game_mode="country", result="hit").inc()
         logger.info(
             f"Returning cached AI country grading for {correct_country_name}. User: '{user_answer_str}'."
         )
-        return cached_result
+        aliases.record_cache_hit(
+            "country", correct_country_name, user_answer_str, cached_result, client
+        )
+        return metrics.record_grading(cached_result, "country", method="cached-ai")
+    metrics.AI_CACHE_LOOKUPS.labels(game_mode="country", result="miss").inc()
+
+    if ai_budget is not None and not ai_budget():
+        logger.warning(f"AI budget exceeded, grading '{user_answer_str}' deterministically.")
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "feedback_message": default_failure_msg,
+                "grading_method": "hard_fallback",
+            },
+            "country",
+            method="throttled",
+        )
 
     prompt = f"""
     You are an expert geography trivia judge. Your task is to evaluate a user's answer for a "guess the country" question.
@@ -466,43 +954,71 @@ def grade_country_answer(correct_country_name: str, correct_capitals_str: str, u
         - If Incorrect: Check if "User's Answer" is *another* country sharing the *same capital*. If yes: "Correct! {capital_name_for_context} is the capital of {user_answer_str}. (It's also the capital of: {correct_country_name})." If no: "Incorrect 😔. The correct answer is {correct_country_name}."
         - If Correct (1 capital): "Correct! {capital_name_for_context} is the capital of {correct_country_name}."
         - If Correct (>1 capital): "Correct! {capital_name_for_context} is one of the {capital_count} capitals of {correct_country_name}. The other capital cities are [list]."
-    4. Provide exactly 3 ADDITIONAL unique facts about {correct_country_name}.
-       - Fact 1: Historical milestone.
-       - Fact 2: Geographic anomaly or feature.
-       - Fact 3: Cultural or general trivia.
-       (Knowledge cutoff is January 2025)
 
     **JSON Output Format:**
     {{
       "is_correct": true,
-      "feedback_message": "Correct! Pretoria is one of the three capitals of South Africa. The other capital cities are Cape Town & Bloemfontein.",
-      "extra_facts": ["Historical fact here", "Geographic fact here", "Cultural fact here"]
+      "feedback_message": "Correct! Pretoria is one of the three capitals of South Africa. The other capital cities are Cape Town & Bloemfontein."
     }}
     **CRITICAL: Respond ONLY with the raw JSON object.**
     """
     try:
-        result_json = _generate_ai_json(prompt, temperature=0.5, max_tokens=1024)
+        llm_kwargs: dict[str, Any] = {
+            "temperature": 0.0,
+            "max_tokens": GRADING_MAX_TOKENS,
+            "task": "grade_country",
+            "context": {
+                "country": correct_country_name,
+                "capital": capital_name_for_context,
+                "user_answer": user_answer_str,
+            },
+        }
+        if settings.LLM_STREAM_GRADING:
+            model, result_json = _stream_with_model(
+                prompt, COUNTRY_VERDICT_FIELDS, **llm_kwargs
+            )
+        else:
+            model, result_json = _generate_with_model(prompt, **llm_kwargs)
         result_json["grading_method"] = "ai"
         cache.set(
             cache_key, result_json, timeout=None
         )  # Cache indefinitely to prevent repeated API calls
+        verdict_store.save(
+            "country",
+            correct_country_name,
+            user_answer_str,
+            _model_version(model),
+            result_json,
+        )
+        aliases.learn_country_verdict(
+            correct_country_name,
+            valid_countries_for_capital,
+            user_answer_str,
+            result_json,
+            client,
+        )
         logger.info(
             f"AI country grading complete for {correct_country_name}. User: '{user_answer_str}'."
         )
-        return result_json
+        return metrics.record_grading(result_json, "country")
     except Exception as e:
-        logger.error(f"Error calling Gemini or parsing JSON for country: {e}")
-        return {
-            "is_correct": False,
-            "feedback_message": default_failure_msg,
-            "grading_method": "hard_fallback",
-        }
+        logger.error(f"Error calling the LLM or parsing JSON for country: {e}")
+        return metrics.record_grading(
+            {
+                "is_correct": False,
+                "feedback_message": default_failure_msg,
+                "grading_method": "hard_fallback",
+            },
+            "country",
+        )
 
 
 # --- Feature 2: Fun Fact Generator ---
 
 
-def get_fun_fact(country_name: str) -> str:
+def get_fun_fact(
+    country_name: str, ai_budget: Callable[[], bool] | None = None
+) -> str:
     """
     Fetches a random fun fact from the DB, or generates them on-the-fly if empty.
     
@@ -520,8 +1036,25 @@ def get_fun_fact(country_name: str) -> str:
     """
     try:
         # 1. Check the database first
-        country = Country.objects.get(name=country_name)
-        random_fact = country.fun_facts.order_by("?").first()
+        country = registry.get_registry().by_name.get(country_name)
+        if country is None:
+            raise Country.DoesNotExist
+
+        # Pick from the in-memory id pool: a primary key lookup instead of ORDER BY RANDOM()
+        fact_ids = registry.fact_pools.get(country.id)
+        if fact_ids:
+            fact_text = (
+                CountryFunFact.objects.filter(pk=random.choice(fact_ids))
+                .values_list("fact_text", flat=True)
+                .first()
+            )
+            if fact_text:
+                return fact_text
+
+        # The pool may be stale (e.g. facts harvested by another worker)
+        random_fact = (
+            CountryFunFact.objects.filter(country_id=country.id).order_by("?").first()
+        )
 
         # If we have a fact, return it immediately (costs 0 API credits)
         if random_fact:
@@ -529,10 +1062,11 @@ def get_fun_fact(country_name: str) -> str:
 
         # --- 2. JUST-IN-TIME (JIT) HARVESTING ---
         # If the database is empty for this country, fetch facts live
-        if not api_key:
+        if not llm_available() or (ai_budget is not None and not ai_budget()):
             return f"Did you know {country_name} is a fascinating place to learn about!"
 
         logger.info(f"No facts found for {country_name}. Triggering JIT harvesting.")
+        metrics.JIT_HARVEST_EVENTS.inc()
 
         prompt = f"""
         You are an expert geography trivia host. 
@@ -545,19 +1079,12 @@ def get_fun_fact(country_name: str) -> str:
         }}
         """
 
-        result = _generate_ai_json(prompt, temperature=0.7)
+        result = _generate_ai_json(
+            prompt, temperature=0.7, task="fun_facts", context={"country": country_name}
+        )
 
         if result and result.get("extra_facts"):
-            harvest_count = 0
-            for fact_text in result["extra_facts"]:
-                _, created = CountryFunFact.objects.get_or_create(
-                    country=country,
-                    fact_text=fact_text,
-                    defaults={"is_ai_generated": True, "source": "user"},
-                )
-                if created:
-                    harvest_count += 1
-
+            harvest_count = harvest_facts(country.id, result["extra_facts"], "jit")
             if harvest_count > 0:
                 logger.info(
                     f"JIT Harvested {harvest_count} new facts for {country_name}."
@@ -590,13 +1117,23 @@ def generate_ai_quiz(topic_name: str) -> list[dict[str, Any]] | dict[str, str]:
     the user waits. Therefore, we pre-generate a pool of questions asynchronously and just query them here.
     """
     try:
-        # Fetch the topic (case-insensitive match)
-        topic = QuizTopic.objects.get(name__iexact=topic_name)
+        # Sample 10 ids from the in-memory pool and fetch them by primary key
+        question_ids = registry.question_pools.get(topic_name.lower())
+        questions = []
+        if len(question_ids) >= 10:
+            questions = list(
+                QuizQuestion.objects.filter(pk__in=random.sample(question_ids, 10))
+            )
+            random.shuffle(questions)
+
+        if len(questions) < 10:
+            # Unknown topic or a stale pool (rotated questions): ask the DB directly
+            topic = QuizTopic.objects.get(name__iexact=topic_name)
 
-        # Pull 10 random questions for this topic
-        questions = topic.questions.order_by("?")[:10]
+            # Evaluated once: len() reuses the fetched rows instead of issuing a COUNT(*)
+            questions = list(topic.questions.order_by("?")[:10])
 
-        if questions.count() < 10:
+        if len(questions) < 10:
             return {
                 "error": "We are still building the question pool for this topic. Check back later!"
             }
@@ -0,0 +1,195 @@
+"""
+Learned aliases: answers the AI tier confirmed as correct, promoted into Tier 1.
+
+Every correct Tier 3 verdict is an alias we paid for, but the verdict cache is keyed by an
+md5 of the raw answer, so "Kyiv ", "kyiv." and "KYIV" each cost their own LLM call and
+every repeat still costs a Redis round trip. Here a correct verdict is also recorded as a
+`LearnedAlias` keyed by the *normalized* answer and scoped to the question's country:
+- Recording: every fresh verdict bumps `llm_calls`. `confirmations` counts distinct
+  clients (by address, as the throttles see it), from fresh verdicts and cached hits
+  alike, so one player repeating an accepted answer can't promote it. A marker per
+  (alias, client) in the cache lets each client count once. Cached hits are the hot
+  path, so their confirmations are only counted in-process and written in one batch once
+  LEARNED_ALIAS_HIT_FLUSH_SIZE have accumulated, off the request, and when a gunicorn
+  worker exits.
+- Promotion: an alias resolves in Tier 1 once approved, or once it has
+  `LEARNED_ALIAS_MIN_CONFIRMATIONS` confirmations while still pending review. Rejected
+  aliases never resolve.
+- Decay: pending aliases unseen for `LEARNED_ALIAS_DECAY_DAYS` are pruned.
+
+Aliases are per country rather than merged globally into `COMMON_COUNTRY_ALIASES`: a lenient
+verdict ("congo" for Kinshasa) is only safe for the question it was given on.
+Review, decay and the avoided-traffic report live in `manage.py learned_aliases`.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import Counter
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from trivia import metrics, registry
+from trivia.models import LearnedAlias
+from trivia.normalization import normalize_string
+
+logger = logging.getLogger(__name__)
+
+# Cached-hit confirmations not yet written, by (game mode, country id, alias)
+_pending_hits: Counter[tuple[str, int, str]] = Counter()
+_lock = threading.Lock()
+
+
+def lookup(game_mode: str, country_name: str, normalized_answer: str) -> str | None:
+    """Returns the target of a promoted alias for this question, if there is one."""
+    for alias, target in registry.learned_alias_pools.get((game_mode, country_name)):
+        if alias == normalized_answer:
+            metrics.LEARNED_ALIAS_HITS.labels(game_mode=game_mode).inc()
+            return target
+    return None
+
+
+def _first_confirmation(
+    game_mode: str, country_id: int, alias: str, client: str | None
+) -> bool:
+    """True the first time `client` confirms this alias; callers without one share a slot."""
+    subject = f"{game_mode}:{country_id}:{alias}:{client or ''}"
+    key = f"alias_confirm_{hashlib.md5(subject.encode()).hexdigest()}"
+    try:
+        return cache.add(key, 1, timeout=settings.LEARNED_ALIAS_DECAY_DAYS * 86400)
+    except Exception as e:
+        logger.error(f"Could not check who confirmed alias '{alias}': {e}")
+        return False
+
+
+def _record(
+    game_mode: str, country_name: str, user_answer: str, target: str, client: str | None
+) -> None:
+    country = registry.get_registry().by_name.get(country_name)
+    alias = normalize_string(user_answer)
+    if country is None or not alias:
+        return
+    first = _first_confirmation(game_mode, country.id, alias, client)
+
+    # Bookkeeping only: a failed write must never change the verdict the user gets
+    try:
+        _, created = LearnedAlias.objects.get_or_create(
+            game_mode=game_mode,
+            country_id=country.id,
+            alias=alias,
+            defaults={"target": target},
+        )
+        if not created:
+            LearnedAlias.objects.filter(
+                game_mode=game_mode, country_id=country.id, alias=alias
+            ).update(
+                confirmations=F("confirmations") + (1 if first else 0),
+                llm_calls=F("llm_calls") + 1,
+                last_seen=timezone.now(),
+            )
+    except DatabaseError as e:
+        logger.error(f"Could not record learned alias '{alias}' for {country_name}: {e}")
+
+
+def learn_capital_verdict(
+    country_name: str,
+    correct_capitals: list[str],
+    user_answer: str,
+    verdict: dict[str, Any],
+    client: str | None = None,
+) -> None:
+    # Only unambiguous verdicts: one correct guess, nothing wrong alongside it
+    guesses = verdict.get("correct_guesses") or []
+    if not verdict.get("is_correct") or len(guesses) != 1 or verdict.get("incorrect_guesses"):
+        return
+    target = next(
+        (c for c in correct_capitals if normalize_string(c) == normalize_string(guesses[0])),
+        None,
+    )
+    if target:
+        _record("capital", country_name, user_answer, target, client)
+
+
+def learn_country_verdict(
+    country_name: str,
+    valid_countries: list[str],
+    user_answer: str,
+    verdict: dict[str, Any],
+    client: str | None = None,
+) -> None:
+    # With a shared capital the verdict doesn't say which country the answer meant
+    if verdict.get("is_correct") and len(valid_countries) == 1:
+        _record("country", country_name, user_answer, country_name, client)
+
+
+def record_cache_hit(
+    game_mode: str,
+    country_name: str,
+    user_answer: str,
+    verdict: dict[str, Any],
+    client: str | None = None,
+) -> None:
+    """Counts a correct cached verdict from a new client as a confirmation, off the DB."""
+    if not verdict.get("is_correct"):
+        return
+    country = registry.get_registry().by_name.get(country_name)
+    alias = normalize_string(user_answer)
+    if country is None or not alias:
+        return
+    if not _first_confirmation(game_mode, country.id, alias, client):
+        return
+    with _lock:
+        _pending_hits[(game_mode, country.id, alias)] += 1
+        due = _pending_hits.total() >= settings.LEARNED_ALIAS_HIT_FLUSH_SIZE
+    if due:
+        threading.Thread(
+            target=_flush_in_background, name="alias-hits-flush", daemon=True
+        ).start()
+
+
+def pending_hits() -> int:
+    with _lock:
+        return _pending_hits.total()
+
+
+def flush_hits() -> int:
+    """Writes the counted cache hits; returns the number of confirmations written."""
+    with _lock:
+        batch = dict(_pending_hits)
+        _pending_hits.clear()
+    if not batch:
+        return 0
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            for (game_mode, country_id, alias), count in batch.items():
+                LearnedAlias.objects.filter(
+                    game_mode=game_mode, country_id=country_id, alias=alias
+                ).update(confirmations=F("confirmations") + count, last_seen=now)
+    except DatabaseError as e:
+        # Confirmations only feed promotion and the report; losing a batch is harmless
+        logger.error(f"Could not count {sum(batch.values())} cached verdicts: {e}")
+        return 0
+    return sum(batch.values())
+
+
+def _flush_in_background() -> None:
+    try:
+        flush_hits()
+    finally:
+        close_old_connections()
+
+
+def decay() -> int:
+    """Deletes pending aliases unseen for LEARNED_ALIAS_DECAY_DAYS; returns how many."""
+    cutoff = timezone.now() - timedelta(days=settings.LEARNED_ALIAS_DECAY_DAYS)
+    deleted, _ = LearnedAlias.objects.filter(
+        status="pending", last_seen__lt=cutoff
+    ).delete()
+    return deleted
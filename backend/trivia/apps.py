@@ -0,0 +1,14 @@
+from importlib import import_module
+
+from django.apps import AppConfig
+
+
+class TriviaConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "trivia"
+
+    def ready(self) -> None:
+        # Imported for its side effect: the receivers that reset the registry and pools.
+        # The warm-up itself runs from config/wsgi.py: querying the DB while apps load is
+        # discouraged.
+        import_module("trivia.registry")
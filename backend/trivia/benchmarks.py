@@ -0,0 +1,405 @@
+"""
+Microbenchmark suite for the grading engine and the hot API endpoints.
+
+Run it through `python manage.py run_benchmarks` (see the command for CLI options).
+
+How it works:
+- Each benchmark is registered with `@benchmark(name)` on a factory that receives the
+  country dataset (every row of `data/country_capitals.csv`) and returns a zero-argument
+  callable. One call of that callable is one "round".
+- `measure` runs a warm-up call, then times `rounds` calls with the GC disabled (like
+  `timeit`) and reports min/median/p95/mean/stdev in seconds.
+- `compare` flags a benchmark as regressed when its median exceeds the baseline median
+  by more than the configured threshold. Medians are used because they are far less
+  sensitive to one-off scheduler noise than means, which matters on the Pi.
+
+`import_time_report` runs a fresh interpreter with `-X importtime` and summarizes what a
+worker pays to import the app, so lazy-import wins (and regressions) stay visible.
+
+The factories assume the runner has loaded the dataset into a throwaway database and
+selected the offline `local` LLM provider, so nothing here ever reaches the network.
+"""
+
+import csv
+import gc
+import itertools
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.test import Client, override_settings
+
+from trivia import ai_service, registry
+
+Dataset = list[dict[str, str]]
+
+BENCHMARK_TOPIC = "Benchmark Topic"
+
+# Imports a worker performs before serving its first request
+STARTUP_SNIPPET = "import django; django.setup(); import config.urls"
+
+Factory = Callable[[Dataset], Callable[[], Any]]
+
+# name -> (factory, max rounds or None)
+BENCHMARKS: dict[str, tuple[Factory, int | None]] = {}
+
+
+def benchmark(
+    name: str, max_rounds: int | None = None
+) -> Callable[[Factory], Factory]:
+    def decorator(factory: Factory) -> Factory:
+        BENCHMARKS[name] = (factory, max_rounds)
+        return factory
+
+    return decorator
+
+
+def load_dataset() -> Dataset:
+    path = settings.BASE_DIR / "data" / "country_capitals.csv"
+    with open(path, mode="r", encoding="utf-8") as file:
+        return [
+            {
+                "country": row["Country"].strip(),
+                "capital": row["Capital"].strip(),
+                "continent": row["Continent"].strip(),
+            }
+            for row in csv.DictReader(file)
+            if row["Country"] and row["Capital"]
+        ]
+
+
+def measure(func: Callable[[], Any], rounds: int) -> dict[str, float]:
+    func()  # Warm-up: populate caches, compile regexes, import lazily loaded modules
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "p95": statistics.quantiles(timings, n=20)[-1] if rounds > 1 else timings[0],
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if rounds > 1 else 0.0,
+    }
+
+
+def run(dataset: Dataset, names: list[str], rounds: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name in names:
+        factory, max_rounds = BENCHMARKS[name]
+        results[name] = measure(factory(dataset), min(rounds, max_rounds or rounds))
+    return results
+
+
+def import_time_report(top: int = 10) -> dict[str, Any]:
+    """
+    Parses `python -X importtime` output for STARTUP_SNIPPET. Only top-level imports
+    (depth 0) are summed, since their cumulative time already includes their children.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SNIPPET],
+        capture_output=True,
+        text=True,
+        cwd=settings.BASE_DIR,
+    )
+    modules = []
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, package = line.split("|")
+        imported.add(package.strip())
+        if not package.startswith("  "):
+            modules.append((package.strip(), int(cumulative) / 1000))
+
+    modules.sort(key=lambda item: -item[1])
+    return {
+        "total_ms": round(sum(ms for _, ms in modules), 3),
+        "top": [{"module": m, "cumulative_ms": ms} for m, ms in modules[:top]],
+        "llm_sdk_imported": "google.generativeai" in imported,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[dict[str, Any]]:
+    """
+    Returns one row per benchmark present in both runs. `threshold` is a fraction,
+    e.g. 0.10 flags anything more than 10% slower than the baseline median.
+    """
+    rows = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        base_median = baseline[name]["median"]
+        change = (stats["median"] - base_median) / base_median if base_median else 0.0
+        rows.append(
+            {
+                "name": name,
+                "baseline": base_median,
+                "current": stats["median"],
+                "change": change,
+                "regressed": change > threshold,
+            }
+        )
+    return rows
+
+
+# --- Grading engine ---
+
+
+@benchmark("normalize_string")
+def _normalize_string_case(dataset: Dataset) -> Callable[[], Any]:
+    strings = [row["country"] for row in dataset] + [row["capital"] for row in dataset]
+
+    def run_round() -> None:
+        for s in strings:
+            ai_service._normalize_string(s)
+
+    return run_round
+
+
+def _expect_method(result: dict[str, Any], expected: str, answer: str) -> None:
+    if result["grading_method"] != expected:
+        raise AssertionError(
+            f"Benchmark input '{answer}' resolved via {result['grading_method']}, expected {expected}."
+        )
+
+
+def _grader_case(
+    grader: Callable[[str, str, str], dict[str, Any]],
+    dataset: Dataset,
+    make_answer: Callable[[dict[str, str]], str],
+    expected_method: str,
+) -> Callable[[], Any]:
+    cases = [(row["country"], row["capital"], make_answer(row)) for row in dataset]
+    for country, capital, answer in cases:
+        _expect_method(grader(country, capital, answer), expected_method, answer)
+
+    def run_round() -> None:
+        for country, capital, answer in cases:
+            grader(country, capital, answer)
+
+    return run_round
+
+
+def _misspell(s: str) -> str:
+    # Doubling the last letter keeps token_sort_ratio above the Tier 2 cutoff for
+    # every name in the dataset (all are at least 4 characters long).
+    return s + s[-1]
+
+
+@benchmark("grade_capital_tier1")
+def _grade_capital_tier1(dataset: Dataset) -> Callable[[], Any]:
+    return _grader_case(
+        ai_service.grade_capital_answer,
+        dataset,
+        lambda row: row["capital"].split("|")[0],
+        "deterministic",
+    )
+
+
+@benchmark("grade_capital_tier2")
+def _grade_capital_tier2(dataset: Dataset) -> Callable[[], Any]:
+    return _grader_case(
+        ai_service.grade_capital_answer,
+        dataset,
+        lambda row: _misspell(row["capital"].split("|")[0]),
+        "fuzzy",
+    )
+
+
+@benchmark("grade_country_tier1")
+def _grade_country_tier1(dataset: Dataset) -> Callable[[], Any]:
+    return _grader_case(
+        ai_service.grade_country_answer,
+        dataset,
+        lambda row: row["country"],
+        "deterministic",
+    )
+
+
+@benchmark("grade_country_tier2")
+def _grade_country_tier2(dataset: Dataset) -> Callable[[], Any]:
+    return _grader_case(
+        ai_service.grade_country_answer,
+        dataset,
+        lambda row: _misspell(row["country"]),
+        "fuzzy",
+    )
+
+
+# Spellings by ear that miss the Tier 2 cutoff (see data/phonetic_labels.csv)
+PHONETIC_CASES = [
+    ("Burkina Faso", "Wagadugu"),
+    ("Rwanda", "Kigalee"),
+    ("Russia", "Moskow"),
+    ("Slovenia", "Lubliana"),
+    ("Mongolia", "Ulan Bator"),
+]
+
+
+@benchmark("grade_capital_phonetic")
+def _grade_capital_phonetic(dataset: Dataset) -> Callable[[], Any]:
+    capitals = {row["country"]: row["capital"] for row in dataset}
+    cases = [(country, capitals[country], answer) for country, answer in PHONETIC_CASES]
+    for country, capital, answer in cases:
+        _expect_method(
+            ai_service.grade_capital_answer(country, capital, answer), "phonetic", answer
+        )
+
+    def run_round() -> None:
+        for country, capital, answer in cases:
+            ai_service.grade_capital_answer(country, capital, answer)
+
+    return run_round
+
+
+@benchmark("grade_capital_tier3_local")
+def _grade_capital_tier3_local(dataset: Dataset) -> Callable[[], Any]:
+    # Overhead of the AI path itself (prompt, breaker, parse, cache write) with a
+    # zero-latency stand-in model; every answer is new, so every call misses the cache.
+    counter = itertools.count()
+    rows = itertools.cycle(dataset)
+
+    def run_round() -> None:
+        row = next(rows)
+        ai_service.grade_capital_answer(
+            row["country"], row["capital"], f"Qxzv {next(counter)}"
+        )
+
+    return run_round
+
+
+# Per-token cost of the local stand-in in `grade_capital_tier3_tokens`, so a shorter
+# grading output shows up as lower latency (a model's time is mostly spent emitting tokens)
+LOCAL_MS_PER_OUTPUT_TOKEN = 2.0
+
+
+@benchmark("grade_capital_tier3_tokens", max_rounds=50)
+def _grade_capital_tier3_tokens(dataset: Dataset) -> Callable[[], Any]:
+    # Like grade_capital_tier3_local, but the model's latency grows with its output, as
+    # Gemini's does; compare p50/p95 against a baseline to see what a prompt change saves
+    counter = itertools.count()
+    rows = itertools.cycle(dataset)
+    options = {"local": {"ms_per_output_token": LOCAL_MS_PER_OUTPUT_TOKEN}}
+
+    def run_round() -> None:
+        row = next(rows)
+        with override_settings(LLM_PROVIDER_OPTIONS=options):
+            ai_service.grade_capital_answer(
+                row["country"], row["capital"], f"Qxzv {next(counter)}"
+            )
+
+    return run_round
+
+
+@benchmark("grade_capital_ai_cached")
+def _grade_capital_ai_cached(dataset: Dataset) -> Callable[[], Any]:
+    row = dataset[0]
+    answer = "Qxzv cached"
+    _expect_method(
+        ai_service.grade_capital_answer(row["country"], row["capital"], answer),
+        "ai",
+        answer,
+    )
+
+    def run_round() -> None:
+        ai_service.grade_capital_answer(row["country"], row["capital"], answer)
+
+    return run_round
+
+
+@benchmark("capitals_map_cold")
+def _capitals_map_cold(dataset: Dataset) -> Callable[[], Any]:
+    def run_round() -> None:
+        registry.reset_registry()
+        ai_service.get_all_capitals_map()
+
+    return run_round
+
+
+@benchmark("capitals_map_warm")
+def _capitals_map_warm(dataset: Dataset) -> Callable[[], Any]:
+    return ai_service.get_all_capitals_map
+
+
+@benchmark("startup_import", max_rounds=5)
+def _startup_import(dataset: Dataset) -> Callable[[], Any]:
+    # Cold interpreter start + Django setup + URLconf import, i.e. worker boot cost
+    def run_round() -> None:
+        subprocess.run(
+            [sys.executable, "-c", STARTUP_SNIPPET],
+            check=True,
+            capture_output=True,
+            cwd=settings.BASE_DIR,
+        )
+
+    return run_round
+
+
+# --- Hot endpoints ---
+
+
+def _get(client: Client, url: str) -> Callable[[], Any]:
+    def run_round() -> None:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise AssertionError(f"GET {url} returned {response.status_code}.")
+
+    return run_round
+
+
+@benchmark("endpoint_shuffle")
+def _endpoint_shuffle(dataset: Dataset) -> Callable[[], Any]:
+    return _get(Client(), "/api/trivia/?shuffle=true")
+
+
+@benchmark("endpoint_fun_fact")
+def _endpoint_fun_fact(dataset: Dataset) -> Callable[[], Any]:
+    from trivia.models import Country
+
+    country = Country.objects.get(name=dataset[0]["country"])
+    return _get(Client(), f"/api/trivia/{country.pk}/fun-fact/")
+
+
+@benchmark("endpoint_quiz")
+def _endpoint_quiz(dataset: Dataset) -> Callable[[], Any]:
+    return _get(Client(), f"/api/ai-quiz/generate/?topic={BENCHMARK_TOPIC}")
+
+
+def _health_round(stateless_prefixes: list[str]) -> Callable[[], Any]:
+    # Both health benchmarks pay the same override_settings cost per round, so the
+    # difference between them is the session/auth/messages/CSRF middleware alone.
+    client_round = _get(Client(), "/health/")
+
+    def run_round() -> None:
+        with override_settings(STATELESS_ROUTE_PREFIXES=stateless_prefixes):
+            client_round()
+
+    return run_round
+
+
+@benchmark("endpoint_health_stateless")
+def _endpoint_health_stateless(dataset: Dataset) -> Callable[[], Any]:
+    return _health_round(["/health/"])
+
+
+@benchmark("endpoint_health_full_middleware")
+def _endpoint_health_full_middleware(dataset: Dataset) -> Callable[[], Any]:
+    return _health_round([])
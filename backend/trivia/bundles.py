@@ -0,0 +1,149 @@
+"""
+Prebuilt quiz bundles, served as static files by nginx.
+
+Most game starts are the same two requests: 20 shuffled countries, or 10 questions from a
+topic. Each one went through nginx, gunicorn, DRF and the database only to return data
+that could have been decided ahead of time. `manage.py build_quiz_bundles` now writes
+`--count` variants of each start per period (day or hour) under
+`STATIC_ROOT/quiz-bundles/<period>/`:
+
+- `countries-<continent>-<n>.json`: a round as `?shuffle=true` deals it ("world" is every
+  country), plus its signed game token. Everyone served the file gets the same token, so
+  it carries no nonce: each player's first answer starts their own copy of the round
+  (see trivia/game_session.py).
+- `topic-<topic>-<n>.json`: 10 questions shaped like `/api/ai-quiz/generate/`, so without
+  answers or fun facts.
+
+`quiz-bundles/manifest.json` lists every file per kind, for the frontend to pick one at
+random. `quiz-bundles/current` points at the newest period, so nginx can pick one itself
+(see `/quiz/` in nginx/nginx.conf). Only grading reaches the backend after that.
+
+Every file gets a `.gz` sibling compressed once at build time, which nginx serves with
+`gzip_static` instead of gzipping the same bundle on every request.
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from trivia import ai_service, game_session, registry
+from trivia.models import QuizTopic
+from trivia.serializers import CountrySerializer
+
+BUNDLE_DIR = "quiz-bundles"
+MANIFEST = "manifest.json"
+# Continents too small to fill a meaningful round only get the "world" bundles
+MIN_ROUND_SIZE = 10
+
+PERIODS = {
+    "daily": ("%Y-%m-%d", timedelta(days=1)),
+    "hourly": ("%Y-%m-%dT%H", timedelta(hours=1)),
+}
+
+
+def bundle_root() -> Path:
+    return Path(settings.STATIC_ROOT) / BUNDLE_DIR
+
+
+def country_round(continent: str | None) -> dict[str, Any]:
+    session, countries = game_session.new_round(continent=continent)
+    return {
+        "kind": "countries",
+        "continent": continent or "World",
+        "countries": CountrySerializer(countries, many=True).data,
+        "token": session.to_token(),
+    }
+
+
+def topic_quiz(topic: str) -> dict[str, Any] | None:
+    questions = ai_service.generate_ai_quiz(topic)
+    if isinstance(questions, dict):  # Not enough questions in the pool yet
+        return None
+    return {"kind": "topic", "topic": topic, "questions": questions}
+
+
+def build(count: int) -> dict[str, list[dict[str, Any]]]:
+    """Returns `count` bundles per kind, keyed "countries/<slug>" and "topic/<slug>"."""
+    reg = registry.get_registry()
+    continents: dict[str, int] = {}
+    for country in reg.countries:
+        continents[country.continent] = continents.get(country.continent, 0) + 1
+
+    bundles: dict[str, list[dict[str, Any]]] = {
+        "countries/world": [country_round(None) for _ in range(count)]
+    }
+    for continent, size in sorted(continents.items()):
+        if size >= MIN_ROUND_SIZE:
+            bundles[f"countries/{slugify(continent)}"] = [
+                country_round(continent) for _ in range(count)
+            ]
+
+    for topic in QuizTopic.objects.order_by("name").values_list("name", flat=True):
+        quizzes = [quiz for _ in range(count) if (quiz := topic_quiz(topic))]
+        if quizzes:
+            bundles[f"topic/{slugify(topic)}"] = quizzes
+    return bundles
+
+
+def _write_json(path: Path, data: Any) -> None:
+    # Written aside and renamed, so nginx never serves a half-written file. The .gz goes
+    # first: a fresh .json next to a stale .gz would serve the old bundle to gzip clients
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    for target, content in (
+        (path.with_name(path.name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0)),
+        (path, body),
+    ):
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, target)
+
+
+def write(
+    bundles: dict[str, list[dict[str, Any]]],
+    period: str,
+    now: datetime | None = None,
+    keep: int = 2,
+) -> dict[str, Any]:
+    """Writes one period's bundles, repoints `current` and the manifest, prunes old periods."""
+    now = now or timezone.now()
+    fmt, length = PERIODS[period]
+    name = now.strftime(fmt)
+    root = bundle_root()
+    directory = root / name
+    directory.mkdir(parents=True, exist_ok=True)
+
+    files: dict[str, list[str]] = {}
+    for kind, variants in bundles.items():
+        prefix = kind.replace("/", "-")
+        files[kind] = []
+        for i, bundle in enumerate(variants):
+            _write_json(directory / f"{prefix}-{i}.json", bundle)
+            files[kind].append(f"{settings.STATIC_URL}{BUNDLE_DIR}/{name}/{prefix}-{i}.json")
+
+    current = root / "current"
+    tmp_link = root / "current.tmp"
+    tmp_link.unlink(missing_ok=True)
+    tmp_link.symlink_to(name, target_is_directory=True)
+    os.replace(tmp_link, current)
+
+    manifest = {
+        "period": name,
+        "generated_at": now.isoformat(),
+        "expires_at": (now + length).isoformat(),
+        "bundles": files,
+    }
+    _write_json(root / MANIFEST, manifest)
+
+    periods = sorted(p for p in root.iterdir() if p.is_dir() and not p.is_symlink())
+    for old in periods[:-keep] if keep > 0 else []:
+        for file in old.iterdir():
+            file.unlink()
+        old.rmdir()
+    return manifest
@@ -0,0 +1,109 @@
+"""
+Stateless game sessions for shuffled rounds.
+
+A round used to be 20 random countries and nothing else: each answer was checked by
+country id, so the server had no idea which round, position or score it belonged to. The
+round is now described by a signed token (`X-Game-Token` on `?shuffle=true`) holding the
+shuffle seed, the ordered country ids, the next position and the score so far. Answers
+are posted with the token, graded by position against the in-memory registry, and
+answered with the next token: no session writes and no rows per game.
+
+The token is signed, not encrypted. It reveals only the ids the client already received,
+and any edit to it, such as a higher score, breaks the signature.
+
+A signature doesn't stop a client from posting the same token twice and keeping the
+better verdict, so each player's copy of a round carries a random `nonce` and every
+(nonce, position) is claimed once in the cache (`claim`); a second answer is rejected.
+A round dealt to many players at once (a prebuilt bundle, see trivia/bundles.py) has no
+nonce: the first answer starts the player's own copy. A deal stays valid for
+GAME_DEAL_MAX_AGE, long enough to outlive its bundle's period and a late rebuild. Replaying such a deal restarts the
+round from zero, and the deal lists the capitals anyway, so a score shows one pass
+through the round, not what the player knows: it is advisory, fit for display only.
+"""
+
+import random
+import secrets
+from dataclasses import dataclass, replace
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from trivia import registry
+from trivia.registry import CountryEntry
+
+TOKEN_SALT = "trivia.game_session"
+ROUND_SIZE = 20
+
+
+class InvalidGameToken(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class GameSession:
+    seed: int
+    country_ids: tuple[int, ...]
+    position: int = 0
+    score: int = 0
+    nonce: str = ""  # Empty for a deal shared by many players
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.country_ids)
+
+    def start(self) -> "GameSession":
+        """One player's copy of the round."""
+        return replace(self, nonce=secrets.token_urlsafe(12))
+
+    def advance(self, points: int) -> "GameSession":
+        return replace(self, position=self.position + 1, score=self.score + points)
+
+    def to_token(self) -> str:
+        payload = {
+            "s": self.seed,
+            "c": list(self.country_ids),
+            "i": self.position,
+            "p": self.score,
+            "n": self.nonce,
+        }
+        return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+    @classmethod
+    def from_token(cls, token: str) -> "GameSession":
+        try:
+            # A deal is signed when its bundle is built and served for the whole period
+            # after, so it lives longer than a player's copy
+            payload = signing.loads(
+                token, salt=TOKEN_SALT, max_age=settings.GAME_DEAL_MAX_AGE
+            )
+            if payload.get("n"):
+                signing.loads(token, salt=TOKEN_SALT, max_age=settings.GAME_SESSION_MAX_AGE)
+            return cls(
+                seed=payload["s"],
+                country_ids=tuple(payload["c"]),
+                position=payload["i"],
+                score=payload["p"],
+                nonce=payload.get("n", ""),
+            )
+        except (signing.BadSignature, KeyError, TypeError) as e:
+            raise InvalidGameToken(str(e)) from e
+
+
+def new_round(
+    size: int = ROUND_SIZE, continent: str | None = None
+) -> tuple[GameSession, list[CountryEntry]]:
+    """Shuffles a round from the registry, replacing `ORDER BY RANDOM()`."""
+    reg = registry.get_registry()
+    candidates = sorted(
+        c.id for c in reg.countries if continent is None or c.continent == continent
+    )
+    seed = secrets.randbits(32)
+    ids = random.Random(seed).sample(candidates, min(size, len(candidates)))
+    return GameSession(seed=seed, country_ids=tuple(ids)), [reg.by_id[i] for i in ids]
+
+
+def claim(session: GameSession) -> bool:
+    """Marks the session's current position answered; False if it already was."""
+    key = f"game_answer_{session.nonce}_{session.position}"
+    return cache.add(key, True, timeout=settings.GAME_SESSION_MAX_AGE)
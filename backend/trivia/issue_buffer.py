@@ -0,0 +1,239 @@
+"""
+Write-behind buffer for `ReportedIssue` submissions.
+
+A bug report used to be a full `ModelSerializer` pass and an INSERT per POST, so a broken
+question reported by every player of a round meant a burst of identical rows and writes.
+Instead, `submit` appends the validated report to a queue in the default cache (Redis in
+production) and `flush` moves the queue into the table with one `bulk_create`:
+
+- The queue is a sequence of `issue_buffer:item:<n>` keys between a head and a tail
+  counter, since the Django cache API has no list type.
+- A flush runs inline on the submission that fills ISSUE_BUFFER_FLUSH_SIZE or finds the
+  oldest report older than ISSUE_BUFFER_MAX_AGE, from a per-worker timer thread every
+  ISSUE_BUFFER_MAX_AGE seconds (so the last reports before traffic stops still land),
+  and from `manage.py flush_reported_issues`, which deploys run first. A lock key keeps
+  flushes from overlapping. Reads never flush: the list is public, and a GET must not
+  write.
+- Reports about the same question/country and issue type within ISSUE_DEDUPE_WINDOW are
+  collapsed: the repeats are queued as markers that only bump `report_count`.
+
+If the cache is unavailable the report is written directly, so it is never dropped.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from trivia.models import ReportedIssue
+
+logger = logging.getLogger(__name__)
+
+HEAD_KEY = "issue_buffer:head"  # Next sequence number to flush
+TAIL_KEY = "issue_buffer:tail"  # Last sequence number handed out
+OLDEST_KEY = "issue_buffer:oldest"
+GAP_KEY = "issue_buffer:gap"
+LOCK_KEY = "issue_buffer:flush_lock"
+LOCK_TIMEOUT = 30  # seconds; a crashed flusher releases the lock on its own
+
+FIELDS = ("question_id", "country_name", "issue_type", "user_note")
+
+_timer_pid: int | None = None
+_timer_lock = threading.Lock()
+
+
+def _item_key(seq: int) -> str:
+    return f"issue_buffer:item:{seq}"
+
+
+def _dedupe_key(report: dict[str, Any]) -> str | None:
+    # Reports that point at nothing (e.g. a UI bug) are never collapsed
+    if report.get("question_id") is None and not report.get("country_name"):
+        return None
+    subject = (
+        f"{report['issue_type']}:{report.get('question_id')}:"
+        f"{(report.get('country_name') or '').strip().lower()}"
+    )
+    return f"issue_dedupe:{hashlib.md5(subject.encode()).hexdigest()}"
+
+
+def submit(report: dict[str, Any]) -> str:
+    """Queues a validated report; returns "queued", "duplicate" or "saved" (written directly)."""
+    _ensure_timer()
+    entry = {field: report.get(field) for field in FIELDS}
+    entry["created_at"] = timezone.now().isoformat()
+    dedupe_key = _dedupe_key(entry)
+
+    try:
+        duplicate = dedupe_key is not None and not cache.add(
+            dedupe_key, 1, timeout=settings.ISSUE_DEDUPE_WINDOW
+        )
+        _push({**entry, "dedupe_key": dedupe_key, "duplicate": duplicate})
+    except Exception as e:
+        logger.error(f"Issue buffer unavailable, saving report directly: {e}")
+        ReportedIssue.objects.create(**{field: entry[field] for field in FIELDS})
+        return "saved"
+
+    try:
+        if _flush_due():
+            flush()
+    except Exception as e:
+        # The report is queued; the next submission or the timer thread retries the flush
+        logger.error(f"Issue buffer flush failed: {e}")
+    return "duplicate" if duplicate else "queued"
+
+
+def _push(entry: dict[str, Any]) -> None:
+    try:
+        seq = cache.incr(TAIL_KEY)
+    except ValueError:  # First report since the cache was cleared
+        cache.add(TAIL_KEY, 0, timeout=None)
+        seq = cache.incr(TAIL_KEY)
+    cache.set(_item_key(seq), entry, timeout=None)
+    cache.add(OLDEST_KEY, time.time(), timeout=None)
+
+
+def _flush_due() -> bool:
+    state = cache.get_many([HEAD_KEY, TAIL_KEY, OLDEST_KEY])
+    pending = state.get(TAIL_KEY, 0) - state.get(HEAD_KEY, 1) + 1
+    oldest = state.get(OLDEST_KEY)
+    return pending >= settings.ISSUE_BUFFER_FLUSH_SIZE or (
+        oldest is not None and time.time() - oldest >= settings.ISSUE_BUFFER_MAX_AGE
+    )
+
+
+def pending() -> int:
+    state = cache.get_many([HEAD_KEY, TAIL_KEY])
+    return max(0, state.get(TAIL_KEY, 0) - state.get(HEAD_KEY, 1) + 1)
+
+
+def oldest_age() -> float | None:
+    oldest = cache.get(OLDEST_KEY)
+    return None if oldest is None else time.time() - oldest
+
+
+def flush() -> int:
+    """Moves every queued report into the table; returns the number of rows created."""
+    if not pending() or not cache.add(LOCK_KEY, 1, timeout=LOCK_TIMEOUT):
+        return 0
+
+    try:
+        # Read under the lock: state read before it may predate another flush, and
+        # writing its head back would move HEAD backwards
+        state = cache.get_many([HEAD_KEY, TAIL_KEY])
+        head, tail = state.get(HEAD_KEY, 1), state.get(TAIL_KEY, 0)
+        if tail < head:
+            return 0
+        keys = [_item_key(seq) for seq in range(head, tail + 1)]
+        items = cache.get_many(keys)
+        batch: list[dict[str, Any]] = []
+        next_head = head
+        for seq, key in zip(range(head, tail + 1), keys):
+            if key not in items:
+                # Numbered but not written yet, unless it was already missing last time
+                if cache.get(GAP_KEY) != seq:
+                    cache.set(GAP_KEY, seq, timeout=None)
+                    break
+            else:
+                batch.append(items[key])
+            next_head = seq + 1
+
+        created = _write(batch)
+        cache.set(HEAD_KEY, next_head, timeout=None)
+        cache.delete_many(keys[: next_head - head])
+        if next_head > tail:
+            cache.delete(OLDEST_KEY)
+        else:
+            cache.set(OLDEST_KEY, time.time(), timeout=None)
+        return created
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def _ensure_timer() -> None:
+    """Starts this process's timer thread; threads don't survive gunicorn's fork."""
+    global _timer_pid
+    if _timer_pid == os.getpid():
+        return
+    with _timer_lock:
+        if _timer_pid == os.getpid():
+            return
+        _timer_pid = os.getpid()
+        threading.Thread(
+            target=_flush_forever, name="issue-buffer-timer", daemon=True
+        ).start()
+
+
+def _flush_forever() -> None:
+    while True:
+        time.sleep(settings.ISSUE_BUFFER_MAX_AGE)
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Timed issue buffer flush failed: {e}")
+        finally:
+            close_old_connections()
+
+
+def _write(batch: list[dict[str, Any]]) -> int:
+    """Bulk inserts the new reports and adds the repeats to their originals' counts."""
+    issues: dict[str | None, ReportedIssue] = {}
+    new: list[ReportedIssue] = []
+    repeats: Counter[str] = Counter()
+    for entry in batch:
+        if entry["duplicate"]:
+            repeats[entry["dedupe_key"]] += 1
+            continue
+        issue = ReportedIssue(
+            **{field: entry[field] for field in FIELDS},
+            created_at=datetime.fromisoformat(entry["created_at"]),
+        )
+        new.append(issue)
+        if entry["dedupe_key"]:
+            issues.setdefault(entry["dedupe_key"], issue)
+
+    # Repeats whose original went out in an earlier flush are applied to the stored row
+    earlier = {key: n for key, n in repeats.items() if key not in issues}
+    for key, n in repeats.items():
+        if key in issues:
+            issues[key].report_count += n
+
+    if not earlier:
+        ReportedIssue.objects.bulk_create(new)
+        return len(new)
+    originals = {e["dedupe_key"]: e for e in batch if e["dedupe_key"] in earlier}
+    with transaction.atomic():
+        ReportedIssue.objects.bulk_create(new)
+        for key, n in earlier.items():
+            _add_repeats(originals[key], n)
+    return len(new)
+
+
+def _add_repeats(entry: dict[str, Any], n: int) -> None:
+    same_subject = ReportedIssue.objects.filter(
+        issue_type=entry["issue_type"], question_id=entry["question_id"], resolved=False
+    )
+    if entry["country_name"]:
+        same_subject = same_subject.filter(country_name__iexact=entry["country_name"].strip())
+    original = (
+        same_subject.order_by("-created_at", "-id").values_list("pk", flat=True).first()
+    )
+    if original is None:
+        # The original was resolved or deleted meanwhile: the repeats are a new report
+        ReportedIssue.objects.create(
+            **{field: entry[field] for field in FIELDS}, report_count=n
+        )
+    else:
+        ReportedIssue.objects.filter(pk=original).update(
+            report_count=F("report_count") + n
+        )
@@ -0,0 +1,71 @@
+"""
+Incremental parsing of a streamed JSON object.
+
+A grading generation is one JSON object. `JSONObjectStream` is fed the text as the model
+streams it and decodes each top-level field as soon as its value is complete, so the
+caller can answer once the verdict fields are in without waiting for the end of the
+stream.
+
+It only splits the object on top-level commas (tracking nesting, strings and escapes)
+and hands every `"key": value` segment to `json.loads`, so values are decoded exactly as
+the non-streamed path would. Anything before the opening brace, like a ```json fence,
+is ignored.
+"""
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+
+class JSONObjectStream:
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self.complete = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._segment_start = 0
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        """Adds streamed text and returns every top-level field decoded so far."""
+        self._buffer += chunk
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            if self.complete:
+                break
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._depth > 0:
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0 and ch == "[":
+                    raise ValueError("Expected a JSON object, got an array.")
+                self._depth += 1
+                if self._depth == 1:
+                    self._segment_start = i + 1
+            elif ch in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_segment(i)
+                    self.complete = True
+            elif ch == "," and self._depth == 1:
+                self._close_segment(i)
+                self._segment_start = i + 1
+        self._pos = len(buffer)
+        return self.fields
+
+    def has(self, names: Iterable[str]) -> bool:
+        return all(name in self.fields for name in names)
+
+    def _close_segment(self, end: int) -> None:
+        segment = self._buffer[self._segment_start : end].strip()
+        if segment:
+            self.fields.update(json.loads("{" + segment + "}"))
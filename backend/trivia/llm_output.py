@@ -0,0 +1,247 @@
+"""
+Response schemas and tolerant parsing of LLM output, per call site.
+
+Every `task` that expects JSON has a schema in `SCHEMAS`, written in the OpenAPI subset
+Gemini accepts as `response_schema`, so the model is constrained to the shape we read.
+The same schema is then checked locally, because a generation can still be cut off by
+`max_tokens`, wrapped in prose or fences, or (without a schema) simply wrong.
+
+`parse` tries hard not to throw away a paid generation:
+
+1. Plain `json.loads` after stripping ```json fences ("valid").
+2. The first JSON value in the text, ignoring prose before it and junk after it.
+3. A truncated generation is cut back to its last complete element and its open
+   brackets are closed, so `[{...}, {...}, {"quest` keeps the first two items and
+   `{"extra_facts": ["a", "b", "c` keeps two facts. Trailing commas are dropped.
+4. For a top-level array (the quiz), items that fail the item schema are dropped and
+   the rest are kept.
+
+Anything recovered by steps 2-4 counts as "repaired"; output that still fails its schema
+is "failed" and raises `LLMOutputError`, which the router treats like any other model
+failure (see `ai_service._with_fallbacks`). `trivia_llm_outputs_total` reports both rates.
+"""
+
+import json
+import logging
+import re
+from typing import Any
+
+from trivia import metrics
+from trivia.llm_providers import LLMProviderError
+
+logger = logging.getLogger(__name__)
+
+
+class LLMOutputError(LLMProviderError):
+    """Raised when a generation could not be parsed into its call site's schema."""
+
+
+_STRING = {"type": "STRING"}
+_STRINGS = {"type": "ARRAY", "items": _STRING}
+
+SCHEMAS: dict[str, dict[str, Any]] = {
+    "grade_capital": {
+        "type": "OBJECT",
+        "properties": {
+            "is_correct": {"type": "BOOLEAN"},
+            "all_capitals_guessed": {"type": "BOOLEAN"},
+            "correct_guesses": _STRINGS,
+            "incorrect_guesses": _STRINGS,
+            "missed_capitals": _STRINGS,
+            "points_awarded": {"type": "INTEGER"},
+            "shared_capital_info": {**_STRING, "nullable": True},
+            "feedback_message": _STRING,
+        },
+        "required": [
+            "is_correct",
+            "all_capitals_guessed",
+            "correct_guesses",
+            "incorrect_guesses",
+            "missed_capitals",
+            "points_awarded",
+            "feedback_message",
+        ],
+    },
+    "grade_country": {
+        "type": "OBJECT",
+        "properties": {"is_correct": {"type": "BOOLEAN"}, "feedback_message": _STRING},
+        "required": ["is_correct", "feedback_message"],
+    },
+    "fun_facts": {
+        "type": "OBJECT",
+        "properties": {"extra_facts": _STRINGS},
+        "required": ["extra_facts"],
+    },
+    # Keyed by country name; Gemini has no schema for free-form maps, so local only
+    "fact_batch": {"type": "OBJECT", "additionalProperties": _STRING},
+    "quiz": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "question": _STRING,
+                "options": _STRINGS,
+                "correctAnswer": _STRING,
+                "funFact": _STRING,
+            },
+            "required": ["question", "options", "correctAnswer", "funFact"],
+        },
+    },
+}
+
+_TYPES = {
+    "OBJECT": lambda v: isinstance(v, dict),
+    "ARRAY": lambda v: isinstance(v, list),
+    "STRING": lambda v: isinstance(v, str),
+    "BOOLEAN": lambda v: isinstance(v, bool),
+    "INTEGER": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "NUMBER": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+_FENCE = re.compile(r"```(?:json)?")
+
+
+def provider_schema(task: str) -> dict[str, Any] | None:
+    """The schema to send with the request, or None when the model can't express it."""
+    schema = SCHEMAS.get(task)
+    if schema is None or "additionalProperties" in json.dumps(schema):
+        return None
+    return schema
+
+
+def errors(value: Any, schema: dict[str, Any], path: str = "$") -> list[str]:
+    """Where `value` breaks `schema`; empty when it conforms."""
+    if value is None:
+        return [] if schema.get("nullable") else [f"{path} is null"]
+    kind = schema.get("type", "").upper()
+    if kind in _TYPES and not _TYPES[kind](value):
+        return [f"{path} is not {kind.lower()}"]
+    found = []
+    if kind == "OBJECT":
+        found += [f"{path}.{k} is missing" for k in schema.get("required", []) if k not in value]
+        for key, item in value.items():
+            sub = schema.get("properties", {}).get(key) or schema.get("additionalProperties")
+            if sub:
+                found += errors(item, sub, f"{path}.{key}")
+    elif kind == "ARRAY" and "items" in schema:
+        for i, item in enumerate(value):
+            found += errors(item, schema["items"], f"{path}[{i}]")
+    return found
+
+
+def parse(task: str, text: str) -> Any:
+    """Decodes and validates a generation for `task`, repairing it where possible."""
+    try:
+        value, repaired = _decode(text)
+        schema = SCHEMAS.get(task)
+        if schema is not None:
+            value, dropped = _conform(value, schema)
+            repaired = repaired or dropped > 0
+            if dropped:
+                logger.warning(f"Dropped {dropped} malformed item(s) from a {task} generation.")
+    except LLMOutputError:
+        metrics.LLM_OUTPUTS.labels(task=task, outcome="failed").inc()
+        raise
+    metrics.LLM_OUTPUTS.labels(task=task, outcome="repaired" if repaired else "valid").inc()
+    return value
+
+
+def validate(task: str, value: dict[str, Any], partial: bool = False) -> dict[str, Any]:
+    """
+    Checks an already decoded object, e.g. the fields of a streamed grade. With
+    `partial`, missing fields are allowed and only the ones present are checked.
+    """
+    schema = SCHEMAS.get(task)
+    if schema is not None:
+        if partial:
+            schema = {**schema, "required": []}
+        found = errors(value, schema)
+        if found:
+            metrics.LLM_OUTPUTS.labels(task=task, outcome="failed").inc()
+            raise LLMOutputError(f"{task} output does not match its schema: {found[:3]}")
+    metrics.LLM_OUTPUTS.labels(task=task, outcome="valid").inc()
+    return value
+
+
+def _decode(text: str) -> tuple[Any, bool]:
+    """The decoded value and whether it needed repairing."""
+    cleaned = _FENCE.sub("", text).strip()
+    try:
+        return json.loads(cleaned), False
+    except json.JSONDecodeError:
+        pass
+
+    starts = [i for i in (cleaned.find("{"), cleaned.find("[")) if i >= 0]
+    if not starts:
+        raise LLMOutputError("No JSON value in the generation.")
+    body = cleaned[min(starts) :]
+    decoder = json.JSONDecoder(strict=False)
+    try:
+        return decoder.raw_decode(body)[0], True
+    except json.JSONDecodeError:
+        pass
+
+    closed = _close_truncated(body)
+    if closed is not None:
+        try:
+            return decoder.decode(closed), True
+        except json.JSONDecodeError:
+            pass
+    raise LLMOutputError("The generation is not valid JSON and could not be repaired.")
+
+
+def _close_truncated(text: str) -> str | None:
+    """
+    Cuts `text` back to its last complete element and closes the brackets still open,
+    dropping trailing commas on the way; None when not even one element is complete.
+    """
+    out: list[str] = []
+    closers: list[str] = []
+    in_string = escape = False
+    cut, cut_closers = 0, ""
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "[{":
+            closers.append("]" if ch == "[" else "}")
+        elif ch in "]}":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not closers or closers.pop() != ch:
+                break
+            out.append(ch)
+            if not closers:
+                return "".join(out)
+            cut, cut_closers = len(out), "".join(reversed(closers))
+            continue
+        elif ch == "," and closers:
+            # Everything before a comma is a whole element (or a whole member)
+            cut, cut_closers = len(out), "".join(reversed(closers))
+        out.append(ch)
+    if not cut:
+        return None
+    return "".join(out[:cut]) + cut_closers
+
+
+def _conform(value: Any, schema: dict[str, Any]) -> tuple[Any, int]:
+    """The value if it matches the schema, salvaging the valid items of a top-level array."""
+    if schema.get("type") == "ARRAY" and isinstance(value, list) and "items" in schema:
+        kept = [item for item in value if not errors(item, schema["items"])]
+        if not kept:
+            raise LLMOutputError("No item of the generation matches its schema.")
+        return kept, len(value) - len(kept)
+    found = errors(value, schema)
+    if found:
+        raise LLMOutputError(f"Output does not match its schema: {found[:3]}")
+    return value, 0
@@ -0,0 +1,545 @@
+"""
+Pluggable LLM provider layer used by `ai_service._generate_ai_json`.
+
+The provider is selected by `settings.LLM_BACKEND` ("gemini" or "local") and built once
+per process with the matching entry from `settings.LLM_PROVIDER_OPTIONS`.
+
+Why a provider layer?:
+- The grading engine, fact harvesting and quiz generation only need "prompt in, JSON text
+  out". Hiding the SDK behind that contract lets the whole AI tier run without a network
+  or an API key.
+- `LocalProvider` is a deterministic stand-in that returns schema-valid JSON for every
+  task, with configurable latency and error distributions. It makes Tier 3 throughput,
+  the verdict caches and the circuit breaker testable offline (CI, benchmarks, laptops).
+
+Nothing here imports an LLM SDK at module level. `google.generativeai` (and its gRPC and
+protobuf dependency tree) costs several hundred milliseconds to import, and web workers,
+management commands like `load_country_data` and the test suite should not pay for it
+unless they actually call the model.
+
+The circuit breakers live here too, one per model: after `LLM_BREAKER_FAILURE_THRESHOLD`
+consecutive failures a model is skipped for `LLM_BREAKER_RESET_SECONDS`, so an outage
+moves calls to the route's fallback model (see `ai_service.route`), or degrades every
+grade to the instant hard fallback, instead of stacking up slow timeouts.
+
+Providers can also `stream` a generation as text chunks, which lets grading answer as
+soon as the verdict fields are parsed and close the stream (see
+`ai_service._stream_with_model`).
+
+Every response carries its token usage (`LLMUsage`): as reported by Gemini, or estimated
+from the text by the local stand-in. `trivia.llm_usage` turns it into per-call-site
+metrics and cost.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rapidfuzz import fuzz
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) for providers that report none."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class LLMProviderError(Exception):
+    """Raised when a provider fails to produce a response."""
+
+
+class LLMUnavailableError(LLMProviderError):
+    """Raised when the circuit breaker is open and the call was not attempted."""
+
+
+class LLMTimeoutError(LLMProviderError):
+    """Raised when a provider did not answer within the call's timeout."""
+
+
+@dataclass(frozen=True)
+class LLMUsage:
+    model_name: str
+    prompt_tokens: int
+    output_tokens: int
+    # True when counted with `estimate_tokens` rather than reported by the provider
+    estimated: bool = False
+
+    @classmethod
+    def estimate(cls, model_name: str, prompt: str, output: str) -> "LLMUsage":
+        return cls(model_name, estimate_tokens(prompt), estimate_tokens(output), True)
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    model_name: str
+    usage: LLMUsage | None = None
+
+
+@dataclass
+class LLMChunk:
+    """A piece of a streamed generation; the last one carries the usage, if known."""
+
+    text: str
+    usage: LLMUsage | None = None
+
+
+class LLMProvider:
+    """
+    Base class for providers. `task` names the call site (e.g. "grade_capital") and
+    `context` carries its structured inputs; real models only need the prompt, but
+    offline providers use them to build a well-formed answer. `schema` is the response
+    schema for providers that can constrain their output (see `trivia.llm_output`).
+    """
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    def model_label(self, model_name: str) -> str:
+        """The model name its usage is accounted under."""
+        return str(model_name)
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        task: str,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        context: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        task: str,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        context: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> Iterator[LLMChunk]:
+        """Yields the generated text in chunks. Without native streaming, in one chunk."""
+        response = self.generate(
+            prompt,
+            task=task,
+            model_name=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            context=context,
+            timeout=timeout,
+            schema=schema,
+        )
+        yield LLMChunk(response.text, response.usage)
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini via `google.generativeai`. The SDK is imported and configured on the
+    first real generation, not when the provider is built.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str | None = None) -> None:
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._genai: Any = None
+        self._genai_lock = threading.Lock()
+        if not self.api_key:
+            logger.warning(
+                "GEMINI_API_KEY environment variable not set. AI features will be disabled."
+            )
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    def _client(self) -> Any:
+        if self._genai is None:
+            with self._genai_lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=self.api_key)
+                    self._genai = genai
+        return self._genai
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        task: str,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        context: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
+        model = self._model(model_name, temperature, max_tokens, schema)
+        with self._timeouts():
+            response = model.generate_content(prompt, **self._request_options(timeout))
+        return LLMResponse(
+            text=response.text,
+            model_name=str(model_name),
+            usage=self._usage(response, model_name),
+        )
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        task: str,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        context: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> Iterator[LLMChunk]:
+        model = self._model(model_name, temperature, max_tokens, schema)
+        with self._timeouts():
+            for chunk in model.generate_content(
+                prompt, stream=True, **self._request_options(timeout)
+            ):
+                # Every chunk reports the running totals; the last one is the final count
+                yield LLMChunk(chunk.text, self._usage(chunk, model_name))
+
+    @staticmethod
+    def _request_options(timeout: float | None) -> dict[str, Any]:
+        return {"request_options": {"timeout": timeout}} if timeout else {}
+
+    @staticmethod
+    @contextmanager
+    def _timeouts() -> Iterator[None]:
+        """Reports the SDK's deadline errors as `LLMTimeoutError`, so callers can fall back."""
+        from google.api_core.exceptions import DeadlineExceeded
+
+        try:
+            yield
+        except (DeadlineExceeded, TimeoutError) as e:
+            raise LLMTimeoutError(str(e)) from e
+
+    @staticmethod
+    def _usage(response: Any, model_name: str) -> LLMUsage | None:
+        metadata = getattr(response, "usage_metadata", None)
+        if not metadata or not metadata.prompt_token_count:
+            return None
+        return LLMUsage(
+            model_name=str(model_name),
+            prompt_tokens=metadata.prompt_token_count,
+            output_tokens=metadata.candidates_token_count or 0,
+        )
+
+    def _model(
+        self,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        schema: dict[str, Any] | None = None,
+    ) -> Any:
+        generation_config = {
+            "temperature": temperature,
+            "top_p": 1,
+            "top_k": 1,
+            "max_output_tokens": max_tokens,
+            "response_mime_type": "application/json",
+        }
+        if schema is not None:
+            generation_config["response_schema"] = schema
+        return self._client().GenerativeModel(
+            model_name=str(model_name),
+            generation_config=generation_config,  # type: ignore
+        )
+
+
+class LocalProvider(LLMProvider):
+    """
+    Offline stand-in for the real model.
+
+    Output is a pure function of the prompt and `context` (the same call always yields
+    the same JSON), while latency and failures are drawn from a seeded RNG:
+    - latency_ms / latency_jitter_ms: sleep for latency_ms + uniform(0, jitter) per call.
+    - error_rate: probability of raising `LLMProviderError`.
+    - malformed_rate: probability of returning truncated JSON, like a cut-off generation.
+    - ms_per_output_token: extra latency per (estimated) output token. Real models
+      spend most of a generation emitting tokens, so longer outputs should cost more.
+    - stream_chunk_chars: chunk size of `stream`, which spreads the latency over the
+      chunks like a model emitting tokens.
+    """
+
+    name = "local"
+
+    def model_label(self, model_name: str) -> str:
+        return f"local/{model_name}"
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+        ms_per_output_token: float = 0.0,
+        stream_chunk_chars: int = 32,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.ms_per_output_token = ms_per_output_token
+        self.stream_chunk_chars = stream_chunk_chars
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        task: str,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        context: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
+        delay, text = self._draw(prompt, task, context)
+        self._sleep(delay, task, timeout)
+        if text is None:
+            raise LLMProviderError(f"Simulated {task} failure from the local provider.")
+        return LLMResponse(
+            text=text,
+            model_name=self.model_label(model_name),
+            usage=LLMUsage.estimate(self.model_label(model_name), prompt, text),
+        )
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        task: str,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        context: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> Iterator[LLMChunk]:
+        delay, text = self._draw(prompt, task, context)
+        if text is None:
+            self._sleep(delay, task, timeout)
+            raise LLMProviderError(f"Simulated {task} failure from the local provider.")
+        size = max(1, self.stream_chunk_chars)
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        usage = LLMUsage.estimate(self.model_label(model_name), prompt, text)
+        if timeout and delay > timeout * 1000:
+            self._sleep(delay, task, timeout)
+        for i, chunk in enumerate(chunks):
+            if delay:
+                time.sleep(delay / 1000 / len(chunks))
+            yield LLMChunk(chunk, usage if i == len(chunks) - 1 else None)
+
+    @staticmethod
+    def _sleep(delay: float, task: str, timeout: float | None) -> None:
+        """Waits out the simulated latency, or the timeout when the call would exceed it."""
+        if timeout and delay > timeout * 1000:
+            time.sleep(timeout)
+            raise LLMTimeoutError(f"Simulated {task} timeout after {timeout}s.")
+        if delay:
+            time.sleep(delay / 1000)
+
+    def _draw(
+        self, prompt: str, task: str, context: dict[str, Any] | None
+    ) -> tuple[float, str | None]:
+        """The call's delay in ms and its output text, or None for a simulated failure."""
+        with self._rng_lock:
+            delay = self.latency_ms + self._rng.uniform(0, self.latency_jitter_ms)
+            fail = self._rng.random() < self.error_rate
+            malformed = self._rng.random() < self.malformed_rate
+        if fail:
+            return delay, None
+
+        builder = getattr(self, f"_build_{task}", self._build_default)
+        text = json.dumps(builder(prompt, context or {}))
+        if malformed:
+            text = text[: len(text) // 2]
+        return delay + estimate_tokens(text) * self.ms_per_output_token, text
+
+    @staticmethod
+    def _facts(subject: str, prompt: str, count: int = 3) -> list[str]:
+        digest = hashlib.md5(prompt.encode()).hexdigest()[:8]
+        return [f"Local fact {i + 1} about {subject} ({digest})." for i in range(count)]
+
+    def _build_grade_capital(self, prompt: str, context: dict[str, Any]) -> Any:
+        capitals = context.get("correct_capitals", [])
+        answer = context.get("user_answer", "")
+        # A lenient partial match, standing in for the model's "be lenient" instructions
+        correct = [c for c in capitals if fuzz.WRatio(answer, c) >= 70]
+        is_correct = bool(correct)
+        return {
+            "is_correct": is_correct,
+            "all_capitals_guessed": is_correct and len(correct) == len(capitals),
+            "correct_guesses": correct,
+            "incorrect_guesses": [] if is_correct else [answer],
+            "missed_capitals": [c for c in capitals if c not in correct],
+            "points_awarded": 1 if is_correct else 0,
+            "shared_capital_info": None,
+            "feedback_message": (
+                f"Correct! The capital of {context.get('country', '')} is {', '.join(correct)}."
+                if is_correct
+                else f"Incorrect 😔. The correct capital is {', '.join(capitals)}."
+            ),
+        }
+
+    def _build_grade_country(self, prompt: str, context: dict[str, Any]) -> Any:
+        country = context.get("country", "")
+        is_correct = fuzz.WRatio(context.get("user_answer", ""), country) >= 70
+        return {
+            "is_correct": is_correct,
+            "feedback_message": (
+                f"Correct! {context.get('capital', '')} is the capital of {country}."
+                if is_correct
+                else f"Incorrect 😔. The correct answer is {country}."
+            ),
+        }
+
+    def _build_fun_facts(self, prompt: str, context: dict[str, Any]) -> Any:
+        return {"extra_facts": self._facts(context.get("country", "this country"), prompt)}
+
+    def _build_fact_batch(self, prompt: str, context: dict[str, Any]) -> Any:
+        return {
+            name: f"Did you know {self._facts(name, prompt, 1)[0]}"
+            for name in context.get("countries", [])
+        }
+
+    def _build_quiz(self, prompt: str, context: dict[str, Any]) -> Any:
+        topic = context.get("topic", "Trivia")
+        digest = hashlib.md5(prompt.encode()).hexdigest()[:8]
+        return [
+            {
+                "question": f"{topic} local question {i + 1} ({digest})?",
+                "options": ["A", "B", "C", "D"],
+                "correctAnswer": "A",
+                "funFact": f"Local fun fact {i + 1} about {topic}.",
+            }
+            for i in range(int(context.get("count", 10)))
+        ]
+
+    def _build_default(self, prompt: str, context: dict[str, Any]) -> Any:
+        return {}
+
+
+LLM_PROVIDERS: dict[str, type[LLMProvider]] = {
+    "gemini": GeminiProvider,
+    "local": LocalProvider,
+}
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker, shared by all threads of a worker.
+    While open, `allow()` returns False until `reset_seconds` have passed; then a single
+    trial call is let through and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                logger.warning(
+                    f"LLM circuit breaker opened after {self.failures} consecutive failures."
+                )
+
+
+@lru_cache(maxsize=1)
+def get_provider() -> LLMProvider:
+    backend = settings.LLM_BACKEND
+    options = settings.LLM_PROVIDER_OPTIONS.get(backend, {})
+    provider = LLM_PROVIDERS[backend](**options)
+    logger.info(f"LLM provider initialized: {provider.name}")
+    return provider
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model_name: str = "") -> CircuitBreaker:
+    """The model's breaker: one model's outage should not stop its fallbacks."""
+    with _breakers_lock:
+        breaker = _breakers.get(model_name)
+        if breaker is None:
+            breaker = _breakers[model_name] = CircuitBreaker(
+                failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+            )
+        return breaker
+
+
+def breaker_states() -> dict[str, str]:
+    with _breakers_lock:
+        return {name: breaker.state for name, breaker in _breakers.items()}
+
+
+@receiver(setting_changed)
+def _reset_llm_provider(setting: str, **kwargs: Any) -> None:
+    # Lets tests and benchmarks swap backends with override_settings
+    if setting.startswith("LLM_"):
+        get_provider.cache_clear()
+        with _breakers_lock:
+            _breakers.clear()
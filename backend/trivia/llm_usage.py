@@ -0,0 +1,126 @@
+"""
+Token and cost accounting for LLM calls, per call site.
+
+Every `_generate_with_model`/`_stream_with_model` call is recorded with its `task` (the call
+site: "grade_capital", "grade_country", "fun_facts" for JIT harvesting, "fact_batch" for
+the scheduled job, "quiz"), the model it was routed to, its prompt/output tokens and its
+latency:
+
+- As Prometheus counters and a latency histogram (see `trivia.metrics`), for dashboards.
+- As one compact JSON line in `LLM_USAGE_DIR/usage-<day>.jsonl`, so spend can be
+  reviewed after the fact (`manage.py llm_usage`). Days older than
+  `LLM_USAGE_RETENTION_DAYS` are deleted as new days start. An empty `LLM_USAGE_DIR`
+  (the default outside production) disables the log.
+
+Lines are short enough for `O_APPEND` writes to stay whole with several gunicorn workers
+and the Jenkins commands appending to the same file. Cost is computed from
+`settings.LLM_PRICING` (USD per million tokens), matched on the longest model-name prefix;
+models without a price (like the local stand-in) cost nothing.
+"""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+from trivia import metrics
+from trivia.llm_providers import LLMUsage
+
+logger = logging.getLogger(__name__)
+
+_pruned_on: date | None = None
+
+
+def usage_dir() -> Path:
+    return Path(settings.LLM_USAGE_DIR)
+
+
+def price(model_name: str) -> dict[str, float]:
+    """{"input", "output"} USD per million tokens for the model, zero when unknown."""
+    prefixes = [p for p in settings.LLM_PRICING if model_name.startswith(p)]
+    if not prefixes:
+        return {"input": 0.0, "output": 0.0}
+    return settings.LLM_PRICING[max(prefixes, key=len)]
+
+
+def cost(model_name: str, prompt_tokens: int, output_tokens: int) -> float:
+    rates = price(model_name)
+    return (prompt_tokens * rates["input"] + output_tokens * rates["output"]) / 1_000_000
+
+
+def record(task: str, usage: LLMUsage, seconds: float, status: str) -> None:
+    """Exports one call's usage and appends it to the usage log."""
+    model = usage.model_name
+    metrics.LLM_CALLS.labels(task=task, model=model, status=status).inc()
+    metrics.LLM_CALL_SECONDS.labels(task=task, model=model).observe(seconds)
+    metrics.LLM_TOKENS.labels(task=task, model=model, kind="prompt").inc(usage.prompt_tokens)
+    metrics.LLM_TOKENS.labels(task=task, model=model, kind="output").inc(usage.output_tokens)
+    metrics.LLM_COST_USD.labels(task=task, model=model).inc(
+        cost(model, usage.prompt_tokens, usage.output_tokens)
+    )
+
+    entry = {
+        "t": round(time.time()),
+        "task": task,
+        "model": model,
+        "in": usage.prompt_tokens,
+        "out": usage.output_tokens,
+        "ms": round(seconds * 1000),
+        "ok": status == "ok",
+    }
+    if usage.estimated:
+        entry["est"] = True
+    if not settings.LLM_USAGE_DIR:
+        return
+    try:
+        _append(entry)
+    except OSError as e:
+        # Accounting must never fail the call it accounts for
+        logger.error(f"Could not write LLM usage log: {e}")
+
+
+def _append(entry: dict[str, Any]) -> None:
+    global _pruned_on
+    today = datetime.now(timezone.utc).date()
+    directory = usage_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+    fd = os.open(
+        directory / f"usage-{today.isoformat()}.jsonl",
+        os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+        0o644,
+    )
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+    if _pruned_on != today:
+        _pruned_on = today
+        oldest = today - timedelta(days=settings.LLM_USAGE_RETENTION_DAYS)
+        for path in directory.glob("usage-*.jsonl"):
+            if path.stem.removeprefix("usage-") < oldest.isoformat():
+                path.unlink(missing_ok=True)
+
+
+def read(days: int) -> Iterator[dict[str, Any]]:
+    """Yields the logged calls of the last `days` days (UTC), oldest day first."""
+    if not settings.LLM_USAGE_DIR:
+        return
+    first = (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+    for path in sorted(usage_dir().glob("usage-*.jsonl")):
+        day = path.stem.removeprefix("usage-")
+        if day < first:
+            continue
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    yield {"day": day, **json.loads(line)}
+                except json.JSONDecodeError:
+                    continue  # A line cut short by a crash
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from trivia import bundles
+
+
+class Command(BaseCommand):
+    help = (
+        "Prebuilds shuffled country rounds and topic quizzes as static JSON bundles plus a "
+        "manifest (see trivia/bundles.py). Run it from cron once per --period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=10, help="Variants per continent and topic."
+        )
+        parser.add_argument(
+            "--period", choices=sorted(bundles.PERIODS), default="daily"
+        )
+        parser.add_argument(
+            "--keep", type=int, default=2, help="Periods kept on disk, current included."
+        )
+
+    def handle(self, *args, **options):
+        built = bundles.build(options["count"])
+        manifest = bundles.write(built, options["period"], keep=options["keep"])
+
+        for kind, files in manifest["bundles"].items():
+            self.stdout.write(f"  {kind:<32} {len(files)} bundle(s)")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {sum(len(f) for f in manifest['bundles'].values())} bundles for "
+                f"{manifest['period']} to {bundles.bundle_root()}."
+            )
+        )
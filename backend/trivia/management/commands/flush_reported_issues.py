@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from trivia import issue_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the bug reports waiting in the issue buffer to the database "
+        "(run first on every deploy, before anything else touches the cache)."
+    )
+
+    def handle(self, *args, **options):
+        waiting = issue_buffer.pending()
+        created = issue_buffer.flush()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Flushed {waiting} queued report(s) into {created} new issue(s)."
+            )
+        )
@@ -6,11 +6,27 @@ from trivia.ai_service import _generate_ai_json
 
 
 class Command(BaseCommand):
-    help = "Generates fun facts using Gemini AI and saves them to the database"
+    help = (
+        "Generates fun facts using Gemini AI and saves them to the database. Grading no "
+        "longer asks the model for facts, so this batch job is where pools are filled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target", type=int, default=25, help="Facts to keep per country."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=25, help="Countries per AI call."
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="When every country is at target, rotate facts for a random batch.",
+        )
 
     def handle(self, *args, **kwargs):
-        FACT_LIMIT = 25
-        BATCH_SIZE = 25
+        FACT_LIMIT = kwargs["target"]
+        BATCH_SIZE = kwargs["batch_size"]
 
         # Prioritize countries that haven't reached the target limit
         countries_to_process = (
@@ -19,7 +35,13 @@ class Command(BaseCommand):
             .order_by("fact_count")[:BATCH_SIZE]
         )
 
-        # Rolling Refresh: If all countries are full, pick a random batch to update
+        # Rolling Refresh: If all countries are full, pick a random batch to update.
+        # Opt-in, so a scheduled run with full pools makes no AI call at all
+        if not countries_to_process and not kwargs["refresh"]:
+            self.stdout.write(
+                f"✅ All countries at capacity ({FACT_LIMIT}). Nothing to generate."
+            )
+            return
         if not countries_to_process:
             self.stdout.write(
                 f"♻️ All countries at capacity ({FACT_LIMIT}). Initiating rolling refresh..."
@@ -43,7 +65,12 @@ class Command(BaseCommand):
         """
 
         try:
-            result_json = _generate_ai_json(prompt, temperature=0.8)
+            result_json = _generate_ai_json(
+                prompt,
+                temperature=0.8,
+                task="fact_batch",
+                context={"countries": country_names},
+            )
 
             for country in countries_to_process:
                 if country.name in result_json:
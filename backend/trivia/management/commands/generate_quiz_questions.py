@@ -45,13 +45,18 @@ class Command(BaseCommand):
             1. DIVERSITY: Mix easy, medium, and challenging questions. 
             2. FACT CHECK: Use historical/static data (Knowledge Cutoff Jan 2025).
             3. FORMAT: [{{"question": "...", "options": ["A", "B", "C", "D"], "correctAnswer": "...", "funFact": "..."}}]
-            
-            CRITICAL: Ensure the JSON is perfectly formatted. Do not include stray characters or markdown blocks. 
-            Ensure every opening quote has a matching closing quote.
             """
 
+            # The response schema constrains the format, and a generation cut off
+            # mid-question keeps its complete questions (see trivia/llm_output.py)
             try:
-                quiz_data = _generate_ai_json(prompt, temperature=0.7, max_tokens=6000)
+                quiz_data = _generate_ai_json(
+                    prompt,
+                    temperature=0.7,
+                    max_tokens=6000,
+                    task="quiz",
+                    context={"topic": topic_name, "count": BATCH_SIZE},
+                )
 
                 saved = 0
                 for item in quiz_data:
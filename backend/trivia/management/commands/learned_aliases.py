@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from trivia import aliases
+from trivia.models import LearnedAlias
+
+
+class Command(BaseCommand):
+    help = (
+        "Reviews aliases learned from AI verdicts and reports the Tier 3 traffic the "
+        "promoted ones would have avoided."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--approve", type=int, nargs="+", metavar="ID")
+        parser.add_argument("--reject", type=int, nargs="+", metavar="ID")
+        parser.add_argument(
+            "--decay",
+            action="store_true",
+            help="Delete pending aliases unseen for LEARNED_ALIAS_DECAY_DAYS.",
+        )
+        parser.add_argument(
+            "--status", choices=["pending", "approved", "rejected"], help="Filter the list."
+        )
+
+    def handle(self, *args, **options):
+        for status, ids in [("approved", options["approve"]), ("rejected", options["reject"])]:
+            if ids:
+                updated = LearnedAlias.objects.filter(pk__in=ids).update(status=status)
+                self.stdout.write(self.style.SUCCESS(f"Marked {updated} alias(es) {status}."))
+
+        if options["decay"]:
+            self.stdout.write(f"Decayed {aliases.decay()} stale pending alias(es).")
+
+        queryset = LearnedAlias.objects.select_related("country").order_by(
+            "-confirmations"
+        )
+        if options["status"]:
+            queryset = queryset.filter(status=options["status"])
+        promoted_ids = set(LearnedAlias.objects.promoted().values_list("pk", flat=True))
+
+        self.stdout.write(
+            f"{'id':>5}  {'mode':<8} {'country':<24} {'alias':<24} {'target':<20} "
+            f"{'status':<9} {'conf':>5} {'llm':>4}"
+        )
+        for a in queryset:
+            marker = "*" if a.pk in promoted_ids else " "
+            self.stdout.write(
+                f"{a.pk:>5}{marker} {a.game_mode:<8} {a.country.name[:24]:<24} "
+                f"{a.alias[:24]:<24} {a.target[:20]:<20} {a.status:<9} "
+                f"{a.confirmations:>5} {a.llm_calls:>4}"
+            )
+
+        # Every LLM call after the first (which taught us the alias) was for a new spelling.
+        # Confirmations count distinct clients, so repeats served from the verdict cache
+        # are only in Prometheus.
+        totals = LearnedAlias.objects.promoted().aggregate(llm_calls=Sum("llm_calls"))
+        count = len(promoted_ids)
+        llm_avoidable = (totals["llm_calls"] or 0) - count
+        self.stdout.write(
+            f"\n* {count} alias(es) promoted into Tier 1 "
+            f"(approved, or >= {settings.LEARNED_ALIAS_MIN_CONFIRMATIONS} confirmations while pending)."
+        )
+        self.stdout.write(
+            f"  Had they been Tier 1 from the first verdict, they would have avoided "
+            f"{llm_avoidable} LLM call(s), plus the cached-verdict lookups counted by "
+            f'trivia_grading_results_total{{grading_method="cached-ai"}}.'
+        )
+        self.stdout.write(
+            "  Matches since promotion are counted by trivia_learned_alias_hits_total."
+        )
@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from trivia import llm_usage
+
+
+class Command(BaseCommand):
+    help = "Summarizes LLM calls, tokens and estimated cost per feature per day."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--task", help="Only summarize this call site.")
+
+    def handle(self, *args, **options):
+        # (day, task) -> running totals
+        rows = defaultdict(
+            lambda: {"calls": 0, "errors": 0, "in": 0, "out": 0, "cost": 0.0, "est": 0}
+        )
+        for entry in llm_usage.read(options["days"]):
+            if options["task"] and entry["task"] != options["task"]:
+                continue
+            row = rows[(entry["day"], entry["task"])]
+            row["calls"] += 1
+            row["errors"] += 0 if entry["ok"] else 1
+            row["in"] += entry["in"]
+            row["out"] += entry["out"]
+            row["cost"] += llm_usage.cost(entry["model"], entry["in"], entry["out"])
+            row["est"] += 1 if entry.get("est") else 0
+
+        if not rows:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No LLM usage logged in the last {options['days']} day(s) "
+                    f"(LLM_USAGE_DIR: {llm_usage.usage_dir()})."
+                )
+            )
+            return
+
+        self.stdout.write(
+            f"{'day':<11} {'task':<14} {'calls':>6} {'errors':>6} "
+            f"{'prompt tok':>11} {'output tok':>11} {'cost USD':>10}"
+        )
+        totals = defaultdict(float)
+        estimated = 0
+        for (day, task), row in sorted(rows.items()):
+            self.stdout.write(
+                f"{day:<11} {task:<14} {row['calls']:>6} {row['errors']:>6} "
+                f"{row['in']:>11} {row['out']:>11} {row['cost']:>10.4f}"
+            )
+            totals[task] += row["cost"]
+            estimated += row["est"]
+
+        self.stdout.write("")
+        for task, total in sorted(totals.items(), key=lambda item: -item[1]):
+            self.stdout.write(self.style.SUCCESS(f"  {task:<14} {total:>10.4f} USD"))
+        if estimated:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"  {estimated} call(s) were counted with estimated tokens."
+                )
+            )
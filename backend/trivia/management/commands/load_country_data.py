@@ -1,7 +1,7 @@
 import csv
 from django.core.management.base import BaseCommand
+from trivia import verdict_store
 from trivia.models import Country
-from django.core.cache import cache
 import os
 
 
@@ -44,5 +44,6 @@ class Command(BaseCommand):
             )
         )
 
-        cache.clear()
-        self.stdout.write(self.style.SUCCESS("Cleared Redis cache."))
+        # Only the verdicts: sessions, throttles and queued reports share the cache
+        cleared = verdict_store.clear_cache()
+        self.stdout.write(self.style.SUCCESS(f"Cleared {cleared} cached verdict(s)."))
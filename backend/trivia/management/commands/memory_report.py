@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from config import memory
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports RSS and the shared/private page split of each gunicorn process. "
+        "Save a run with --output, then pass it to --compare after a config change "
+        "(e.g. GUNICORN_GC_FREEZE=false vs true)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--match",
+            default="gunicorn",
+            help="Substring of the command line identifying the processes.",
+        )
+        parser.add_argument("--output", help="Write the report as JSON to this path.")
+        parser.add_argument("--compare", help="A previous --output report to diff against.")
+
+    def handle(self, *args, **options):
+        processes = memory.find_processes(options["match"])
+        if not processes:
+            raise CommandError(f"No processes matching '{options['match']}' (Linux only).")
+
+        self.stdout.write(
+            f"{'pid':>8}  {'role':<7} {'rss':>9} {'pss':>9} {'shared':>9} {'private':>9}  (KiB)"
+        )
+        for p in processes:
+            self.stdout.write(
+                f"{p['pid']:>8}  {p['role']:<7} {p['rss']:>9} {p['pss']:>9} "
+                f"{p['shared']:>9} {p['private']:>9}"
+            )
+
+        summary = memory.summarize(processes)
+        avg = summary["worker_avg"]
+        self.stdout.write(
+            f"\n{summary['workers']} worker(s), per worker: rss {avg['rss']} KiB, "
+            f"shared {avg['shared']} KiB, private {avg['private']} KiB; "
+            f"total PSS {summary['total_pss']} KiB"
+        )
+
+        if options["compare"]:
+            before = memory.load_report(options["compare"])["summary"]
+            self.stdout.write("\nPer-worker change vs baseline:")
+            for key in ("rss", "shared", "private"):
+                was, now = before["worker_avg"][key], avg[key]
+                self.stdout.write(f"  {key:<8} {was:>9} -> {now:>9} KiB ({now - was:+d})")
+            self.stdout.write(
+                f"  total PSS {before['total_pss']} -> {summary['total_pss']} KiB"
+            )
+
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps({"processes": processes, "summary": summary}, indent=2)
+            )
+            self.stdout.write(self.style.SUCCESS(f"Report saved to {options['output']}"))
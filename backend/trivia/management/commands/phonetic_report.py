@@ -0,0 +1,101 @@
+import csv
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from trivia import ai_service
+from trivia.models import Country
+
+DEFAULT_LABELS = Path(settings.BASE_DIR) / "data" / "phonetic_labels.csv"
+
+
+def evaluate(rows: list[dict[str, str]]) -> dict:
+    """
+    Grades every labeled answer with the deterministic tiers only (no LLM) and tallies
+    which tier accepted it. Accepting a row labeled incorrect is a false accept.
+    """
+    capitals = dict(Country.objects.values_list("name", "capital"))
+    accepted: Counter = Counter()
+    false_accepts: Counter = Counter()
+    positives = negatives = 0
+    details = []
+
+    for row in rows:
+        if row["country"] not in capitals:
+            raise CommandError(f"Unknown country in labeled set: {row['country']}")
+        grader = (
+            ai_service.grade_capital_answer
+            if row["game_mode"] == "capital"
+            else ai_service.grade_country_answer
+        )
+        result = grader(row["country"], capitals[row["country"]], row["answer"], allow_ai=False)
+        method = result["grading_method"]
+        expected = row["is_correct"] == "1"
+
+        if expected:
+            positives += 1
+            if result["is_correct"]:
+                accepted[method] += 1
+        else:
+            negatives += 1
+            if result["is_correct"]:
+                false_accepts[method] += 1
+        details.append({**row, "grading_method": method, "accepted": result["is_correct"]})
+
+    return {
+        "positives": positives,
+        "negatives": negatives,
+        "accepted": dict(accepted),
+        "false_accepts": dict(false_accepts),
+        "phonetic_false_accept_rate": (
+            false_accepts["phonetic"] / negatives if negatives else 0.0
+        ),
+        "details": details,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the phonetic grading tier against a labeled answer set: answers it "
+        "resolves instead of the LLM, and its false accepts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--labels", default=str(DEFAULT_LABELS))
+        parser.add_argument(
+            "--verbose", action="store_true", help="List every labeled answer."
+        )
+
+    def handle(self, *args, **options):
+        with open(options["labels"], newline="", encoding="utf-8") as f:
+            report = evaluate(list(csv.DictReader(f)))
+
+        if options["verbose"]:
+            for d in report["details"]:
+                self.stdout.write(
+                    f"{d['game_mode']:<8} {d['country'][:24]:<24} {d['answer'][:20]:<20} "
+                    f"label={d['is_correct']} -> {d['grading_method']}"
+                    f"{' (accepted)' if d['accepted'] else ''}"
+                )
+            self.stdout.write("")
+
+        accepted, false_accepts = report["accepted"], report["false_accepts"]
+        unresolved = report["positives"] - sum(accepted.values())
+        self.stdout.write(
+            f"Correct answers ({report['positives']}): "
+            + ", ".join(f"{m} {n}" for m, n in sorted(accepted.items()))
+            + f", left for the LLM {unresolved}"
+        )
+        self.stdout.write(
+            f"Incorrect answers ({report['negatives']}): false accepts "
+            + (", ".join(f"{m} {n}" for m, n in sorted(false_accepts.items())) or "none")
+        )
+        rate = report["phonetic_false_accept_rate"]
+        style = self.style.SUCCESS if rate == 0 else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"Phonetic tier: {accepted.get('phonetic', 0)} LLM call(s) saved, "
+                f"false-accept rate {rate:.1%}"
+            )
+        )
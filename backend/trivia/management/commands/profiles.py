@@ -0,0 +1,64 @@
+import io
+import pstats
+import statistics
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from config import profiling
+
+
+class Command(BaseCommand):
+    help = "Lists and summarizes captured request profiles, grouped by route."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--token",
+            action="store_true",
+            help="Print a signed X-Profile-Token header value and exit.",
+        )
+        parser.add_argument("--route", help="Only summarize this route (view name).")
+        parser.add_argument(
+            "--top", type=int, default=15, help="Functions to show per route."
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=["cumulative", "tottime", "ncalls"],
+        )
+
+    def handle(self, *args, **options):
+        if options["token"]:
+            self.stdout.write(profiling.make_token())
+            return
+
+        by_route = defaultdict(list)
+        for entry in profiling.load_index():
+            by_route[entry["route"]].append(entry)
+
+        if options["route"]:
+            by_route = {
+                k: v for k, v in by_route.items() if k == options["route"]
+            }
+
+        if not by_route:
+            self.stdout.write(
+                self.style.WARNING(f"No profiles found in {profiling.profile_dir()}.")
+            )
+            return
+
+        for route, entries in sorted(
+            by_route.items(), key=lambda item: -len(item[1])
+        ):
+            durations = [e["duration_ms"] for e in entries]
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\n📍 {route}: {len(entries)} profile(s), "
+                    f"median {statistics.median(durations):.1f} ms, max {max(durations):.1f} ms"
+                )
+            )
+
+            # Aggregate every capture of the route into one pstats view
+            buffer = io.StringIO()
+            stats = pstats.Stats(*[e["profile_path"] for e in entries], stream=buffer)
+            stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["top"])
+            self.stdout.write(buffer.getvalue())
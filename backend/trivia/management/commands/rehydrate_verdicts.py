@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from trivia import ai_service, verdict_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Reloads the Redis AI verdict cache from the durable GradedAnswer table, e.g. "
+        "after a Redis restart or a cleared cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Keys per pipelined write."
+        )
+
+    def handle(self, *args, **options):
+        loaded = verdict_store.rehydrate(
+            {
+                "capital": ai_service._model_versions("grade_capital"),
+                "country": ai_service._model_versions("grade_country"),
+            },
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Loaded {loaded} verdict(s) into the cache."))
@@ -0,0 +1,163 @@
+import json
+import platform
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from trivia import benchmarks
+from trivia.models import Country, CountryFunFact, QuizQuestion, QuizTopic
+
+DEFAULT_RESULTS_DIR = settings.BASE_DIR / "benchmarks"
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the grading/endpoint microbenchmarks against a throwaway database, "
+        "stores the results as JSON and compares them to a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            choices=sorted(benchmarks.BENCHMARKS),
+            help="Run a subset of benchmarks.",
+        )
+        parser.add_argument(
+            "--output", default=str(DEFAULT_RESULTS_DIR / "results.json")
+        )
+        parser.add_argument(
+            "--baseline", default=str(DEFAULT_RESULTS_DIR / "baseline.json")
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Overwrite the baseline with this run instead of comparing.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Allowed slowdown of the median vs. baseline, in percent.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["only"] or sorted(benchmarks.BENCHMARKS)
+        dataset = benchmarks.load_dataset()
+
+        self.stdout.write(
+            f"⏱️ Running {len(names)} benchmarks x {options['rounds']} rounds on {len(dataset)} countries..."
+        )
+
+        # Mirror the test runner: an isolated DB seeded from the CSV, and the offline
+        # LLM stand-in (zero latency) so nothing ever reaches the network
+        setup_test_environment()
+        old_db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self._seed(dataset)
+            with override_settings(
+                LLM_BACKEND="local", LLM_PROVIDER_OPTIONS={"local": {}}
+            ):
+                results = benchmarks.run(dataset, names, options["rounds"])
+        finally:
+            connection.creation.destroy_test_db(old_db_name, verbosity=0)
+            teardown_test_environment()
+
+        for name, stats in results.items():
+            self.stdout.write(
+                f"  {name:<34} median {stats['median'] * 1000:9.3f} ms   "
+                f"p95 {stats['p95'] * 1000:9.3f} ms   min {stats['min'] * 1000:9.3f} ms"
+            )
+
+        import_time = benchmarks.import_time_report()
+        self.stdout.write(
+            f"\n📦 Startup imports: {import_time['total_ms']:.1f} ms "
+            f"(LLM SDK imported: {import_time['llm_sdk_imported']})"
+        )
+        for entry in import_time["top"][:5]:
+            self.stdout.write(
+                f"  {entry['module']:<34} {entry['cumulative_ms']:9.1f} ms"
+            )
+
+        payload = {
+            "meta": {
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "rounds": options["rounds"],
+            },
+            "benchmarks": results,
+            "import_time": import_time,
+        }
+
+        output_path = Path(
+            options["baseline"] if options["save_baseline"] else options["output"]
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(payload, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output_path}"))
+
+        if options["save_baseline"]:
+            return
+
+        baseline_path = Path(options["baseline"])
+        if not baseline_path.exists():
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No baseline at {baseline_path}. Run with --save-baseline to create one."
+                )
+            )
+            return
+
+        baseline = json.loads(baseline_path.read_text())["benchmarks"]
+        rows = benchmarks.compare(results, baseline, options["threshold"] / 100)
+        regressions = [row for row in rows if row["regressed"]]
+
+        for row in rows:
+            line = f"  {row['name']:<34} {row['change'] * 100:+7.1f}%"
+            style = self.style.ERROR if row["regressed"] else self.style.SUCCESS
+            self.stdout.write(style(line))
+
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmark(s) regressed by more than {options['threshold']}%."
+            )
+
+    def _seed(self, dataset):
+        countries = Country.objects.bulk_create(
+            [
+                Country(
+                    name=row["country"],
+                    capital=row["capital"],
+                    continent=row["continent"],
+                )
+                for row in dataset
+            ]
+        )
+        CountryFunFact.objects.bulk_create(
+            [
+                CountryFunFact(
+                    country=country, fact_text=f"Benchmark fact {i} for {country.name}"
+                )
+                for country in countries
+                for i in range(5)
+            ]
+        )
+        topic = QuizTopic.objects.create(name=benchmarks.BENCHMARK_TOPIC)
+        QuizQuestion.objects.bulk_create(
+            [
+                QuizQuestion(
+                    topic=topic,
+                    question_text=f"Benchmark question {i}",
+                    options=["A", "B", "C", "D"],
+                    correct_answer="A",
+                    fun_fact="Benchmark fact",
+                )
+                for i in range(50)
+            ]
+        )
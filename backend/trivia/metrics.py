@@ -0,0 +1,183 @@
+"""
+Custom Prometheus metrics for the trivia grading engine.
+
+`django_prometheus` already exports generic request/DB/cache metrics on `/metrics`. These
+collectors are registered on the same default registry, so they appear on that endpoint
+with no extra wiring. They answer the questions the generic metrics can't:
+- How often does each grading tier resolve an answer (and how much traffic reaches the LLM)?
+- How much CPU do the deterministic and fuzzy tiers burn per request?
+- How long does the LLM take, and how effective is the AI verdict cache?
+- Where does the best fuzzy score land, so the 85 threshold can be tuned with data?
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from prometheus_client import Counter, Histogram
+
+GRADING_RESULTS = Counter(
+    "trivia_grading_results_total",
+    "Answers graded, by the tier that resolved them.",
+    ["grading_method", "game_mode"],
+)
+
+GRADING_TIER_CPU_SECONDS = Histogram(
+    "trivia_grading_tier_cpu_seconds",
+    "Thread CPU time spent inside a deterministic grading tier.",
+    ["tier", "game_mode"],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, float("inf")),
+)
+
+FUZZY_BEST_SCORE = Histogram(
+    "trivia_fuzzy_best_score",
+    "Best token_sort_ratio score seen in Tier 2, including misses.",
+    ["game_mode"],
+    buckets=(50, 60, 70, 75, 80, 85, 90, 95, 100),
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    "trivia_llm_request_seconds",
+    "Wall time of a single _generate_ai_json call.",
+    ["status"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, float("inf")),
+)
+
+LLM_STREAM_SECONDS = Histogram(
+    "trivia_llm_stream_seconds",
+    "Streamed generations: time until the verdict fields were parsed (stage \"ready\").",
+    ["stage"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, float("inf")),
+)
+
+LLM_CALLS = Counter(
+    "trivia_llm_calls_total",
+    "LLM calls by call site (task), model and outcome (see trivia/llm_usage.py).",
+    ["task", "model", "status"],
+)
+
+LLM_CALL_SECONDS = Histogram(
+    "trivia_llm_call_seconds",
+    "Wall time of an LLM call by call site and model, until its answer was usable.",
+    ["task", "model"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, float("inf")),
+)
+
+LLM_FALLBACKS = Counter(
+    "trivia_llm_fallbacks_total",
+    "LLM calls answered by a fallback model of their route, by call site and model.",
+    ["task", "model"],
+)
+
+LLM_OUTPUTS = Counter(
+    "trivia_llm_outputs_total",
+    "Parsed LLM generations by call site: \"valid\", \"repaired\" locally, or "
+    "\"failed\" and discarded (see trivia/llm_output.py).",
+    ["task", "outcome"],
+)
+
+LLM_TOKENS = Counter(
+    "trivia_llm_tokens_total",
+    "Tokens billed by call site and model; kind is \"prompt\" or \"output\".",
+    ["task", "model", "kind"],
+)
+
+LLM_COST_USD = Counter(
+    "trivia_llm_cost_usd_total",
+    "Estimated spend in USD by call site and model, from settings.LLM_PRICING.",
+    ["task", "model"],
+)
+
+AI_CACHE_LOOKUPS = Counter(
+    "trivia_ai_cache_lookups_total",
+    "AI verdict cache lookups; hit ratio = hit / (hit + miss).",
+    ["game_mode", "result"],
+)
+
+VERDICT_STORE_LOOKUPS = Counter(
+    "trivia_verdict_store_lookups_total",
+    "Reads of the durable verdict table after a Redis miss (see trivia/verdict_store.py).",
+    ["game_mode", "result"],
+)
+
+VERDICT_STORE_WRITES = Counter(
+    "trivia_verdict_store_writes_total",
+    "Verdicts written behind to the durable verdict table.",
+)
+
+FACTS_HARVESTED = Counter(
+    "trivia_facts_harvested_total",
+    "New CountryFunFact rows created from LLM output.",
+    ["origin"],
+)
+
+LEARNED_ALIAS_HITS = Counter(
+    "trivia_learned_alias_hits_total",
+    "Tier 1 matches made through an alias promoted from AI verdicts.",
+    ["game_mode"],
+)
+
+THROTTLED_REQUESTS = Counter(
+    "trivia_throttled_requests_total",
+    "Requests over a rate limit: rejected for \"api\", answered without the LLM for \"ai\".",
+    ["scope"],
+)
+
+JIT_HARVEST_EVENTS = Counter(
+    "trivia_jit_harvest_events_total",
+    "Fun fact requests that found an empty pool and triggered JIT harvesting.",
+)
+
+PAYLOAD_CACHE_LOOKUPS = Counter(
+    "trivia_payload_cache_lookups_total",
+    "Precompressed payload lookups (see trivia/payloads.py); hit ratio = hit / (hit + miss).",
+    ["payload", "result"],
+)
+
+PAYLOAD_BYTES_SAVED = Counter(
+    "trivia_payload_bytes_saved_total",
+    "Response bytes saved by serving a stored compressed payload, by Content-Encoding.",
+    ["encoding"],
+)
+
+
+def record_grading(
+    result: dict[str, Any], game_mode: str, method: str | None = None
+) -> dict[str, Any]:
+    """
+    Counts a graded answer and hands the result straight back, so graders can
+    `return record_grading(...)`. `method` overrides the label when the response's own
+    `grading_method` doesn't tell the whole story (e.g. "cached-ai").
+    """
+    GRADING_RESULTS.labels(
+        grading_method=method or result.get("grading_method", "unknown"),
+        game_mode=game_mode,
+    ).inc()
+    return result
+
+
+@contextmanager
+def time_tier(tier: str, game_mode: str) -> Iterator[None]:
+    """
+    Records the thread CPU time of a grading tier. `thread_time` is used rather than
+    `process_time` because gunicorn runs several request threads per worker.
+    """
+    start = time.thread_time()
+    try:
+        yield
+    finally:
+        GRADING_TIER_CPU_SECONDS.labels(tier=tier, game_mode=game_mode).observe(
+            time.thread_time() - start
+        )
+
+
+@contextmanager
+def time_llm_request() -> Iterator[None]:
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        LLM_REQUEST_SECONDS.labels(status=status).observe(time.perf_counter() - start)
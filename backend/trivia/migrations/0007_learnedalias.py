@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trivia', '0006_alter_country_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnedAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_mode', models.CharField(choices=[('capital', 'Guess the Capital'), ('country', 'Guess the Country')], max_length=10)),
+                ('alias', models.CharField(max_length=200)),
+                ('target', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending review'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=10)),
+                ('confirmations', models.PositiveIntegerField(default=1)),
+                ('llm_calls', models.PositiveIntegerField(default=1)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(auto_now=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='learned_aliases', to='trivia.country')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('game_mode', 'country', 'alias'), name='unique_learned_alias')],
+            },
+        ),
+    ]
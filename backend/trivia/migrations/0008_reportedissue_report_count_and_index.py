@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trivia', '0007_learnedalias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportedissue',
+            name='report_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name='reportedissue',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='reportedissue',
+            index=models.Index(fields=['-created_at', '-id'], name='issue_created_idx'),
+        ),
+    ]
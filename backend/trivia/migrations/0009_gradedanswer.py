@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trivia', '0008_reportedissue_report_count_and_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradedAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_mode', models.CharField(choices=[('capital', 'Guess the Capital'), ('country', 'Guess the Country')], max_length=10)),
+                ('answer', models.CharField(max_length=200)),
+                ('model_version', models.CharField(max_length=100)),
+                ('verdict', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='graded_answers', to='trivia.country')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('game_mode', 'country', 'answer', 'model_version'), name='unique_graded_answer')],
+            },
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Country(models.Model):
@@ -62,9 +64,101 @@ class ReportedIssue(models.Model):
     issue_type = models.CharField(max_length=20, choices=ISSUE_TYPES)
     user_note = models.TextField()
     resolved = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Repeat reports collapsed into this one by the submission buffer
+    report_count = models.PositiveIntegerField(default=1)
+    # Set at submission, not by the (later) bulk insert of the buffer
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        # Backs the keyset pagination of the list view
+        indexes = [models.Index(fields=["-created_at", "-id"], name="issue_created_idx")]
 
     def __str__(self) -> str:
         return (
             f"{self.get_issue_type_display()} - {self.created_at.strftime('%m/%d/%Y')}"
         )
+
+
+class LearnedAliasQuerySet(models.QuerySet):
+    def promoted(self) -> "LearnedAliasQuerySet":
+        # Approved by review, or confirmed often enough while awaiting it
+        return self.filter(
+            models.Q(status="approved")
+            | models.Q(
+                status="pending",
+                confirmations__gte=settings.LEARNED_ALIAS_MIN_CONFIRMATIONS,
+            )
+        )
+
+
+class LearnedAlias(models.Model):
+    """
+    An answer the AI tier confirmed as correct for one country, keyed by its normalized
+    form. Once promoted it resolves in Tier 1 (see trivia/aliases.py).
+    """
+
+    GAME_MODES = [
+        ("capital", "Guess the Capital"),
+        ("country", "Guess the Country"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Pending review"),
+        ("approved", "Approved"),
+        ("rejected", "Rejected"),
+    ]
+
+    game_mode = models.CharField(max_length=10, choices=GAME_MODES)
+    country = models.ForeignKey(
+        Country, on_delete=models.CASCADE, related_name="learned_aliases"
+    )
+    alias = models.CharField(max_length=200)
+    # The capital (capital mode) or country name (country mode) the alias resolves to
+    target = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    # Fresh LLM verdicts plus cached verdicts that confirmed this alias
+    confirmations = models.PositiveIntegerField(default=1)
+    llm_calls = models.PositiveIntegerField(default=1)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    objects = LearnedAliasQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game_mode", "country", "alias"], name="unique_learned_alias"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.game_mode}: {self.alias} -> {self.target} ({self.status})"
+
+
+class GradedAnswer(models.Model):
+    """
+    A Tier 3 verdict, kept durably under the Redis verdict cache so a restart, an
+    eviction or a cleared cache doesn't mean paying for it again (see
+    trivia/verdict_store.py).
+    """
+
+    game_mode = models.CharField(max_length=10, choices=LearnedAlias.GAME_MODES)
+    country = models.ForeignKey(
+        Country, on_delete=models.CASCADE, related_name="graded_answers"
+    )
+    # Stripped and lowercased, the form the Redis key is hashed from
+    answer = models.CharField(max_length=200)
+    # The model that graded it, as labelled in the usage metrics
+    model_version = models.CharField(max_length=100)
+    verdict = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game_mode", "country", "answer", "model_version"],
+                name="unique_graded_answer",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.game_mode}: {self.answer} ({self.model_version})"
@@ -0,0 +1,44 @@
+"""
+Answer normalization shared by the grading tiers, the country registry and learned aliases.
+"""
+
+import re
+
+# 1. Define aliases grouped by the official name (easier to read and maintain)
+COUNTRY_ALIASES_GROUPED = {
+    "united states": ["usa", "us", "america", "united states of america"],
+    "united kingdom": ["uk", "great britain", "britain", "england"],
+    "saint vincent and the grenadines": ["saint vincent", "st vincent", "svg"],
+    "antigua and barbuda": ["antigua", "barbuda"],
+    "the bahamas": ["bahamas"],
+    "bosnia and herzegovina": ["bosnia", "herzegovina"],
+    "democratic republic of the congo": ["drc", "dr congo", "congo-kinshasa"],
+    "republic of the congo": ["congo-brazzaville", "congo republic"],
+    "dominican republic": ["dr"],
+    "sao tome and principe": ["sao tome", "principe"],
+    "trinidad and tobago": ["trinidad", "tobago"],
+    "united arab emirates": ["uae", "emirates"],
+    "central african republic": ["car"],
+    "the gambia": ["gambia"],
+    "saint kitts and nevis": ["saint kitts", "st kitts", "nevis"],
+    "cote d'ivoire": ["ivory coast"],
+    "north macedonia": ["macedonia"],
+}
+
+# 2. Dynamically flatten it into a fast lookup dictionary: {"usa": "united states", ...}
+COMMON_COUNTRY_ALIASES = {
+    alias: canonical_name
+    for canonical_name, aliases in COUNTRY_ALIASES_GROUPED.items()
+    for alias in aliases
+}
+
+
+def normalize_string(s: str) -> str:
+    """Removes punctuation and expands common abbreviations."""
+    s = s.strip().lower()
+    # Remove common punctuation
+    s = re.sub(r"[',.-]", "", s)
+    # Expand "st" to "saint" (word boundary \b ensures we don't change words like "state")
+    s = re.sub(r"\bst\b", "saint", s)
+    s = s.replace(" & ", " and ")
+    return s.strip()
@@ -0,0 +1,150 @@
+"""
+Pre-rendered, precompressed payloads for the hot read-only GETs.
+
+The country list and country details only change on deploy, yet every request rendered
+them through DRF and nginx gzipped the result again. This cache keeps, per worker, the
+rendered JSON of each payload together with its gzip and brotli variants, built once:
+
+- `respond` negotiates `Accept-Encoding` (br, then gzip, then identity) and returns the
+  stored bytes with `Content-Encoding` set, so neither Django nor nginx compresses per
+  request. An `ETag` lets repeat clients get a 304 without a body. Each encoding is its
+  own representation, so it gets its own strong tag (`"<md5>-br"`, `"<md5>-gzip"`).
+- Entries are dropped whenever the country registry is rebuilt (a Country save/delete
+  calls `registry.reset_all`), and built ahead of traffic by `trivia.warmup`.
+- Hits/misses and the bytes each encoding saved are exported to Prometheus.
+
+Random payloads (quiz starts, fun facts) can't be rendered ahead per request; quiz starts
+are precompressed as static bundles instead (see trivia/bundles.py).
+"""
+
+import gzip
+import hashlib
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from django.http import HttpRequest, HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from trivia import metrics, registry
+from trivia.serializers import CountrySerializer
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip variants are built
+    brotli = None
+
+# Below this, compression headers cost about as much as they save
+MIN_COMPRESS_BYTES = 512
+# Details and list pages both fit many times over; past it, new keys are just not stored
+MAX_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class Payload:
+    body: bytes
+    etag: str  # Of the identity body; see `etag_for`
+    variants: dict[str, bytes]  # Content-Encoding -> compressed body
+
+    def etag_for(self, encoding: str | None) -> str:
+        """The strong ETag of the body sent with `encoding`."""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+
+def render(data: Any) -> Payload:
+    body = JSONRenderer().render(data)
+    variants: dict[str, bytes] = {}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+    return Payload(body, f'"{hashlib.md5(body).hexdigest()}"', variants)
+
+
+def negotiate(accept_encoding: str, payload: Payload) -> str | None:
+    """Picks the stored encoding to send: br over gzip, skipping any the client refused (q=0)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip())
+    for encoding in ("br", "gzip"):
+        if encoding in payload.variants and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+class PayloadCache:
+    """
+    Payloads by "<kind>:<id>" key, built on first use and dropped with the registry they
+    were built from.
+    """
+
+    def __init__(self) -> None:
+        self._payloads: dict[str, Payload] = {}
+        self._registry: registry.CountryRegistry | None = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str, build: Callable[[], Any]) -> Payload:
+        kind = key.split(":", 1)[0]
+        reg = registry.get_registry()
+        payload = self._payloads.get(key) if self._registry is reg else None
+        if payload is not None:
+            metrics.PAYLOAD_CACHE_LOOKUPS.labels(payload=kind, result="hit").inc()
+            return payload
+
+        metrics.PAYLOAD_CACHE_LOOKUPS.labels(payload=kind, result="miss").inc()
+        payload = render(build())
+        with self._lock:
+            if self._registry is not reg:
+                self._payloads = {}
+                self._registry = reg
+            if len(self._payloads) < MAX_ENTRIES:
+                self._payloads[key] = payload
+        return payload
+
+    def clear(self) -> None:
+        self._payloads = {}
+        self._registry = None
+
+
+payload_cache = PayloadCache()
+
+
+def warm_details() -> int:
+    """Renders every country's detail payload; the list is keyed by host, so it warms on use."""
+    countries = registry.get_registry().countries
+    for entry in countries:
+        payload_cache.get(f"detail:{entry.id}", lambda: CountrySerializer(entry).data)
+    return len(countries)
+
+
+def respond(request: HttpRequest, payload: Payload) -> HttpResponse:
+    """The stored payload in the best encoding the client accepts, or a 304."""
+    encoding = negotiate(request.headers.get("Accept-Encoding", ""), payload)
+    etag = payload.etag_for(encoding)
+    # If-None-Match compares weakly, so a tag a proxy weakened still matches
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return HttpResponse(status=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+    if encoding is None:
+        response = HttpResponse(payload.body, content_type="application/json")
+    else:
+        response = HttpResponse(
+            payload.variants[encoding],
+            content_type="application/json",
+            headers={"Content-Encoding": encoding},
+        )
+        metrics.PAYLOAD_BYTES_SAVED.labels(encoding=encoding).inc(
+            len(payload.body) - len(payload.variants[encoding])
+        )
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    return response
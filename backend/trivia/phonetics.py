@@ -0,0 +1,135 @@
+"""
+Phonetic keys for the grading engine's phonetic tier (between fuzzy and AI grading).
+
+Answers spelled by ear ("Wagadugu", "Kigalee", "Tegusigalpa") are too far from the
+official spelling for the 85 `token_sort_ratio` cutoff, yet sound the same. `phonetic_key`
+is a Metaphone-style key tuned for transliterated place names: vowels after the first
+letter are dropped, sound-alike consonants share a code (c/k/q/g, s/z, d/t, v/f, ph/f,
+ch/sh), and French/Spanish spellings ("ou", "gu", "qu", "dj") map to how they are said.
+
+Two names are a phonetic match only when `phonetic_match` also rules out ambiguity, see
+its docstring. `manage.py phonetic_report` measures the tier against a labeled set.
+"""
+
+import re
+import unicodedata
+
+from rapidfuzz import fuzz
+
+# Keys shorter than this ("RM", "ML") collide too easily to be trusted
+MIN_KEY_LENGTH = 3
+# A phonetic match must still look somewhat like the candidate (ratio, spaces ignored)
+MIN_SIMILARITY = 60
+
+VOWELS = set("aeiouy")
+
+# Multi-letter spellings, longest first, with the code they map to
+_DIGRAPHS = [
+    ("tch", "X"),
+    ("sch", "SK"),
+    ("ph", "F"),
+    ("sh", "X"),
+    ("ch", "X"),
+    ("zh", "J"),
+    ("th", "0"),
+    ("kh", "K"),
+    ("gh", "K"),
+    ("ck", "K"),
+    ("dj", "J"),
+    ("dg", "J"),
+    ("qu", "K"),
+    ("wh", "W"),
+]
+
+_CONSONANTS = {
+    "b": "B",
+    "d": "T",
+    "f": "F",
+    "j": "J",
+    "k": "K",
+    "l": "L",
+    "m": "M",
+    "n": "N",
+    "p": "P",
+    "q": "K",
+    "r": "R",
+    "s": "S",
+    "t": "T",
+    "v": "F",
+    "x": "KS",
+    "z": "S",
+}
+
+
+def _ascii_letters(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s.lower())
+    return re.sub(r"[^a-z]", "", s.encode("ascii", "ignore").decode())
+
+
+def phonetic_key(s: str) -> str:
+    word = _ascii_letters(s)
+    codes: list[str] = []
+    previous = ""
+    i = 0
+    while i < len(word):
+        ch = word[i]
+        nxt = word[i + 1] if i + 1 < len(word) else ""
+
+        if word.startswith("ou", i) and i + 2 < len(word) and word[i + 2] in VOWELS:
+            code, step = "W", 2  # "Ouagadougou", "Ouahigouya"
+        elif ch == "g" and nxt == "u" and i + 2 < len(word) and word[i + 2] in VOWELS:
+            code, step = "K", 2  # "Guatemala", "Guinea": the u is silent
+        elif digraph := next((d for d in _DIGRAPHS if word.startswith(d[0], i)), None):
+            code, step = digraph[1], len(digraph[0])
+        elif ch in VOWELS or (ch == "j" and i > 0 and word[i - 1] not in VOWELS):
+            # A "j" after a consonant is a "y" sound: "Reykjavik", "Ljubljana"
+            code, step = ("A" if i == 0 else ""), 1
+        elif ch == "c":
+            code, step = ("S" if nxt in ("e", "i", "y") else "K"), 1
+        elif ch == "g":
+            code, step = ("J" if nxt in ("e", "i", "y") else "K"), 1
+        elif ch == "w":
+            code, step = ("W" if nxt in VOWELS else ""), 1
+        elif ch == "h":
+            code, step = "", 1
+        else:
+            code, step = _CONSONANTS.get(ch, ""), 1
+
+        # Doubled letters ("Nouakchott", "Kigalli") and merged codes ("zs") collapse, but
+        # only when adjacent: the two Ks of "Kigali" are separated by a vowel
+        if code and code != previous:
+            codes.append(code)
+        previous = code
+        i += step
+    return "".join(codes)
+
+
+def phonetic_match(
+    answer: str,
+    candidates: list[str],
+    keys: dict[str, str],
+    index: dict[str, set[str]],
+) -> int | None:
+    """
+    Returns the index of the candidate `answer` sounds like, or None.
+
+    `candidates` and `answer` are normalized strings; `keys` maps known names to their
+    precomputed key and `index` maps a key to every known name (capitals or countries)
+    that has it. The match is refused when:
+    - the key is shorter than MIN_KEY_LENGTH,
+    - the answer is itself another known name ("Nigeria" is not a way to spell "Niger"),
+    - the key is shared with a name that is not a candidate ("Kingstown" vs "Kingston"),
+    - the answer fails a loose MIN_SIMILARITY spelling check.
+    """
+    key = phonetic_key(answer)
+    if len(key) < MIN_KEY_LENGTH or (answer in keys and answer not in candidates):
+        return None
+    if index.get(key, set()) - set(candidates):
+        return None
+
+    for i, candidate in enumerate(candidates):
+        candidate_key = keys.get(candidate) or phonetic_key(candidate)
+        similarity = fuzz.ratio(answer.replace(" ", ""), candidate.replace(" ", ""))
+        if candidate_key == key and similarity >= MIN_SIMILARITY:
+            return i
+    return None
@@ -0,0 +1,225 @@
+"""
+In-process registry of the static trivia data.
+
+The country table is tiny (~240 rows) and only changes on deploy, yet every grade used to
+fetch the capital map from Redis and every fun fact/quiz start ran `ORDER BY RANDOM()`.
+This module keeps the read-mostly structures in worker memory instead:
+
+- `CountryRegistry`: countries by id/name, the capital -> countries map, normalized
+  indexes of capitals and country names (aliases included), the fuzzy choice lists and
+  the phonetic keys, plus well-known non-capital cities (`data/notable_cities.csv`).
+  Built once per process from the DB; a Country save/delete in this process resets it.
+- Question and fact pools: the ids available per quiz topic and per country, refreshed
+  every `TRIVIA_POOL_TTL` seconds, so a random pick is `random.sample` + a primary key
+  lookup. Callers fall back to the DB when a pool is empty or an id has vanished.
+- Learned alias pools: answers promoted from AI verdicts (see `trivia.aliases`).
+
+`trivia.warmup.warm_up` builds all of this before a worker accepts traffic.
+"""
+
+import csv
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from trivia.models import Country, CountryFunFact, LearnedAlias, QuizQuestion
+from trivia.normalization import COMMON_COUNTRY_ALIASES
+from trivia.normalization import normalize_string as _normalize_string
+from trivia.phonetics import phonetic_key
+
+
+@dataclass(frozen=True)
+class CountryEntry:
+    id: int
+    name: str
+    capital: str
+    continent: str
+    capitals: tuple[str, ...]
+
+
+class CountryRegistry:
+    def __init__(
+        self,
+        countries: list[CountryEntry],
+        notable_cities: Iterable[tuple[str, str]] = (),
+    ) -> None:
+        self.countries = countries
+        self.by_id = {c.id: c for c in countries}
+        self.by_name = {c.name: c for c in countries}
+
+        # Lowercase capital -> country names, the shape of `get_all_capitals_map`
+        self.capital_map: dict[str, list[str]] = {}
+        # Normalized capital -> countries, and normalized name/alias -> country
+        self.capital_index: dict[str, list[CountryEntry]] = {}
+        self.country_index: dict[str, CountryEntry] = {}
+
+        for country in countries:
+            self.country_index[_normalize_string(country.name)] = country
+            for capital in country.capitals:
+                self.capital_map.setdefault(capital.lower(), []).append(country.name)
+                self.capital_index.setdefault(_normalize_string(capital), []).append(
+                    country
+                )
+
+        for alias, canonical in COMMON_COUNTRY_ALIASES.items():
+            if alias not in self.country_index and canonical in self.country_index:
+                self.country_index[alias] = self.country_index[canonical]
+
+        # Normalized city -> (city, country) for well-known cities that are no capital,
+        # so "Sydney" for Australia is graded without the AI tier
+        self.notable_cities: dict[str, tuple[str, CountryEntry]] = {}
+        for city, country_name in notable_cities:
+            normalized = _normalize_string(city)
+            country = self.by_name.get(country_name)
+            if country and normalized not in self.capital_index:
+                self.notable_cities[normalized] = (city, country)
+
+        # Flat choice lists for rapidfuzz.process lookups across the whole table
+        self.capital_choices = list(self.capital_index)
+        self.country_choices = list(self.country_index)
+
+        # Phonetic keys of every real capital and country name (not aliases), and the
+        # names sharing each key, for the phonetic tier's ambiguity check
+        self.phonetic_keys: dict[str, str] = {}
+        self.capital_phonetic_index: dict[str, set[str]] = {}
+        self.country_phonetic_index: dict[str, set[str]] = {}
+        for country in countries:
+            names = [(_normalize_string(country.name), self.country_phonetic_index)]
+            names += [(_normalize_string(c), self.capital_phonetic_index) for c in country.capitals]
+            for name, index in names:
+                key = phonetic_key(name)
+                self.phonetic_keys[name] = key
+                index.setdefault(key, set()).add(name)
+
+    @classmethod
+    def from_db(cls) -> "CountryRegistry":
+        return cls(
+            [
+                CountryEntry(
+                    id=c.id,
+                    name=c.name,
+                    capital=c.capital,
+                    continent=c.continent,
+                    capitals=tuple(cap.strip() for cap in c.capital.split("|")),
+                )
+                for c in Country.objects.order_by("id")
+            ],
+            notable_cities=load_notable_cities(),
+        )
+
+
+def load_notable_cities() -> list[tuple[str, str]]:
+    """Reads the curated (city, country) list; the registry drops rows it can't place."""
+    path = settings.BASE_DIR / "data" / "notable_cities.csv"
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [(row["City"], row["Country"]) for row in csv.DictReader(f)]
+
+
+_registry: CountryRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> CountryRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = CountryRegistry.from_db()
+    return _registry
+
+
+def reset_registry() -> None:
+    global _registry
+    _registry = None
+
+
+# --- Question, fact and learned alias pools ---
+
+
+class Pools:
+    """Maps a key to a list of values (row ids, alias pairs); rebuilt with one query when expired."""
+
+    def __init__(self, loader: Callable[[], Iterable[tuple[Any, Any]]]) -> None:
+        self._loader = loader
+        self._pools: dict[Any, list[Any]] | None = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> list[Any]:
+        pools = self._pools
+        if pools is None or time.monotonic() - self._built_at > settings.TRIVIA_POOL_TTL:
+            pools = self.refresh()
+        return pools.get(key, [])
+
+    def refresh(self) -> dict[Any, list[Any]]:
+        with self._lock:
+            pools: dict[Any, list[Any]] = {}
+            for key, value in self._loader():
+                pools.setdefault(key, []).append(value)
+            self._pools = pools
+            self._built_at = time.monotonic()
+        return pools
+
+    def invalidate(self) -> None:
+        self._pools = None
+
+
+# Topics are matched case-insensitively, like `QuizTopic.objects.get(name__iexact=...)`
+question_pools = Pools(
+    lambda: (
+        (name.lower(), question_id)
+        for name, question_id in QuizQuestion.objects.values_list(
+            "topic__name", "id"
+        ).iterator()
+    )
+)
+fact_pools = Pools(
+    lambda: CountryFunFact.objects.values_list("country_id", "id").iterator()
+)
+# (game_mode, country name) -> [(alias, target)] for aliases promoted into Tier 1. Counts
+# are bumped with UPDATEs (no signals), so promotions reach workers via the TTL.
+learned_alias_pools = Pools(
+    lambda: (
+        ((alias.game_mode, alias.country.name), (alias.alias, alias.target))
+        for alias in LearnedAlias.objects.promoted().select_related("country")
+    )
+)
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def _question_changed(**kwargs: object) -> None:
+    question_pools.invalidate()
+
+
+@receiver(post_save, sender=CountryFunFact)
+@receiver(post_delete, sender=CountryFunFact)
+def _fact_changed(**kwargs: object) -> None:
+    fact_pools.invalidate()
+
+
+@receiver(post_save, sender=LearnedAlias)
+@receiver(post_delete, sender=LearnedAlias)
+def _learned_alias_changed(**kwargs: object) -> None:
+    learned_alias_pools.invalidate()
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+def _country_changed(**kwargs: object) -> None:
+    reset_all()
+
+
+def reset_all() -> None:
+    """Drops the registry and every pool; the pools are keyed by country ids/names too."""
+    reset_registry()
+    for pools in (question_pools, fact_pools, learned_alias_pools):
+        pools.invalidate()
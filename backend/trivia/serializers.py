@@ -11,4 +11,24 @@ class CountrySerializer(serializers.ModelSerializer):
 class ReportedIssueSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReportedIssue
-        fields = "__all__"
+        fields = [
+            "id",
+            "question_id",
+            "country_name",
+            "issue_type",
+            "user_note",
+            "resolved",
+            "report_count",
+            "created_at",
+        ]
+
+
+class ReportedIssueSubmitSerializer(serializers.Serializer):
+    """Validates a submission for the write-behind buffer without building a model instance."""
+
+    question_id = serializers.IntegerField(required=False, allow_null=True)
+    country_name = serializers.CharField(
+        max_length=100, required=False, allow_null=True, allow_blank=True
+    )
+    issue_type = serializers.ChoiceField(choices=ReportedIssue.ISSUE_TYPES)
+    user_note = serializers.CharField()
@@ -0,0 +1,17 @@
+from django.test import SimpleTestCase
+
+from trivia import benchmarks
+
+
+class BenchmarkCompareTests(SimpleTestCase):
+    def test_flags_only_slowdowns_beyond_threshold(self) -> None:
+        baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}}
+        results = {
+            "fast": {"median": 1.05},
+            "slow": {"median": 1.2},
+            "new": {"median": 9.9},
+        }
+        rows = {row["name"]: row for row in benchmarks.compare(results, baseline, 0.10)}
+        self.assertEqual(set(rows), {"fast", "slow"})
+        self.assertFalse(rows["fast"]["regressed"])
+        self.assertTrue(rows["slow"]["regressed"])
@@ -0,0 +1,282 @@
+"""
+Query-count, cache-op and wall-time budgets for every route in `config/urls.py`.
+
+A change that adds an N+1, an extra `COUNT(*)` or a chatty cache pattern to a hot endpoint
+fails here with the captured SQL, where statements beyond the budget are marked with `+`
+and repeated statement shapes (the usual N+1 signature) are listed separately.
+
+Wall-time budgets are deliberately loose so they only catch order-of-magnitude slips on
+CI; scale them with BUDGET_TIME_MULTIPLIER on slow machines (e.g. the Pi).
+"""
+
+import os
+import re
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from health_check.checks import monitor
+from trivia import aliases, issue_buffer
+from trivia.models import Country, CountryFunFact, QuizQuestion, QuizTopic
+from trivia.warmup import warm_up
+
+TIME_MULTIPLIER = float(os.getenv("BUDGET_TIME_MULTIPLIER", "1"))
+
+CACHE_METHODS = (
+    "get",
+    "set",
+    "add",
+    "delete",
+    "get_many",
+    "set_many",
+    "delete_many",
+    "get_or_set",
+    "has_key",
+    "incr",
+    "decr",
+    "touch",
+)
+
+
+@contextmanager
+def count_cache_ops() -> Iterator[list[str]]:
+    """
+    Records calls made against the default cache. Only outermost calls are counted, since
+    backends implement e.g. `get_many` on top of `get`, while Redis does it in one round trip.
+    """
+    backend = caches["default"]
+    ops: list[str] = []
+    depth = 0
+
+    def counting(name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(method)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            nonlocal depth
+            if depth == 0:
+                ops.append(name)
+            depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                depth -= 1
+
+        return wrapper
+
+    with mock.patch.multiple(
+        backend,
+        **{name: counting(name, getattr(backend, name)) for name in CACHE_METHODS},
+    ):
+        yield ops
+
+
+def _statement_shape(sql: str) -> str:
+    # Collapse literals so the same statement with different ids groups together
+    sql = re.sub(r"'[^']*'", "?", sql)
+    return re.sub(r"\b\d+\b", "?", sql)
+
+
+def format_sql_report(queries: list[dict[str, Any]], budget: int) -> str:
+    lines = []
+    for i, query in enumerate(queries, start=1):
+        marker = "+" if i > budget else " "
+        lines.append(f"{marker} {i:>3}  {query['sql']}")
+
+    repeated = [
+        (shape, n)
+        for shape, n in Counter(_statement_shape(q["sql"]) for q in queries).items()
+        if n > 1
+    ]
+    if repeated:
+        lines.append("\n  Repeated statements (possible N+1):")
+        lines.extend(f"    {n}x  {shape}" for shape, n in repeated)
+    return "\n".join(lines)
+
+
+class BudgetTestCase(TestCase):
+    @contextmanager
+    def assertWithinBudget(
+        self, label: str, *, queries: int, cache_ops: int, ms: float
+    ) -> Iterator[None]:
+        with CaptureQueriesContext(connection) as captured, count_cache_ops() as ops:
+            start = time.perf_counter()
+            yield
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if len(captured.captured_queries) > queries:
+            self.fail(
+                f"{label}: {len(captured.captured_queries)} queries, budget is {queries}.\n"
+                + format_sql_report(captured.captured_queries, queries)
+            )
+        if len(ops) > cache_ops:
+            self.fail(f"{label}: {len(ops)} cache ops ({ops}), budget is {cache_ops}.")
+        if elapsed_ms > ms * TIME_MULTIPLIER:
+            self.fail(
+                f"{label}: took {elapsed_ms:.1f} ms, budget is {ms * TIME_MULTIPLIER:.0f} ms."
+            )
+
+
+@override_settings(LLM_BACKEND="local", LLM_PROVIDER_OPTIONS={"local": {}})
+class EndpointBudgetTests(BudgetTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        aliases._pending_hits.clear()
+        self.addCleanup(aliases._pending_hits.clear)
+        for i in range(30):
+            Country.objects.create(
+                name=f"Country {i}", capital=f"Capital {i}", continent="Europe"
+            )
+        self.country = Country.objects.create(
+            name="Rwanda", capital="Kigali", continent="Africa"
+        )
+        CountryFunFact.objects.create(country=self.country, fact_text="A fact.")
+        topic = QuizTopic.objects.create(name="World Geography")
+        self.questions = [
+            QuizQuestion.objects.create(
+                topic=topic,
+                question_text=f"Question {i}",
+                options=["A", "B", "C", "D"],
+                correct_answer="A",
+                fun_fact="Fact",
+            )
+            for i in range(12)
+        ]
+        # Budgets describe the steady state, not the first request after a deploy
+        warm_up()
+
+    def check_answer(self, answer: str, game_mode: str = "capital") -> Any:
+        response = self.client.post(
+            f"/api/trivia/{self.country.pk}/check-answer/",
+            {"user_answer": answer, "game_mode": game_mode},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_shuffle_list(self) -> None:
+        with self.assertWithinBudget("shuffle", queries=0, cache_ops=0, ms=100):
+            response = self.client.get("/api/trivia/?shuffle=true")
+        self.assertEqual(len(response.json()), 20)
+
+    def test_game_answer(self) -> None:
+        dealt = self.client.get("/api/trivia/?shuffle=true")
+        capital = dealt.json()[0]["capital"]
+        # Claiming the position, so the token can't be answered twice
+        with self.assertWithinBudget("game answer", queries=0, cache_ops=1, ms=100):
+            response = self.client.post(
+                "/api/trivia/game/answer/",
+                {"token": dealt["X-Game-Token"], "user_answer": capital},
+            )
+        self.assertEqual(response.json()["score"], 1)
+
+    def test_country_detail(self) -> None:
+        with self.assertWithinBudget("detail", queries=0, cache_ops=0, ms=100):
+            self.client.get(f"/api/trivia/{self.country.pk}/")
+
+    def test_check_answer_deterministic(self) -> None:
+        with self.assertWithinBudget("tier 1", queries=1, cache_ops=0, ms=100):
+            result = self.check_answer("Kigali")
+        self.assertEqual(result["grading_method"], "deterministic")
+
+    def test_check_answer_fuzzy(self) -> None:
+        with self.assertWithinBudget("tier 2", queries=1, cache_ops=0, ms=100):
+            result = self.check_answer("Kigalli")
+        self.assertEqual(result["grading_method"], "fuzzy")
+
+    def test_check_answer_country_mode(self) -> None:
+        with self.assertWithinBudget("country tier 1", queries=1, cache_ops=0, ms=100):
+            result = self.check_answer("Rwanda", game_mode="country")
+        self.assertEqual(result["grading_method"], "deterministic")
+
+    def test_check_answer_ai(self) -> None:
+        # Country lookup, plus the read-through to the durable verdicts on the Redis
+        # miss; the fresh verdict is written behind, off the request
+        with self.assertWithinBudget("tier 3", queries=2, cache_ops=2, ms=200):
+            result = self.check_answer("Butare")
+        self.assertEqual(result["grading_method"], "ai")
+
+    def test_check_answer_cached_ai(self) -> None:
+        self.check_answer("Butare")
+        with self.assertWithinBudget("cached tier 3", queries=1, cache_ops=1, ms=100):
+            self.check_answer("Butare")
+
+    def test_check_answer_cached_correct_ai(self) -> None:
+        self.assertTrue(self.check_answer("City of Kigali")["is_correct"])
+        self.check_answer("City of Kigali")  # Reloads the alias pool the verdict changed
+        # Country lookup, plus the fact harvest finding the fact the fresh verdict saved;
+        # a new client's learned-alias confirmation is checked in the cache and counted
+        # in-process, not written per hit
+        with self.assertWithinBudget("cached tier 3, correct", queries=2, cache_ops=2, ms=100):
+            self.client.post(
+                f"/api/trivia/{self.country.pk}/check-answer/",
+                {"user_answer": "City of Kigali", "game_mode": "capital"},
+                REMOTE_ADDR="198.51.100.7",
+            )
+        self.assertEqual(aliases.pending_hits(), 1)
+
+    def test_fun_fact(self) -> None:
+        with self.assertWithinBudget("fun-fact", queries=2, cache_ops=0, ms=100):
+            self.client.get(f"/api/trivia/{self.country.pk}/fun-fact/")
+
+    def test_quiz_generate(self) -> None:
+        with self.assertWithinBudget("quiz generate", queries=1, cache_ops=0, ms=100):
+            response = self.client.get("/api/ai-quiz/generate/?topic=World Geography")
+        self.assertEqual(len(response.json()), 10)
+
+    def test_quiz_check_answer(self) -> None:
+        with self.assertWithinBudget("quiz check", queries=1, cache_ops=0, ms=100):
+            self.client.post(
+                f"/api/ai-quiz/{self.questions[0].pk}/check-answer/",
+                {"user_answer": "A"},
+            )
+
+    def test_report_issue_create(self) -> None:
+        self.client.post(  # The first report also creates the tail counter
+            "/api/report-issue/", {"issue_type": "ui_bug", "user_note": "Overlap"}
+        )
+        # Dedupe add, incr, item set, oldest add, flush check: no query until a flush
+        with self.assertWithinBudget("report create", queries=0, cache_ops=5, ms=100):
+            response = self.client.post(
+                "/api/report-issue/",
+                {"country_name": "Rwanda", "issue_type": "typo", "user_note": "Typo"},
+            )
+        self.assertEqual(response.status_code, 202)
+
+    def test_report_issue_list(self) -> None:
+        self.client.post(
+            "/api/report-issue/",
+            {"country_name": "Rwanda", "issue_type": "typo", "user_note": "Typo"},
+        )
+        issue_buffer.flush()
+        # A keyset page without COUNT(*), and no flush: a GET never writes
+        with self.assertWithinBudget("report list", queries=1, cache_ops=0, ms=100):
+            self.client.get("/api/report-issue/")
+
+    def test_api_root_and_health(self) -> None:
+        with self.assertWithinBudget("api root", queries=0, cache_ops=0, ms=50):
+            self.client.get("/")
+        with self.assertWithinBudget("health", queries=0, cache_ops=0, ms=50):
+            self.client.get("/health/")
+
+    @override_settings(HEALTH_CHECK_BACKGROUND=False)
+    def test_health_detailed_reads_snapshot(self) -> None:
+        monitor.refresh()
+        with self.assertWithinBudget("health detailed", queries=0, cache_ops=0, ms=50):
+            self.client.get("/health/detailed/")
+
+
+class SqlReportTests(TestCase):
+    def test_marks_overflow_and_repeats(self) -> None:
+        report = format_sql_report(
+            [{"sql": "SELECT 1 FROM t WHERE id = 1"}, {"sql": "SELECT 1 FROM t WHERE id = 2"}],
+            budget=1,
+        )
+        self.assertIn("+   2  SELECT 1 FROM t WHERE id = 2", report)
+        self.assertIn("2x  SELECT ? FROM t WHERE id = ?", report)
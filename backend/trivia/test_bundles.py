@@ -0,0 +1,104 @@
+import gzip
+import json
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from trivia import bundles
+from trivia.game_session import GameSession, InvalidGameToken
+from trivia.models import Country, QuizQuestion, QuizTopic
+
+
+class QuizBundleTests(TestCase):
+    def setUp(self) -> None:
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+        for i in range(25):
+            Country.objects.create(
+                name=f"Country {i}",
+                capital=f"Capital {i}",
+                continent="Europe" if i < 12 else "Asia" if i < 24 else "US",
+            )
+        topic = QuizTopic.objects.create(name="Formula 1")
+        for i in range(12):
+            QuizQuestion.objects.create(
+                topic=topic,
+                question_text=f"Question {i}",
+                options=["A", "B", "C", "D"],
+                correct_answer="A",
+                fun_fact="Fact",
+            )
+
+    def test_bundles_and_manifest_are_written(self) -> None:
+        with override_settings(STATIC_ROOT=self.static_root.name):
+            built = bundles.build(count=2)
+            manifest = bundles.write(
+                built, "daily", now=datetime(2026, 1, 2, tzinfo=timezone.utc)
+            )
+            root = bundles.bundle_root()
+
+        # Continents too small for a round ("US") only appear in the world bundles
+        self.assertEqual(
+            sorted(manifest["bundles"]),
+            ["countries/asia", "countries/europe", "countries/world", "topic/formula-1"],
+        )
+        self.assertEqual(manifest["period"], "2026-01-02")
+        self.assertEqual(
+            json.loads((root / bundles.MANIFEST).read_text())["bundles"],
+            manifest["bundles"],
+        )
+
+        world = json.loads((root / "current" / "countries-world-0.json").read_text())
+        self.assertEqual(len(world["countries"]), 20)
+        self.assertEqual(
+            list(GameSession.from_token(world["token"]).country_ids),
+            [c["id"] for c in world["countries"]],
+        )
+
+        quiz = json.loads((root / "current" / "topic-formula-1-1.json").read_text())
+        self.assertEqual(len(quiz["questions"]), 10)
+        self.assertNotIn("correctAnswer", quiz["questions"][0])
+
+        # Precompressed siblings for nginx's gzip_static
+        for name in ("countries-world-0.json", "topic-formula-1-1.json"):
+            path = root / "current" / name
+            self.assertEqual(
+                gzip.decompress(path.with_name(name + ".gz").read_bytes()),
+                path.read_bytes(),
+            )
+
+    def test_old_periods_are_pruned(self) -> None:
+        with override_settings(STATIC_ROOT=self.static_root.name):
+            for day in (1, 2, 3):
+                bundles.write(
+                    bundles.build(count=1),
+                    "daily",
+                    now=datetime(2026, 1, day, tzinfo=timezone.utc),
+                    keep=2,
+                )
+            root = bundles.bundle_root()
+        periods = sorted(p.name for p in Path(root).iterdir() if p.is_dir())
+        self.assertEqual(periods, ["2026-01-02", "2026-01-03", "current"])
+        self.assertEqual((root / "current").resolve().name, "2026-01-03")
+
+    def test_a_deal_outlives_its_bundle_period(self) -> None:
+        # Built two daily periods ago, e.g. the last build before a failed one
+        built_at = time.time() - 2 * 86400
+        with mock.patch("django.core.signing.time.time", return_value=built_at):
+            deal = bundles.country_round(None)
+            stale_copy = GameSession.from_token(deal["token"]).start().to_token()
+
+        response = APIClient().post(
+            "/api/trivia/game/answer/",
+            {"token": deal["token"], "user_answer": deal["countries"][0]["capital"]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["score"], 1)
+        # A player's own copy still expires after GAME_SESSION_MAX_AGE
+        with self.assertRaises(InvalidGameToken):
+            GameSession.from_token(stale_copy)
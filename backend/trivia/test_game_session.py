@@ -0,0 +1,104 @@
+import re
+from pathlib import Path
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from trivia.game_session import GameSession, InvalidGameToken, new_round
+from trivia.models import Country
+
+NGINX_CONF = Path(settings.BASE_DIR).parent / "nginx" / "nginx.conf"
+
+
+class GameSessionTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        for i in range(25):
+            Country.objects.create(
+                name=f"Country {i}", capital=f"Capital {i}", continent="Europe"
+            )
+
+    def deal(self) -> tuple[list[dict], str]:
+        response = self.client.get("/api/trivia/?shuffle=true")
+        return response.json(), response["X-Game-Token"]
+
+    def answer(self, token: str, user_answer: str) -> dict:
+        return self.client.post(
+            "/api/trivia/game/answer/", {"token": token, "user_answer": user_answer}
+        ).json()
+
+    def test_the_token_is_readable_cross_origin(self) -> None:
+        response = self.client.get(
+            "/api/trivia/?shuffle=true", HTTP_ORIGIN="http://localhost:5173"
+        )
+        exposed = response["Access-Control-Expose-Headers"].lower().split(", ")
+        self.assertIn("x-game-token", exposed)
+
+    @skipUnless(NGINX_CONF.exists(), "nginx config is not shipped with the backend image")
+    def test_production_nginx_exposes_the_token(self) -> None:
+        # In production nginx answers CORS, not django-cors-headers
+        api = re.search(r"location /api/ \{(.*?)\n        \}", NGINX_CONF.read_text(), re.S)
+        self.assertIn(
+            'add_header Access-Control-Expose-Headers "X-Game-Token" always;', api.group(1)
+        )
+
+    def test_round_is_graded_by_position_from_the_token(self) -> None:
+        countries, token = self.deal()
+        self.assertEqual(len(countries), 20)
+        self.assertEqual(
+            list(GameSession.from_token(token).country_ids), [c["id"] for c in countries]
+        )
+
+        first = self.answer(token, countries[0]["capital"])
+        self.assertTrue(first["is_correct"])
+        self.assertEqual((first["index"], first["score"], first["answered"]), (0, 1, 1))
+
+        second = self.answer(first["token"], "Nowhere")
+        self.assertFalse(second["is_correct"])
+        self.assertEqual(second["country"], countries[1]["name"])
+        self.assertEqual((second["score"], second["finished"]), (1, False))
+
+    def test_a_token_answers_only_once(self) -> None:
+        countries, token = self.deal()
+        self.answer(token, "Nowhere")
+        response = self.client.post(
+            "/api/trivia/game/answer/",
+            {"token": token, "user_answer": countries[0]["capital"]},
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_a_shared_deal_starts_a_copy_per_player(self) -> None:
+        session, countries = new_round()
+        deal = session.to_token()
+        first = self.answer(deal, countries[0].capital)
+        second = self.answer(deal, countries[0].capital)
+        self.assertEqual((first["score"], second["score"]), (1, 1))
+        nonces = {GameSession.from_token(r["token"]).nonce for r in (first, second)}
+        self.assertEqual(len(nonces), 2)
+        self.assertNotIn("", nonces)
+
+    def test_tampered_token_is_rejected(self) -> None:
+        _, token = self.deal()
+        forged = GameSession.from_token(token).advance(1)
+        with self.assertRaises(InvalidGameToken):
+            GameSession.from_token(forged.to_token()[:-2] + "xx")
+
+        response = self.client.post(
+            "/api/trivia/game/answer/", {"token": token + "x", "user_answer": "Paris"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_finished_round_accepts_no_more_answers(self) -> None:
+        countries, token = self.deal()
+        session = GameSession.from_token(token)
+        for _ in countries:
+            session = session.advance(0)
+        response = self.client.post(
+            "/api/trivia/game/answer/",
+            {"token": session.to_token(), "user_answer": "Paris"},
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from trivia import issue_buffer, verdict_store
+from trivia.models import ReportedIssue
+from trivia.test_throttles import production_rest_framework
+
+REPORT = {"question_id": 7, "issue_type": "fact_error", "user_note": "Wrong year"}
+
+
+@override_settings(ISSUE_BUFFER_FLUSH_SIZE=3, ISSUE_BUFFER_MAX_AGE=60)
+class IssueBufferTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+
+    def test_reports_are_bulk_inserted_once_the_buffer_fills(self) -> None:
+        for note in ["one", "two"]:
+            response = self.client.post(
+                "/api/report-issue/", {"issue_type": "ui_bug", "user_note": note}
+            )
+            self.assertEqual(response.json(), {"status": "queued"})
+        self.assertEqual(ReportedIssue.objects.count(), 0)
+        self.assertEqual(issue_buffer.pending(), 2)
+
+        self.client.post("/api/report-issue/", {"issue_type": "ui_bug", "user_note": "3"})
+        self.assertEqual(ReportedIssue.objects.count(), 3)
+        self.assertEqual(issue_buffer.pending(), 0)
+
+    def test_the_timer_writes_the_last_reports_before_traffic_stops(self) -> None:
+        issue_buffer.submit(REPORT)
+        # One tick, then stop the loop; the test's connection must stay open
+        clock = mock.Mock(**{"sleep.side_effect": [None, SystemExit]})
+        with mock.patch.object(issue_buffer, "time", clock), mock.patch.object(
+            issue_buffer, "close_old_connections"
+        ):
+            with self.assertRaises(SystemExit):
+                issue_buffer._flush_forever()
+        clock.sleep.assert_called_with(60)
+        self.assertEqual(ReportedIssue.objects.count(), 1)
+
+    def test_clearing_cached_verdicts_keeps_queued_reports(self) -> None:
+        issue_buffer.submit(REPORT)
+        cache.set(verdict_store.cache_key("capital", "Rwanda", "Butare"), {}, timeout=None)
+        self.assertEqual(verdict_store.clear_cache(), 1)
+        self.assertIsNone(cache.get(verdict_store.cache_key("capital", "Rwanda", "Butare")))
+        self.assertEqual(issue_buffer.pending(), 1)
+
+    def test_repeat_reports_are_collapsed(self) -> None:
+        self.assertEqual(issue_buffer.submit(REPORT), "queued")
+        self.assertEqual(issue_buffer.submit(REPORT), "duplicate")
+        issue_buffer.flush()
+        # A repeat arriving after its original was flushed updates the stored row
+        self.assertEqual(issue_buffer.submit({**REPORT, "user_note": "Still wrong"}), "duplicate")
+        issue_buffer.flush()
+
+        issue = ReportedIssue.objects.get()
+        self.assertEqual((issue.user_note, issue.report_count), ("Wrong year", 3))
+
+    def test_report_is_saved_directly_without_a_cache(self) -> None:
+        with mock.patch.object(issue_buffer.cache, "add", side_effect=ConnectionError):
+            self.assertEqual(issue_buffer.submit(REPORT), "saved")
+        self.assertEqual(ReportedIssue.objects.count(), 1)
+
+    @override_settings(ISSUE_BUFFER_FLUSH_SIZE=100)
+    def test_list_does_not_flush_and_pages_by_keyset(self) -> None:
+        for i in range(25):
+            issue_buffer.submit({"issue_type": "other", "user_note": f"note {i}"})
+        self.assertEqual(self.client.get("/api/report-issue/").json()["results"], [])
+        issue_buffer.flush()
+
+        response = self.client.get("/api/report-issue/")
+        data = response.json()
+        self.assertEqual(len(data["results"]), 20)
+        self.assertEqual(data["results"][0]["user_note"], "note 24")
+        self.assertNotIn("count", data)
+
+        data = self.client.get(data["next"]).json()
+        self.assertEqual([r["user_note"] for r in data["results"]][-1], "note 0")
+
+    def test_list_is_paged_under_production_settings(self) -> None:
+        ReportedIssue.objects.bulk_create(
+            ReportedIssue(issue_type="other", user_note=f"note {i}") for i in range(25)
+        )
+        with override_settings(REST_FRAMEWORK=production_rest_framework()):
+            data = self.client.get("/api/report-issue/").json()
+            self.assertEqual(len(data["results"]), 20)
+            self.assertIsNotNone(data["next"])
+            data = self.client.get("/api/report-issue/?page_size=500").json()
+            self.assertEqual(len(data["results"]), 25)
@@ -0,0 +1,78 @@
+import json
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from trivia import ai_service, llm_output
+from trivia.llm_output import LLMOutputError
+
+QUESTION = {
+    "question": "Who won the 2008 F1 title?",
+    "options": ["Hamilton", "Massa", "Raikkonen", "Kubica"],
+    "correctAnswer": "Hamilton",
+    "funFact": "He won it on the last corner.",
+}
+
+
+def outcomes(task: str, outcome: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "trivia_llm_outputs_total", {"task": task, "outcome": outcome}
+        )
+        or 0.0
+    )
+
+
+class ParseTests(SimpleTestCase):
+    def test_fenced_json_is_valid(self) -> None:
+        before = outcomes("grade_country", "valid")
+        value = llm_output.parse(
+            "grade_country", '```json\n{"is_correct": true, "feedback_message": "Yes"}\n```'
+        )
+        self.assertTrue(value["is_correct"])
+        self.assertEqual(outcomes("grade_country", "valid") - before, 1)
+
+    def test_truncated_quiz_keeps_its_complete_items(self) -> None:
+        text = json.dumps([QUESTION, {**QUESTION, "question": "Q2?"}, QUESTION])
+        before = outcomes("quiz", "repaired")
+        questions = llm_output.parse("quiz", text[: len(text) - 40])
+        self.assertEqual([q["question"] for q in questions], [QUESTION["question"], "Q2?"])
+        self.assertEqual(outcomes("quiz", "repaired") - before, 1)
+
+    def test_items_missing_fields_are_dropped(self) -> None:
+        text = "Here you go: " + json.dumps([QUESTION, {"question": "Q2?"}]) + " Enjoy!"
+        self.assertEqual(llm_output.parse("quiz", text), [QUESTION])
+
+    def test_truncated_array_inside_an_object_and_trailing_commas(self) -> None:
+        self.assertEqual(
+            llm_output.parse("fun_facts", '{"extra_facts": ["One.", "Two.", "Thr'),
+            {"extra_facts": ["One.", "Two."]},
+        )
+        self.assertEqual(
+            llm_output.parse("fact_batch", '{"Rwanda": "Did you know...",}'),
+            {"Rwanda": "Did you know..."},
+        )
+
+    def test_output_outside_the_schema_fails(self) -> None:
+        before = outcomes("grade_country", "failed")
+        with self.assertRaises(LLMOutputError):
+            llm_output.parse("grade_country", '{"is_correct": "yes", "feedback_message": ""}')
+        with self.assertRaises(LLMOutputError):
+            llm_output.parse("grade_country", '{"is_correct": tr')
+        self.assertEqual(outcomes("grade_country", "failed") - before, 2)
+
+    def test_free_form_maps_are_checked_locally_only(self) -> None:
+        self.assertIsNone(llm_output.provider_schema("fact_batch"))
+        self.assertEqual(llm_output.provider_schema("quiz"), llm_output.SCHEMAS["quiz"])
+
+
+@override_settings(
+    LLM_BACKEND="local", LLM_PROVIDER_OPTIONS={"local": {"malformed_rate": 1.0}}
+)
+class RepairedGenerationTests(TestCase):
+    def test_a_quiz_cut_in_half_is_salvaged(self) -> None:
+        questions = ai_service._generate_ai_json(
+            "prompt", task="quiz", context={"topic": "Formula 1", "count": 10}
+        )
+        self.assertGreaterEqual(len(questions), 4)
+        self.assertLess(len(questions), 10)
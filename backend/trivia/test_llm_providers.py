@@ -0,0 +1,268 @@
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from trivia import ai_service, llm_usage
+from trivia.json_stream import JSONObjectStream
+from trivia.llm_providers import (
+    CircuitBreaker,
+    GeminiProvider,
+    LLMProviderError,
+    LocalProvider,
+    get_breaker,
+    get_provider,
+)
+from trivia.models import Country, CountryFunFact
+
+
+class LocalProviderTests(TestCase):
+    def test_output_is_deterministic_and_schema_valid(self) -> None:
+        provider = LocalProvider()
+        kwargs = {
+            "task": "quiz",
+            "model_name": "test",
+            "temperature": 0.7,
+            "max_tokens": 6000,
+            "context": {"topic": "Formula 1", "count": 15},
+        }
+        first = provider.generate("prompt", **kwargs).text
+        self.assertEqual(first, provider.generate("prompt", **kwargs).text)
+        questions = json.loads(first)
+        self.assertEqual(len(questions), 15)
+        self.assertEqual(
+            set(questions[0]), {"question", "options", "correctAnswer", "funFact"}
+        )
+
+
+class GeminiProviderTests(TestCase):
+    def test_sdk_is_not_imported_until_first_generation(self) -> None:
+        provider = GeminiProvider(api_key="test-key")
+        self.assertTrue(provider.is_available())
+        self.assertNotIn("google.generativeai", sys.modules)
+
+
+@override_settings(LLM_BACKEND="local", LLM_PROVIDER_OPTIONS={"local": {}})
+class AITierOfflineTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        Country.objects.create(name="Rwanda", capital="Kigali", continent="Africa")
+
+    def test_tier3_grades_and_caches_offline(self) -> None:
+        result = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        self.assertEqual(result["grading_method"], "ai")
+        self.assertFalse(result["is_correct"])
+        # Facts come from the generate_fun_facts batch job, not from grading
+        self.assertNotIn("extra_facts", result)
+
+        with self.settings(LLM_PROVIDER_OPTIONS={"local": {"error_rate": 1.0}}):
+            cached = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        self.assertEqual(cached, result)
+
+    @override_settings(
+        LLM_PROVIDER_OPTIONS={"local": {"error_rate": 1.0}},
+        LLM_BREAKER_FAILURE_THRESHOLD=2,
+    )
+    def test_breaker_opens_after_consecutive_failures(self) -> None:
+        for answer in ["Butare", "Gisenyi"]:
+            result = ai_service.grade_capital_answer("Rwanda", "Kigali", answer)
+            self.assertEqual(result["grading_method"], "hard_fallback")
+        breaker = get_breaker(str(ai_service.ACTIVE_MODEL_NAME))
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+
+class JSONObjectStreamTests(TestCase):
+    def test_fields_are_decoded_as_soon_as_they_are_complete(self) -> None:
+        text = '```json\n{"is_correct": true, "feedback_message": "Correct, \\"Kigali\\" {ok}", "extra_facts": ["a, b", "c"]}```'
+        parser = JSONObjectStream()
+        seen = []
+        for i in range(0, len(text), 7):
+            seen.append(set(parser.feed(text[i : i + 7])))
+
+        self.assertIn({"is_correct"}, seen)
+        self.assertIn({"is_correct", "feedback_message"}, seen)
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.fields["feedback_message"], 'Correct, "Kigali" {ok}')
+        self.assertEqual(parser.fields["extra_facts"], ["a, b", "c"])
+
+    def test_truncated_stream_keeps_the_complete_fields(self) -> None:
+        parser = JSONObjectStream()
+        parser.feed('{"is_correct": false, "extra_facts": ["Cut off')
+        self.assertEqual(parser.fields, {"is_correct": False})
+        self.assertFalse(parser.complete)
+
+
+@override_settings(
+    LLM_BACKEND="local",
+    LLM_PROVIDER_OPTIONS={"local": {"stream_chunk_chars": 8}},
+    LLM_STREAM_GRADING=True,
+)
+class StreamedGradingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.country = Country.objects.create(
+            name="Rwanda", capital="Kigali", continent="Africa"
+        )
+
+    def test_verdict_is_returned_from_the_stream(self) -> None:
+        result = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        self.assertEqual(result["grading_method"], "ai")
+        self.assertFalse(result["is_correct"])
+        self.assertEqual(result["incorrect_guesses"], ["Butare"])
+
+    def test_check_answer_in_country_mode(self) -> None:
+        response = self.client.post(
+            f"/api/trivia/{self.country.pk}/check-answer/",
+            {"user_answer": "Republic of Rwanda", "game_mode": "country"},
+        )
+        self.assertTrue(response.json()["is_correct"])
+        # Only the correct answer's feedback is kept as a fact
+        self.assertEqual(CountryFunFact.objects.filter(source="user").count(), 1)
+
+    @override_settings(LLM_PROVIDER_OPTIONS={"local": {"malformed_rate": 1.0}})
+    def test_stream_cut_before_the_verdict_falls_back(self) -> None:
+        result = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        self.assertEqual(result["grading_method"], "hard_fallback")
+
+
+@override_settings(
+    LLM_BACKEND="local",
+    LLM_PROVIDER_OPTIONS={"local": {}},
+    LLM_PRICING={"local/": {"input": 1.0, "output": 4.0}},
+)
+class LLMUsageTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        Country.objects.create(name="Rwanda", capital="Kigali", continent="Africa")
+        usage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(usage_dir.cleanup)
+        self.enterContext(override_settings(LLM_USAGE_DIR=usage_dir.name))
+        self.usage_dir = Path(usage_dir.name)
+
+    def tokens(self, task: str, kind: str) -> float:
+        return (
+            REGISTRY.get_sample_value(
+                "trivia_llm_tokens_total",
+                {"task": task, "model": f"local/{ai_service.ACTIVE_MODEL_NAME}", "kind": kind},
+            )
+            or 0.0
+        )
+
+    def test_calls_are_accounted_per_call_site(self) -> None:
+        before = self.tokens("grade_capital", "output")
+        ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        ai_service.get_fun_fact("Rwanda")
+
+        entries = [
+            json.loads(line)
+            for path in self.usage_dir.glob("usage-*.jsonl")
+            for line in path.read_text().splitlines()
+        ]
+        self.assertEqual([e["task"] for e in entries], ["grade_capital", "fun_facts"])
+        self.assertTrue(all(e["ok"] and e["est"] and e["in"] > 0 for e in entries))
+        self.assertEqual(self.tokens("grade_capital", "output") - before, entries[0]["out"])
+
+        out = io.StringIO()
+        call_command("llm_usage", "--days", "1", stdout=out)
+        self.assertIn("grade_capital", out.getvalue())
+        self.assertIn("fun_facts", out.getvalue())
+
+    @override_settings(LLM_PROVIDER_OPTIONS={"local": {"error_rate": 1.0}})
+    def test_failed_calls_are_logged_as_errors(self) -> None:
+        ai_service.grade_country_answer("Rwanda", "Kigali", "Zzyzx")
+        [line] = next(self.usage_dir.glob("usage-*.jsonl")).read_text().splitlines()
+        self.assertFalse(json.loads(line)["ok"])
+
+    def test_cost_uses_the_longest_price_prefix(self) -> None:
+        with self.settings(
+            LLM_PRICING={"gemini-2.5-flash": {"input": 0.3, "output": 2.5},
+                         "gemini-2.5-flash-lite": {"input": 0.1, "output": 0.4}}
+        ):
+            self.assertAlmostEqual(
+                llm_usage.cost("gemini-2.5-flash-lite-preview", 1_000_000, 1_000_000), 0.5
+            )
+            self.assertEqual(llm_usage.cost("local/test", 1000, 1000), 0.0)
+
+
+@override_settings(
+    LLM_BACKEND="local",
+    LLM_PROVIDER_OPTIONS={"local": {}},
+    LLM_ROUTES={"grade_capital": ["fast", "backup"]},
+)
+class ModelRoutingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        Country.objects.create(name="Rwanda", capital="Kigali", continent="Africa")
+        self.models: list[str] = []
+
+    def fail_on(self, failing: str):
+        provider = get_provider()
+        real_generate = provider.generate
+
+        def generate(prompt, **kwargs):
+            self.models.append(kwargs["model_name"])
+            if kwargs["model_name"] == failing:
+                raise LLMProviderError("down")
+            return real_generate(prompt, **kwargs)
+
+        return mock.patch.object(provider, "generate", side_effect=generate)
+
+    def fallbacks(self) -> float:
+        return (
+            REGISTRY.get_sample_value(
+                "trivia_llm_fallbacks_total", {"task": "grade_capital", "model": "backup"}
+            )
+            or 0.0
+        )
+
+    def test_unrouted_tasks_use_the_environment_model(self) -> None:
+        self.assertEqual(ai_service.route("grade_capital"), ["fast", "backup"])
+        self.assertEqual(ai_service.route("quiz"), [str(ai_service.ACTIVE_MODEL_NAME)])
+
+    def test_primary_failure_falls_back_to_the_next_model(self) -> None:
+        before = self.fallbacks()
+        with self.fail_on("fast"):
+            result = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        self.assertEqual(result["grading_method"], "ai")
+        self.assertEqual(self.models, ["fast", "backup"])
+        self.assertEqual(self.fallbacks() - before, 1)
+
+    @override_settings(LLM_BREAKER_FAILURE_THRESHOLD=1)
+    def test_open_breaker_skips_only_its_model(self) -> None:
+        with self.fail_on("fast"):
+            ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+            ai_service.grade_capital_answer("Rwanda", "Kigali", "Gisenyi")
+        self.assertEqual(self.models, ["fast", "backup", "backup"])
+        self.assertEqual(get_breaker("fast").state, "open")
+        self.assertEqual(get_breaker("backup").state, "closed")
+
+    @override_settings(
+        LLM_PROVIDER_OPTIONS={"local": {"latency_ms": 500}},
+        LLM_ROUTES={"grade_capital": ["slow"]},
+        LLM_ROUTE_TIMEOUTS={"grade_capital": 0.01},
+    )
+    def test_timeout_is_counted_and_degrades_to_the_fallback(self) -> None:
+        sample = {"task": "grade_capital", "model": "local/slow", "status": "timeout"}
+        before = REGISTRY.get_sample_value("trivia_llm_calls_total", sample) or 0.0
+        result = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        self.assertEqual(result["grading_method"], "hard_fallback")
+        self.assertEqual(REGISTRY.get_sample_value("trivia_llm_calls_total", sample), before + 1)
+
+
+class CircuitBreakerTests(TestCase):
+    def test_half_open_trial_closes_on_success(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
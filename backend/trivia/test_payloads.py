@@ -0,0 +1,139 @@
+import gzip
+
+import brotli
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from trivia import payloads, registry
+from trivia.models import Country
+
+
+def lookups(result: str, payload: str = "list") -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "trivia_payload_cache_lookups_total",
+            {"payload": payload, "result": result},
+        )
+        or 0.0
+    )
+
+
+class NegotiationTests(TestCase):
+    def setUp(self) -> None:
+        self.payload = payloads.render([{"name": f"Country {i}"} for i in range(100)])
+
+    def test_prefers_brotli_then_gzip(self) -> None:
+        self.assertEqual(payloads.negotiate("gzip, deflate, br", self.payload), "br")
+        self.assertEqual(payloads.negotiate("gzip", self.payload), "gzip")
+        self.assertEqual(payloads.negotiate("*", self.payload), "br")
+        self.assertIsNone(payloads.negotiate("", self.payload))
+        self.assertIsNone(payloads.negotiate("identity", self.payload))
+
+    def test_refused_encodings_are_skipped(self) -> None:
+        self.assertEqual(payloads.negotiate("br;q=0, gzip;q=0.5", self.payload), "gzip")
+        self.assertIsNone(payloads.negotiate("br; q=0, gzip;q=0", self.payload))
+
+    def test_small_payloads_are_not_compressed(self) -> None:
+        payload = payloads.render({"id": 1, "name": "Rwanda"})
+        self.assertEqual(payload.variants, {})
+        self.assertIsNone(payloads.negotiate("br, gzip", payload))
+
+
+class PayloadViewTests(TestCase):
+    def setUp(self) -> None:
+        payloads.payload_cache.clear()
+        for i in range(30):
+            Country.objects.create(
+                name=f"Country {i}", capital=f"Capital {i}", continent="Europe"
+            )
+        self.country = Country.objects.create(
+            name="Rwanda", capital="Kigali", continent="Africa"
+        )
+
+    def test_list_is_served_in_the_accepted_encoding(self) -> None:
+        plain = self.client.get("/api/trivia/", HTTP_ACCEPT="application/json")
+        self.assertEqual(plain.status_code, 200)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        br = self.client.get(
+            "/api/trivia/", HTTP_ACCEPT="application/json", HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+        self.assertEqual(br["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(br.content), plain.content)
+
+        gz = self.client.get(
+            "/api/trivia/", HTTP_ACCEPT="application/json", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(gz["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gz.content), plain.content)
+
+    def test_list_is_rendered_once_per_registry(self) -> None:
+        misses, hits = lookups("miss"), lookups("hit")
+        for _ in range(3):
+            self.client.get("/api/trivia/", HTTP_ACCEPT="application/json")
+        self.assertEqual(lookups("miss") - misses, 1)
+        self.assertEqual(lookups("hit") - hits, 2)
+
+        # A country change rebuilds the registry, which drops the stored payloads
+        Country.objects.create(name="Chad", capital="N'Djamena", continent="Africa")
+        response = self.client.get("/api/trivia/?page=2", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.json()["count"], 32)
+        self.assertEqual(lookups("miss") - misses, 2)
+
+    def test_etag_revalidation(self) -> None:
+        first = self.client.get(f"/api/trivia/{self.country.pk}/", HTTP_ACCEPT="application/json")
+        self.assertEqual(first.json()["capital"], "Kigali")
+        again = self.client.get(
+            f"/api/trivia/{self.country.pk}/",
+            HTTP_ACCEPT="application/json",
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+    def test_each_encoding_has_its_own_etag(self) -> None:
+        url = "/api/trivia/"
+        tags = {
+            encoding: self.client.get(
+                url, HTTP_ACCEPT="application/json", HTTP_ACCEPT_ENCODING=encoding
+            )["ETag"]
+            for encoding in ("identity", "gzip", "br")
+        }
+        self.assertEqual(tags["br"], tags["identity"][:-1] + '-br"')
+        self.assertEqual(len(set(tags.values())), 3)
+
+        # A gzip client's tag doesn't revalidate the brotli body
+        response = self.client.get(
+            url,
+            HTTP_ACCEPT="application/json",
+            HTTP_ACCEPT_ENCODING="br",
+            HTTP_IF_NONE_MATCH=tags["gzip"],
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            url,
+            HTTP_ACCEPT="application/json",
+            HTTP_ACCEPT_ENCODING="br",
+            HTTP_IF_NONE_MATCH=f'"other", W/{tags["br"]}',
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], tags["br"])
+
+    def test_unknown_country_and_other_queries_fall_through(self) -> None:
+        self.assertEqual(
+            self.client.get("/api/trivia/999999/", HTTP_ACCEPT="application/json").status_code,
+            404,
+        )
+        response = self.client.get(
+            "/api/trivia/?format=json&page=1", HTTP_ACCEPT="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+    def test_warm_up_renders_every_detail(self) -> None:
+        registry.reset_all()
+        self.assertEqual(payloads.warm_details(), 31)
+        misses = lookups("miss", "detail")
+        self.client.get(f"/api/trivia/{self.country.pk}/", HTTP_ACCEPT="application/json")
+        self.assertEqual(lookups("miss", "detail"), misses)
@@ -0,0 +1,39 @@
+import csv
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+
+from trivia import registry
+from trivia.management.commands.phonetic_report import DEFAULT_LABELS, evaluate
+from trivia.models import Country
+from trivia.phonetics import phonetic_key
+
+
+class PhoneticKeyTests(TestCase):
+    def test_spellings_by_ear_share_a_key(self) -> None:
+        for heard, official in [
+            ("Wagadugu", "Ouagadougou"),
+            ("Kigalee", "Kigali"),
+            ("Lubliana", "Ljubljana"),
+            ("Gatemala", "Guatemala"),
+        ]:
+            self.assertEqual(phonetic_key(heard), phonetic_key(official), heard)
+        self.assertNotEqual(phonetic_key("Kigali"), phonetic_key("Kampala"))
+
+
+class PhoneticLabeledSetTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        with open(settings.BASE_DIR / "data" / "country_capitals.csv", encoding="utf-8") as f:
+            Country.objects.bulk_create(
+                Country(name=r["Country"], capital=r["Capital"], continent=r["Continent"])
+                for r in csv.DictReader(f)
+            )
+        registry.reset_all()  # bulk_create sends no post_save
+
+    def test_phonetic_tier_has_no_false_accepts(self) -> None:
+        with open(DEFAULT_LABELS, newline="", encoding="utf-8") as f:
+            report = evaluate(list(csv.DictReader(f)))
+        self.assertEqual(report["false_accepts"].get("phonetic", 0), 0)
+        self.assertGreaterEqual(report["accepted"].get("phonetic", 0), 10)
@@ -0,0 +1,63 @@
+from django.test import TestCase
+
+from trivia import ai_service, registry
+from trivia.models import Country, QuizQuestion, QuizTopic
+from trivia.warmup import warm_up
+
+
+class CountryRegistryTests(TestCase):
+    def setUp(self) -> None:
+        Country.objects.create(
+            name="South Africa",
+            capital="Pretoria|Cape Town|Bloemfontein",
+            continent="Africa",
+        )
+        Country.objects.create(name="United States", capital="Washington", continent="US")
+
+    def test_indexes_capitals_and_aliases(self) -> None:
+        reg = registry.get_registry()
+        self.assertEqual(reg.capital_map["cape town"], ["South Africa"])
+        self.assertEqual(reg.capital_index["cape town"][0].name, "South Africa")
+        self.assertEqual(reg.country_index["usa"].name, "United States")
+        self.assertIs(reg, registry.get_registry())
+
+    def test_country_save_resets_registry(self) -> None:
+        registry.get_registry()
+        Country.objects.create(name="Rwanda", capital="Kigali", continent="Africa")
+        self.assertIn("kigali", ai_service.get_all_capitals_map())
+
+    def test_warm_up_builds_every_structure(self) -> None:
+        report = warm_up()
+        self.assertEqual(
+            set(report), {
+                "country_registry",
+                "question_pools",
+                "fact_pools",
+                "learned_alias_pools",
+                "country_payloads",
+                "url_conf",
+            }
+        )
+        with self.assertNumQueries(0):
+            registry.get_registry()
+
+
+class QuestionPoolTests(TestCase):
+    def test_quiz_falls_back_when_pool_is_stale(self) -> None:
+        topic = QuizTopic.objects.create(name="Capitals")
+        for i in range(10):
+            QuizQuestion.objects.create(
+                topic=topic,
+                question_text=f"Question {i}",
+                options=["A", "B", "C", "D"],
+                correct_answer="A",
+            )
+        self.assertEqual(len(registry.question_pools.get("capitals")), 10)
+
+        # Bulk deletes send no signals, like the rotation in generate_quiz_questions
+        QuizQuestion.objects.filter(pk=topic.questions.first().pk).delete()
+        QuizQuestion.objects.bulk_create(
+            QuizQuestion(topic=topic, question_text="New", options=[], correct_answer="A")
+            for _ in range(1)
+        )
+        self.assertEqual(len(ai_service.generate_ai_quiz("Capitals")), 10)
@@ -0,0 +1,74 @@
+import runpy
+from typing import Any
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from trivia.models import Country
+from trivia.throttles import ApiRateThrottle, sliding_window_count
+
+RATES = {"api": "3/min", "ai": "1/min"}
+
+
+def production_rest_framework() -> dict[str, Any]:
+    """REST_FRAMEWORK as config.settings.production builds it, without its mkdirs."""
+    with mock.patch("os.makedirs"):
+        return runpy.run_module("config.settings.production")["REST_FRAMEWORK"]
+
+
+class SlidingWindowTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_counts_hits_in_the_window(self) -> None:
+        counts = [sliding_window_count("test:client", 60) for _ in range(3)]
+        self.assertEqual(counts[-1] - counts[0], 2)
+        self.assertEqual(sliding_window_count("test:other", 60), 1)
+
+    @override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": RATES})
+    def test_api_scope_rejects_over_the_rate(self) -> None:
+        request = RequestFactory().get("/api/trivia/")
+        allowed = [ApiRateThrottle().allow_request(request, None) for _ in range(4)]
+        self.assertEqual(allowed, [True, True, True, False])
+
+    def test_production_idents_the_client_behind_three_proxies(self) -> None:
+        # Cloudflare, NPM and our nginx each append the address they received from
+        request = RequestFactory().get(
+            "/api/trivia/",
+            HTTP_X_FORWARDED_FOR="198.51.100.7, 172.68.1.1, 172.18.0.2",
+            REMOTE_ADDR="172.18.0.3",
+        )
+        with override_settings(REST_FRAMEWORK=production_rest_framework()):
+            self.assertEqual(ApiRateThrottle().get_ident(request), "198.51.100.7")
+
+
+@override_settings(
+    LLM_BACKEND="local",
+    LLM_PROVIDER_OPTIONS={"local": {}},
+    REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": RATES},
+)
+class AIBudgetTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.country = Country.objects.create(
+            name="Rwanda", capital="Kigali", continent="Africa"
+        )
+
+    def check(self, answer: str) -> dict:
+        return self.client.post(
+            f"/api/trivia/{self.country.pk}/check-answer/",
+            {"user_answer": answer, "game_mode": "capital"},
+        ).json()
+
+    def test_over_budget_grading_skips_the_llm(self) -> None:
+        self.assertEqual(self.check("Butare")["grading_method"], "ai")
+        # Settled by Tier 1 and the verdict cache: no budget spent
+        self.assertEqual(self.check("Kigali")["grading_method"], "deterministic")
+        self.assertEqual(self.check("Butare")["grading_method"], "ai")
+
+        result = self.check("Gisenyi")
+        self.assertEqual(result["grading_method"], "hard_fallback")
+        self.assertFalse(result["is_correct"])
@@ -0,0 +1,90 @@
+import io
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from trivia import ai_service, verdict_store
+from trivia.models import Country, GradedAnswer
+
+
+@override_settings(LLM_BACKEND="local", LLM_PROVIDER_OPTIONS={"local": {}})
+class VerdictStoreTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        # Verdicts queued by other tests belong to their rolled-back countries
+        verdict_store._pending.clear()
+        self.addCleanup(verdict_store._pending.clear)
+        self.country = Country.objects.create(
+            name="Rwanda", capital="Kigali", continent="Africa"
+        )
+        self.key = verdict_store.cache_key("capital", "Rwanda", " Butare")
+        self.model_version = f"local/{ai_service.ACTIVE_MODEL_NAME}"
+
+    def test_fresh_verdicts_are_written_behind(self) -> None:
+        result = ai_service.grade_capital_answer("Rwanda", "Kigali", " Butare")
+        self.assertEqual(verdict_store.pending(), 1)
+        self.assertFalse(GradedAnswer.objects.exists())
+
+        self.assertEqual(verdict_store.flush(), 1)
+        stored = GradedAnswer.objects.get()
+        self.assertEqual(
+            (stored.game_mode, stored.country_id, stored.answer, stored.model_version),
+            ("capital", self.country.id, "butare", self.model_version),
+        )
+        self.assertEqual(stored.verdict, result)
+
+    def test_the_timer_writes_verdicts_a_quiet_worker_is_holding(self) -> None:
+        ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        # One tick, then stop the loop; the test's connection must stay open
+        clock = mock.Mock(**{"sleep.side_effect": [None, SystemExit]})
+        with mock.patch.object(verdict_store, "time", clock), mock.patch.object(
+            verdict_store, "close_old_connections"
+        ):
+            with self.assertRaises(SystemExit):
+                verdict_store._flush_forever()
+        clock.sleep.assert_called_with(30)
+        self.assertEqual(verdict_store.pending(), 0)
+        self.assertTrue(GradedAnswer.objects.exists())
+
+    def test_redis_miss_reads_through_and_refills_the_cache(self) -> None:
+        result = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        verdict_store.flush()
+        cache.clear()
+
+        with self.settings(LLM_PROVIDER_OPTIONS={"local": {"error_rate": 1.0}}):
+            again = ai_service.grade_capital_answer("Rwanda", "Kigali", "BUTARE ")
+        self.assertEqual(again["feedback_message"], result["feedback_message"])
+        self.assertEqual(again["grading_method"], "ai")
+        self.assertIsNotNone(cache.get(self.key))
+
+    def test_verdicts_of_models_off_the_route_are_not_served(self) -> None:
+        ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        verdict_store.flush()
+        cache.clear()
+
+        with self.settings(
+            LLM_PROVIDER_OPTIONS={"local": {"error_rate": 1.0}},
+            LLM_ROUTES={"grade_capital": ["newer-model"]},
+        ):
+            result = ai_service.grade_capital_answer("Rwanda", "Kigali", "Butare")
+        self.assertEqual(result["grading_method"], "hard_fallback")
+
+    def test_rehydrate_loads_the_best_ranked_verdicts(self) -> None:
+        GradedAnswer.objects.bulk_create(
+            [
+                GradedAnswer(
+                    game_mode="capital",
+                    country=self.country,
+                    answer="butare",
+                    model_version=version,
+                    verdict={"is_correct": False, "feedback_message": version},
+                )
+                for version in ["retired-model", self.model_version]
+            ]
+        )
+        out = io.StringIO()
+        call_command("rehydrate_verdicts", "--batch-size", "1", stdout=out)
+        self.assertIn("Loaded 1 verdict(s)", out.getvalue())
+        self.assertEqual(cache.get(self.key)["feedback_message"], self.model_version)
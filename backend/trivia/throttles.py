@@ -0,0 +1,103 @@
+"""
+Sliding-window rate limits for the public API.
+
+Every route is `AllowAny`, so a script posting unique nonsense answers gets a guaranteed AI
+cache miss, and a paid LLM call, per request. There are two budgets, both per client IP:
+
+- "api" (`ApiRateThrottle`, the DRF default): every route; over it, the request gets a 429.
+- "ai" (`ai_budget`): spent only when a request is about to call the LLM (a Tier 3 cache
+  miss or a JIT fact harvest). Over it, the request is not rejected but answered without
+  the LLM: deterministic grading only, or the generic fun fact.
+
+Rates come from `DEFAULT_THROTTLE_RATES`; a scope without a rate is unlimited. The window is
+the usual two-bucket approximation: hits in the previous fixed window are weighted by how
+much of it still overlaps the sliding one. On Redis the increment, its expiry and the read
+of the previous bucket go out as one pipeline, so a check costs a single round trip.
+"""
+
+import logging
+import time
+from collections.abc import Callable
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from trivia import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def sliding_window_count(key: str, window: int) -> float:
+    """Counts a hit against `key` and returns the hits in the last `window` seconds."""
+    now = time.time()
+    bucket = int(now // window)
+    current_key = f"throttle:{key}:{bucket}"
+    previous_key = f"throttle:{key}:{bucket - 1}"
+
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        current_key, previous_key = backend.make_key(current_key), backend.make_key(previous_key)
+        pipe = backend._cache.get_client(current_key, write=True).pipeline(transaction=False)
+        pipe.incr(current_key)
+        pipe.expire(current_key, window * 2)
+        pipe.get(previous_key)
+        current, _, previous = pipe.execute()
+    else:
+        backend.add(current_key, 0, timeout=window * 2)
+        current = backend.incr(current_key)
+        previous = backend.get(previous_key)
+
+    overlap = 1 - (now % window) / window
+    return int(previous or 0) * overlap + current
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    def get_rate(self) -> str | None:
+        # Read per request, not at import like SimpleRateThrottle.THROTTLE_RATES
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request: Request, view: object) -> str:
+        return f"{self.scope}:{self.get_ident(request)}"
+
+    def allow_request(self, request: Request, view: object) -> bool:
+        if self.rate is None:
+            return True
+        try:
+            self.hits = sliding_window_count(self.get_cache_key(request, view), self.duration)
+        except Exception as e:
+            # Never turn a cache outage into an outage of the API
+            logger.error(f"Throttle counter unavailable for scope {self.scope}: {e}")
+            return True
+        if self.hits > self.num_requests:
+            metrics.THROTTLED_REQUESTS.labels(scope=self.scope).inc()
+            return False
+        return True
+
+    def wait(self) -> float:
+        # Roughly when enough of the window has slid by to drop below the rate
+        excess = self.hits - self.num_requests
+        return max(1.0, self.duration * excess / self.num_requests)
+
+
+class ApiRateThrottle(SlidingWindowRateThrottle):
+    scope = "api"
+
+
+class AIRateThrottle(SlidingWindowRateThrottle):
+    scope = "ai"
+
+
+def client_ident(request: Request) -> str:
+    """The client's address as the throttles see it, behind NUM_PROXIES proxies."""
+    return AIRateThrottle().get_ident(request)
+
+
+def ai_budget(request: Request, view: object) -> Callable[[], bool]:
+    """
+    Returns a check to call right before an LLM call: True while the client is within the
+    "ai" budget. Deferring it means answers settled by the cheaper tiers spend nothing.
+    """
+    return lambda: AIRateThrottle().allow_request(request, view)
@@ -0,0 +1,236 @@
+"""
+Durable store for AI grading verdicts, under the Redis verdict cache.
+
+Tier 3 verdicts are cached in Redis with no expiry, but Redis is not a store of record:
+a restart, an eviction under memory pressure or `load_country_data` clearing the
+verdict keys drops every verdict we paid for, and the LLM bill spikes while the
+cache refills. Every fresh verdict is therefore also kept as a `GradedAnswer` row keyed
+by (mode, country, answer, model version):
+
+- Write-behind: `save` only appends to an in-process buffer; no request waits on the
+  insert. The buffer is bulk inserted on a background thread as soon as
+  VERDICT_STORE_FLUSH_SIZE verdicts are waiting, by a per-worker timer thread every
+  VERDICT_STORE_MAX_AGE seconds whatever the traffic (so a quiet worker doesn't sit on
+  its verdicts), and when a gunicorn worker exits (see gunicorn.conf.py).
+  `ignore_conflicts` makes workers racing on the same answer harmless.
+- Read-through: on a Redis miss, `lookup` reads the table and puts the verdict back in
+  Redis. Only verdicts from models on the task's current route are used, preferring the
+  primary, so moving grading to a new model doesn't keep serving the old model's
+  verdicts.
+- Rehydrate: `manage.py rehydrate_verdicts` (`rehydrate`) reloads Redis from the table
+  in pipelined batches. The init container runs it on every deploy (see
+  docker-compose.prod.yml); run it by hand after a Redis restart.
+
+The answer is stored stripped and lowercased, the form the Redis key is hashed from, so
+every row maps back to exactly one cache key. The store is bookkeeping: a failed read or
+write is logged and never changes the verdict the user gets.
+"""
+
+import fnmatch
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import DatabaseError, close_old_connections
+
+from trivia import metrics, registry
+from trivia.models import GradedAnswer
+
+logger = logging.getLogger(__name__)
+
+MAX_ANSWER_LENGTH = GradedAnswer._meta.get_field("answer").max_length
+
+_pending: list[GradedAnswer] = []
+_lock = threading.Lock()
+_timer_pid: int | None = None
+
+
+def cache_key(game_mode: str, country_name: str, answer: str) -> str:
+    safe_user = hashlib.md5(answer.strip().lower().encode()).hexdigest()
+    safe_country = hashlib.md5(country_name.strip().lower().encode()).hexdigest()
+    return f"ai_{game_mode}_{safe_country}_{safe_user}"
+
+
+def _row_key(game_mode: str, country_name: str, answer: str) -> tuple[int, str] | None:
+    """The row's (country id, answer), or None when the answer can't be stored."""
+    country = registry.get_registry().by_name.get(country_name)
+    answer = answer.strip().lower()
+    if country is None or not answer or len(answer) > MAX_ANSWER_LENGTH:
+        return None
+    return country.id, answer
+
+
+def lookup(
+    game_mode: str, country_name: str, answer: str, model_versions: list[str]
+) -> dict[str, Any] | None:
+    """The stored verdict of the first model in `model_versions` that graded this answer."""
+    key = _row_key(game_mode, country_name, answer)
+    if key is None:
+        return None
+    try:
+        verdicts = dict(
+            GradedAnswer.objects.filter(
+                game_mode=game_mode,
+                country_id=key[0],
+                answer=key[1],
+                model_version__in=model_versions,
+            ).values_list("model_version", "verdict")
+        )
+    except DatabaseError as e:
+        logger.error(f"Could not read stored verdicts for {country_name}: {e}")
+        return None
+
+    verdict = next((verdicts[m] for m in model_versions if m in verdicts), None)
+    metrics.VERDICT_STORE_LOOKUPS.labels(
+        game_mode=game_mode, result="miss" if verdict is None else "hit"
+    ).inc()
+    if verdict is not None:
+        cache.set(cache_key(game_mode, country_name, answer), verdict, timeout=None)
+    return verdict
+
+
+def save(
+    game_mode: str,
+    country_name: str,
+    answer: str,
+    model_version: str,
+    verdict: dict[str, Any],
+) -> None:
+    """Queues a fresh verdict for the table."""
+    key = _row_key(game_mode, country_name, answer)
+    if key is None:
+        return
+    row = GradedAnswer(
+        game_mode=game_mode,
+        country_id=key[0],
+        answer=key[1],
+        model_version=model_version,
+        verdict=dict(verdict),
+    )
+    _ensure_timer()
+    with _lock:
+        _pending.append(row)
+        due = len(_pending) >= settings.VERDICT_STORE_FLUSH_SIZE
+    if due:
+        threading.Thread(
+            target=_flush_in_background, name="verdict-store-flush", daemon=True
+        ).start()
+
+
+def pending() -> int:
+    with _lock:
+        return len(_pending)
+
+
+def flush() -> int:
+    """Writes every queued verdict; returns the number of verdicts written."""
+    with _lock:
+        batch = _pending[:]
+        _pending.clear()
+    if not batch:
+        return 0
+    try:
+        GradedAnswer.objects.bulk_create(batch, ignore_conflicts=True)
+    except DatabaseError as e:
+        logger.error(f"Could not write {len(batch)} verdicts, keeping them queued: {e}")
+        with _lock:
+            # Bounded, so an outage can't grow the buffer without limit; the verdicts
+            # are still in Redis
+            _pending[:0] = batch[-10 * settings.VERDICT_STORE_FLUSH_SIZE :]
+        return 0
+    metrics.VERDICT_STORE_WRITES.inc(len(batch))
+    return len(batch)
+
+
+def _flush_in_background() -> None:
+    try:
+        flush()
+    finally:
+        # The thread owns its own DB connection; close it like a request would
+        close_old_connections()
+
+
+def _ensure_timer() -> None:
+    """Starts this process's timer thread; threads don't survive gunicorn's fork."""
+    global _timer_pid
+    if _timer_pid == os.getpid():
+        return
+    with _lock:
+        if _timer_pid == os.getpid():
+            return
+        _timer_pid = os.getpid()
+        threading.Thread(
+            target=_flush_forever, name="verdict-store-timer", daemon=True
+        ).start()
+
+
+def _flush_forever() -> None:
+    while True:
+        time.sleep(settings.VERDICT_STORE_MAX_AGE)
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Timed verdict flush failed: {e}")
+        finally:
+            close_old_connections()
+
+
+def clear_cache(batch_size: int = 500) -> int:
+    """
+    Deletes every cached verdict; returns how many. The default cache also holds sessions,
+    throttle counters and queued bug reports, so unlike `cache.clear()` this leaves them be.
+    """
+    backend = caches["default"]
+    pattern = backend.make_key("ai_*")
+    if isinstance(backend, RedisCache):
+        client = backend._cache.get_client(write=True)
+        keys = list(client.scan_iter(match=pattern, count=batch_size))
+        for i in range(0, len(keys), batch_size):
+            client.delete(*keys[i : i + batch_size])
+        return len(keys)
+    if isinstance(backend, LocMemCache):
+        with backend._lock:
+            keys = [k for k in backend._cache if fnmatch.fnmatchcase(k, pattern)]
+            for key in keys:
+                backend._delete(key)
+        return len(keys)
+    # No way to list keys through the cache API; drop everything rather than stale verdicts
+    backend.clear()
+    return 0
+
+
+def rehydrate(model_versions: dict[str, list[str]], batch_size: int = 500) -> int:
+    """
+    Loads every stored verdict into Redis; returns the number of keys set.
+    `model_versions` maps each game mode to its route's models, primary first: an answer
+    graded by several of them gets the best-ranked verdict, other models' are skipped.
+    `set_many` sends each batch in one pipelined round trip with the Redis backend.
+    """
+    best: dict[str, tuple[int, dict[str, Any]]] = {}
+    rows = GradedAnswer.objects.values_list(
+        "game_mode", "country__name", "answer", "model_version", "verdict"
+    )
+    for game_mode, country_name, answer, model_version, verdict in rows.iterator(
+        chunk_size=batch_size
+    ):
+        versions = model_versions.get(game_mode, [])
+        if model_version not in versions:
+            continue
+        rank = versions.index(model_version)
+        key = cache_key(game_mode, country_name, answer)
+        if key not in best or rank < best[key][0]:
+            best[key] = (rank, verdict)
+
+    keys = list(best)
+    for i in range(0, len(keys), batch_size):
+        cache.set_many(
+            {key: best[key][1] for key in keys[i : i + batch_size]}, timeout=None
+        )
+    return len(keys)
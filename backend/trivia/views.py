@@ -1,14 +1,26 @@
 from __future__ import annotations
 import logging
 from typing import Any
-from django.db.models import QuerySet
+from django.http import HttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.request import Request
 from .models import Country, CountryFunFact, ReportedIssue
-from .serializers import CountrySerializer, ReportedIssueSerializer
-from . import ai_service
+from .serializers import (
+    CountrySerializer,
+    ReportedIssueSerializer,
+    ReportedIssueSubmitSerializer,
+)
+from . import (
+    ai_service,
+    game_session,
+    issue_buffer,
+    payloads,
+    registry,
+    throttles,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,27 +34,59 @@ class CountryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Country.objects.all().order_by("id")
     serializer_class = CountrySerializer
 
-    def get_queryset(self) -> QuerySet[Country]:
+    def list(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response | HttpResponse:
         """
-        Dynamically limits and shuffles the queryset based on API parameters.
-        
+        Lists countries, or with `?shuffle=true` deals a random round of 20.
+
         Why we shuffle here instead of the frontend:
         - Security & Fairness: Sending all 190+ countries to the client makes it trivial to cheat by inspecting network traffic.
         - Performance: Transferring only 20 records reduces payload size drastically, improving load times on mobile connections.
-        
+
         How the shuffle works:
-        - The `order_by("?")` translates to `ORDER BY RANDOM()` in Postgres.
-        - While `ORDER BY RANDOM()` can be slow on very large tables, our Country table is small (~190 rows), 
-          making this approach acceptable and efficient enough for our use case without needing complex caching.
+        - The round is sampled from the in-memory country registry with a random seed, so it
+          costs no query (it used to be `ORDER BY RANDOM()`).
+        - The seed, the order and the game's progress travel in the signed `X-Game-Token`
+          header (see trivia/game_session.py); the body stays a plain list, unpaginated.
+
+        The plain list is served precompressed from `trivia.payloads`.
         """
-        queryset = super().get_queryset()
-        shuffle = self.request.query_params.get("shuffle", "false").lower() == "true"
+        if request.query_params.get("shuffle", "false").lower() != "true":
+            if not self._serves_payload(request, allowed_params={"page"}):
+                return super().list(request, *args, **kwargs)
+            # Pagination links are absolute, so the host is part of the key
+            key = f"list:{request.get_host()}?{request.query_params.urlencode()}"
+            payload = payloads.payload_cache.get(
+                key, lambda: super(CountryViewSet, self).list(request, *args, **kwargs).data
+            )
+            return payloads.respond(request, payload)
+
+        session, countries = game_session.new_round()
+        return Response(
+            self.get_serializer(countries, many=True).data,
+            headers={"X-Game-Token": session.start().to_token()},
+        )
 
-        if shuffle:
-            # Order randomly ('?') and slice to exactly 20 results for a standard quiz length
-            return queryset.order_by("?")[:20]
+    def retrieve(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response | HttpResponse:
+        """A country's details, served precompressed from the registry (see `trivia.payloads`)."""
+        pk = str(kwargs.get("pk", ""))
+        entry = registry.get_registry().by_id.get(int(pk)) if pk.isdigit() else None
+        if entry is None or not self._serves_payload(request, allowed_params=set()):
+            return super().retrieve(request, *args, **kwargs)
+        payload = payloads.payload_cache.get(
+            f"detail:{entry.id}", lambda: self.get_serializer(entry).data
+        )
+        return payloads.respond(request, payload)
 
-        return queryset
+    @staticmethod
+    def _serves_payload(request: Request, allowed_params: set[str]) -> bool:
+        """Stored payloads are JSON only, and only for the query strings they were keyed by."""
+        return request.accepted_renderer.format == "json" and set(
+            request.query_params
+        ) <= allowed_params
 
     @action(detail=True, methods=["post"], url_path="check-answer")
     def check_answer(self, request: Request, pk: str | None = None) -> Response:
@@ -59,8 +103,9 @@ class CountryViewSet(viewsets.ReadOnlyModelViewSet):
         Architecture Flow:
         1. Extract the user answer and determine the current game mode.
         2. Delegate the grading logic to the isolated `ai_service` module.
-        3. If the AI graded the answer, intercept any extra facts it generated and save them asynchronously.
-        4. Strip the extra facts from the response (to save bandwidth) and return the graded result.
+        3. If the AI graded a correct answer, save its feedback as a fact.
+        4. Return the graded result. Extra facts are no longer generated while grading: the
+           `generate_fun_facts` command tops up small fact pools off-request.
         """
         country = self.get_object()
         user_answer = request.data.get("user_answer", "").strip()
@@ -71,49 +116,127 @@ class CountryViewSet(viewsets.ReadOnlyModelViewSet):
                 {"error": "No answer provided."}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        result = self._grade(
+            request, country.id, country.name, country.capital, user_answer, game_mode
+        )
+        if result is None:
+            return Response(
+                {"error": "Invalid game mode."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(result)
+
+    @action(detail=False, methods=["post"], url_path="game/answer")
+    def game_answer(self, request: Request) -> Response:
+        """
+        Grades the answer for the current position of a shuffled round.
+
+        The body carries the `token` from `?shuffle=true` (or from the previous answer);
+        the response adds the round's progress and the token to send with the next answer.
+        Each token answers once: posting it again is a 409. The score is advisory, since
+        the round's capitals travel with the deal (see trivia/game_session.py).
+        """
+        user_answer = request.data.get("user_answer", "").strip()
+        game_mode = request.data.get("game_mode", "capital")
+        if not user_answer:
+            return Response(
+                {"error": "No answer provided."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            session = game_session.GameSession.from_token(request.data.get("token", ""))
+        except game_session.InvalidGameToken:
+            return Response(
+                {"error": "Invalid or expired game token."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if session.finished:
+            return Response(
+                {"error": "This round is already finished."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if game_mode not in ("capital", "country"):
+            return Response(
+                {"error": "Invalid game mode."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not session.nonce:
+            # A deal shared by many players (a prebuilt bundle): start this player's copy
+            session = session.start()
+        # Claimed before grading, so a replayed token doesn't even learn the verdict
+        if not game_session.claim(session):
+            return Response(
+                {"error": "This question was already answered."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        country = registry.get_registry().by_id.get(session.country_ids[session.position])
+        if country is None:
+            # Removed since the round was dealt; the rest of the round is still playable
+            session = session.advance(0)
+            return Response(
+                {
+                    "error": "This country is no longer available.",
+                    "token": session.to_token(),
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        result = self._grade(
+            request, country.id, country.name, country.capital, user_answer, game_mode
+        )
+        index = session.position
+        session = session.advance(1 if result.get("is_correct") else 0)
+        return Response(
+            {
+                **result,
+                "index": index,
+                "country": country.name,
+                "score": session.score,
+                "answered": session.position,
+                "total": len(session.country_ids),
+                "finished": session.finished,
+                "token": session.to_token(),
+            }
+        )
+
+    def _grade(
+        self,
+        request: Request,
+        country_id: int,
+        country_name: str,
+        capital: str,
+        user_answer: str,
+        game_mode: str,
+    ) -> dict[str, Any] | None:
+        """Grades one answer and harvests AI feedback as facts; None for an unknown mode."""
         # 1. Dispatch grading based on mode. This keeps the view thin and delegates business logic.
+        #    Over the "ai" budget, an answer the cheaper tiers can't settle isn't sent to the LLM
+        ai_budget = throttles.ai_budget(request, self)
+        client = throttles.client_ident(request)
         if game_mode == "capital":
             result = ai_service.grade_capital_answer(
-                country.name, country.capital, user_answer
+                country_name, capital, user_answer, ai_budget=ai_budget, client=client
             )
         elif game_mode == "country":
             result = ai_service.grade_country_answer(
-                country.name, country.capital, user_answer
+                country_name, capital, user_answer, ai_budget=ai_budget, client=client
             )
         else:
-            return Response(
-                {"error": "Invalid game mode."}, status=status.HTTP_400_BAD_REQUEST
-            )
+            return None
 
         # 2. Harvesting Logic: Save AI feedback as facts for future use
         if result.get("grading_method") == "ai":
             if result.get("is_correct") and result.get("feedback_message"):
                 CountryFunFact.objects.get_or_create(
-                    country=country,
+                    country_id=country_id,
                     fact_text=result["feedback_message"],
                     defaults={"is_ai_generated": True, "source": "user"},
                 )
 
-            if result.get("extra_facts"):
-                harvest_count = 0
-                for fact_text in result["extra_facts"]:
-                    _, created = CountryFunFact.objects.get_or_create(
-                        country=country,
-                        fact_text=fact_text,
-                        defaults={"is_ai_generated": True, "source": "user"},
-                    )
-                    if created:
-                        harvest_count += 1
-
-                if harvest_count > 0:
-                    logger.info(
-                        f"Harvested {harvest_count} new facts for {country.name} from live user."
-                    )
-
-            # Remove extra_facts from response before sending to frontend
+            # Verdicts cached before the lean grading prompt still carry extra facts
             result.pop("extra_facts", None)
 
-        return Response(result)
+        return result
 
     @action(detail=True, methods=["get"], url_path="fun-fact")
     def fun_fact(self, request: Request, pk: str | None = None) -> Response:
@@ -121,7 +244,9 @@ class CountryViewSet(viewsets.ReadOnlyModelViewSet):
         Retrieves a fun fact for a specific country, triggering JIT harvesting if needed.
         """
         country = self.get_object()
-        fact_text = ai_service.get_fun_fact(country.name)
+        fact_text = ai_service.get_fun_fact(
+            country.name, ai_budget=throttles.ai_budget(request, self)
+        )
 
         return Response(
             {"fact": fact_text, "fun_fact": fact_text, "funFact": fact_text}
@@ -161,10 +286,30 @@ class AIQuizViewSet(viewsets.ViewSet):
         })
 
 
+class ReportedIssuePagination(CursorPagination):
+    # Keyset pagination on the (created_at, id) index: no COUNT(*) and no OFFSET scan.
+    # Sized here because production sets no global PAGE_SIZE, which disables paging
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
 class ReportedIssueViewSet(viewsets.ModelViewSet):
     http_method_names = ["get", "post", "head", "options"]
     """
     Handles the user bug reporting system.
+
+    Submissions go through the write-behind buffer in `trivia.issue_buffer` and are
+    answered with 202 before they reach the table. The list shows flushed reports only;
+    `manage.py flush_reported_issues` writes out the rest.
     """
-    queryset = ReportedIssue.objects.all().order_by("-created_at")
+    queryset = ReportedIssue.objects.all().order_by("-created_at", "-id")
     serializer_class = ReportedIssueSerializer
+    pagination_class = ReportedIssuePagination
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = ReportedIssueSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        outcome = issue_buffer.submit(serializer.validated_data)
+        return Response({"status": outcome}, status=status.HTTP_202_ACCEPTED)
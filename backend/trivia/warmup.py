@@ -0,0 +1,67 @@
+"""
+Startup warm-up for the in-memory trivia data (see `trivia.registry`).
+
+Without it, the first grade, fun fact or quiz request each worker serves after a deploy
+or a `--max-requests` recycle pays for building the country registry and id pools.
+`warm_up` builds every structure up front and logs how long each one took and how much
+memory it allocated, so their cost on the Pi is visible in the gunicorn log.
+
+Under `--preload` this runs once in the gunicorn master, so the structures are shared
+copy-on-write by every worker (see gunicorn.conf.py). The DB connections opened here are
+closed afterwards: forked workers must not share the master's socket.
+"""
+
+import logging
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from django.db import connections
+from django.urls import get_resolver
+
+from trivia import payloads, registry
+
+logger = logging.getLogger(__name__)
+
+WARMUP_STEPS: list[tuple[str, Callable[[], Any]]] = [
+    ("country_registry", registry.get_registry),
+    ("question_pools", registry.question_pools.refresh),
+    ("fact_pools", registry.fact_pools.refresh),
+    ("learned_alias_pools", registry.learned_alias_pools.refresh),
+    ("country_payloads", payloads.warm_details),
+    # Django imports the URLconf (views, serializers, DRF) on the first request otherwise
+    ("url_conf", lambda: get_resolver().url_patterns),
+]
+
+
+def warm_up() -> dict[str, dict[str, float]]:
+    """Builds every registered structure and returns {step: {"ms", "kib"}}."""
+    report: dict[str, dict[str, float]] = {}
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+
+    try:
+        for name, build in WARMUP_STEPS:
+            before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            try:
+                build()
+            except Exception as e:
+                # Never block the boot: a cold structure is rebuilt lazily on first use
+                logger.error(f"Warm-up step {name} failed (is DB migrated?): {e}")
+                continue
+            report[name] = {
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+                "kib": round((tracemalloc.get_traced_memory()[0] - before) / 1024, 1),
+            }
+            logger.info(
+                f"Warm-up: built {name} in {report[name]['ms']} ms ({report[name]['kib']} KiB)."
+            )
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+        connections.close_all()
+
+    return report